@@ -0,0 +1,228 @@
+import os
+import re
+import sys
+import json
+import numpy as np
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # repository root, for parallel.py
+from parallel import parallel_map
+
+# Name of the file inside a Facebook data export that lists the advertisers using your activity
+EXPORT_FILE = 'advertisers_using_your_activity_or_information.json'
+# Characters read from an export at a time
+CHUNK_CHARS = 1 << 16
+
+# One JSON token after optional whitespace: punctuation, the opening quote of a string, or a number/literal
+TOKEN = re.compile(r'\s*(?:([{}\[\]:,])|(")|([^\s{}\[\]:,"]+))')
+_scanstring = json.decoder.scanstring
+
+
+class StringTable:
+    """Interned strings: every distinct string is stored once and referred to by its integer id."""
+
+    def __init__(self, strings=()):
+        self.ids = {}
+        self.strings = []
+        for string in strings:
+            self.intern(string)
+
+    def __len__(self):
+        return len(self.strings)
+
+    def intern(self, string):
+        string_id = self.ids.get(string)
+        if string_id is None:
+            string_id = self.ids[string] = len(self.strings)
+            self.strings.append(string)
+        return string_id
+
+
+def _tokens(file, chunk_chars=CHUNK_CHARS):
+    """Yield (kind, value) for every token of a JSON text file, reading it in chunks.
+
+    kind is the punctuation character itself, '"' for a string (value is the
+    decoded string) or '' for a number or literal (value is its raw text).
+
+    Strings are decoded with the json module's own scanner. Only the unread
+    tail of the current chunk is held, plus any string or number still being read.
+    """
+    buffer, pos, eof = '', 0, False
+    while True:
+        match = TOKEN.match(buffer, pos)
+        # A token running into the end of the buffer may continue in the next chunk
+        if not eof and (match is None or match.end() == len(buffer)):
+            chunk = file.read(chunk_chars)
+            eof = not chunk
+            buffer, pos = buffer[pos:] + chunk, 0
+            continue
+        if match is None:
+            if buffer[pos:].strip():
+                raise ValueError(f"Invalid JSON near: {buffer[pos:pos + 40]!r}")
+            return
+        punctuation, quote, raw = match.groups()
+        if quote:
+            try:
+                value, end = _scanstring(buffer, match.end())
+            except ValueError:
+                if eof:
+                    raise
+                chunk = file.read(chunk_chars)
+                eof = not chunk
+                buffer, pos = buffer[pos:] + chunk, 0
+                continue
+            pos = end
+            yield '"', value
+        else:
+            pos = match.end()
+            yield (punctuation, None) if punctuation else ('', raw)
+
+
+def iter_advertisers(file, chunk_chars=CHUNK_CHARS):
+    """Yield (label, advertiser) for every label_values[].vec[].value of an export, streaming the JSON.
+
+    Only the containers on the way to the current token are tracked. A
+    label_values entry whose label comes after its vec has its advertisers
+    held back until the label is read (or the entry ends, giving label '').
+    """
+    # One [is_object, key, expecting_key] frame per open container
+    stack = []
+    label, pending = None, []
+    for kind, value in _tokens(file, chunk_chars):
+        if kind == '"':
+            top = stack[-1] if stack else None
+            if top is not None and top[0] and top[2]:
+                top[1], top[2] = value, False
+                continue
+            depth = len(stack)
+            if depth == 5 and stack[4][1] == 'value' and stack[2][1] == 'vec' and stack[0][1] == 'label_values':
+                if label is None:
+                    pending.append(value)
+                else:
+                    yield label, value
+            elif depth == 3 and stack[2][1] == 'label' and stack[0][1] == 'label_values':
+                label = value
+                for advertiser in pending:
+                    yield label, advertiser
+                pending = []
+        elif kind == '{':
+            stack.append([True, None, True])
+            if len(stack) == 3 and stack[0][1] == 'label_values':
+                label, pending = None, []
+        elif kind == '[':
+            stack.append([False, None, False])
+        elif kind == '}' or kind == ']':
+            if len(stack) == 3 and stack[0][1] == 'label_values':
+                for advertiser in pending:
+                    yield '', advertiser
+                label, pending = None, []
+            stack.pop()
+        elif kind == ',':
+            if stack and stack[-1][0]:
+                stack[-1][2] = True
+
+
+def parse_export(path, chunk_chars=CHUNK_CHARS):
+    """Distinct (label, advertiser) pairs of one export file.
+
+    Returns (labels, advertisers, label_ids, advertiser_ids): the file's own
+    string tables and two int32 id columns, one row per distinct pair in
+    first-seen order.
+    """
+    labels, advertisers = StringTable(), StringTable()
+    seen = {}
+    with open(path, 'r', encoding='utf-8') as file:
+        for label, advertiser in iter_advertisers(file, chunk_chars):
+            seen.setdefault((labels.intern(label), advertisers.intern(advertiser)), None)
+    pairs = np.array(list(seen), dtype=np.int32).reshape(-1, 2)
+    return labels.strings, advertisers.strings, pairs[:, 0], pairs[:, 1]
+
+
+def find_exports(paths):
+    """The export files named by paths: files as given, directories searched for EXPORT_FILE."""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for directory, _, names in sorted(os.walk(path)):
+                if EXPORT_FILE in names:
+                    files.append(os.path.join(directory, EXPORT_FILE))
+        else:
+            files.append(path)
+    return files
+
+
+def _compact(ids):
+    """ids in the smallest unsigned integer type that holds them all."""
+    return ids.astype(np.min_scalar_type(int(ids.max()) if len(ids) else 0))
+
+
+def ingest_exports(files, n_workers=None):
+    """Parse export files across a process pool into one columnar dataset.
+
+    Every worker returns its file's pairs against the file's own string
+    tables; these are merged into shared label and advertiser tables by
+    remapping the id columns. The result holds the file, label and
+    advertiser string tables and one id column each for file, label and
+    advertiser, every column in the smallest integer type that fits.
+    """
+    files = list(files)
+    workers = n_workers or min(len(files), os.cpu_count() or 1)
+    parsed = parallel_map(parse_export, files, n_workers, chunksize=max(1, len(files) // (workers * 4)))
+
+    labels, advertisers = StringTable(), StringTable()
+    file_ids, label_ids, advertiser_ids = [], [], []
+    for file_id, (file_labels, file_advertisers, file_label_ids, file_advertiser_ids) in enumerate(parsed):
+        label_map = np.array([labels.intern(s) for s in file_labels], dtype=np.int32)
+        advertiser_map = np.array([advertisers.intern(s) for s in file_advertisers], dtype=np.int32)
+        file_ids.append(np.full(len(file_label_ids), file_id, dtype=np.int32))
+        label_ids.append(label_map[file_label_ids] if len(file_label_ids) else file_label_ids)
+        advertiser_ids.append(advertiser_map[file_advertiser_ids] if len(file_advertiser_ids) else file_advertiser_ids)
+
+    def column(parts):
+        return _compact(np.concatenate(parts) if parts else np.zeros(0, dtype=np.int32))
+    return {
+        'files': np.array(files, dtype=str),
+        'labels': np.array(labels.strings, dtype=str),
+        'advertisers': np.array(advertisers.strings, dtype=str),
+        'file_id': column(file_ids),
+        'label_id': column(label_ids),
+        'advertiser_id': column(advertiser_ids)
+    }
+
+
+def save_dataset(path, dataset):
+    np.savez_compressed(path, **dataset)
+
+
+def load_dataset(path):
+    """The columns and string tables saved by save_dataset, as a dict of arrays."""
+    with np.load(path) as data:
+        return {name: data[name] for name in data.files}
+
+
+def dataset_frame(dataset):
+    """One row per (file, label, advertiser) pair, with categorical columns over the string tables."""
+    import pandas as pd
+    return pd.DataFrame({
+        name: pd.Categorical.from_codes(dataset[f'{name}_id'].astype(np.int64), categories=dataset[table])
+        for name, table in [('file', 'files'), ('label', 'labels'), ('advertiser', 'advertisers')]
+    })
+
+
+def main():
+    # With no arguments the export in this folder is ingested
+    output_file = sys.argv[1] if len(sys.argv) > 1 else 'advertiser_pairs.npz'
+    files = find_exports(sys.argv[2:] if len(sys.argv) > 2 else [EXPORT_FILE])
+    if not files:
+        print(f"No '{EXPORT_FILE}' files found.")
+        exit()
+    dataset = ingest_exports(files)
+    save_dataset(output_file, dataset)
+    print(f"Ingested {len(dataset['file_id'])} (label, advertiser) pairs from {len(files)} export file(s): "
+          f"{len(dataset['labels'])} labels, {len(dataset['advertisers'])} distinct advertisers.")
+    counts = np.bincount(dataset['label_id'].astype(np.int64), minlength=len(dataset['labels']))
+    for label, count in zip(dataset['labels'], counts):
+        print(f"{label}: {count}")
+    print(f"Columnar advertiser dataset saved as '{output_file}'")
+
+
+if __name__ == "__main__":
+    main()
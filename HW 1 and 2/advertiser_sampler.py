@@ -0,0 +1,129 @@
+import numpy as np
+
+
+def target_count(total, percentage, bounds=(50, 200)):
+    """percentage of total, rounded and clamped to bounds (and never more than total)."""
+    low, high = bounds
+    return min(total, max(low, min(high, round(percentage * total / 100.0))))
+
+
+def allocate(sizes, target, min_per_stratum=0, weights=None):
+    """Split target draws over strata of the given sizes, each getting between its minimum and its size.
+
+    Draws are spread in proportion to weights (the sizes by default), as
+    n_h = clip(scale * weight_h, min_h, size_h) with the scale found by
+    bisection so the total hits target (or fills every stratum of positive
+    weight, if that is less); the fractional parts are then rounded by
+    largest remainder. Any draws still missing go to the strata with the
+    most room, those of positive weight first, so zero-weight strata only
+    grow past their minimum once the others are full. min_h is
+    min(min_per_stratum, size_h) and wins over target when the minimums
+    alone exceed it. Returns int64 counts with min_h <= n_h <= size_h that
+    sum to min(target, sizes.sum()), or to the minimums if more.
+    """
+    sizes = np.asarray(sizes, dtype=np.int64)
+    weights = sizes.astype(float) if weights is None else np.asarray(weights, dtype=float)
+    positive = weights > 0
+    low = np.minimum(sizes, min_per_stratum).astype(float)
+    high = sizes.astype(float)
+    target = min(int(target), int(sizes.sum()))
+    if low.sum() >= target:
+        return low.astype(np.int64)
+
+    def filled(scale):
+        return np.clip(scale * weights, low, high)
+
+    # However large the scale, zero-weight strata stay at their minimum
+    reachable = min(target, np.where(positive, high, low).sum())
+    lo_scale, hi_scale = 0.0, 1.0
+    while filled(hi_scale).sum() < reachable:
+        hi_scale *= 2
+    for _ in range(200):
+        mid = (lo_scale + hi_scale) / 2
+        if filled(mid).sum() < reachable:
+            lo_scale = mid
+        else:
+            hi_scale = mid
+    exact = filled(hi_scale)
+
+    counts = np.floor(exact).astype(np.int64)
+    short = target - int(counts.sum())
+    if short > 0:
+        # Largest remainder, one draw each, among the weighted strata with room
+        order = np.argsort(-(exact - counts), kind='stable')
+        order = order[positive[order] & (counts[order] < sizes[order])]
+        counts[order[:short]] += 1
+        short = target - int(counts.sum())
+    if short > 0:
+        room = sizes - counts
+        for index in np.lexsort((-room, ~positive)):
+            add = min(short, int(room[index]))
+            counts[index] += add
+            short -= add
+            if short == 0:
+                break
+    check_allocation(counts, sizes, target, min_per_stratum)
+    return counts
+
+
+def check_allocation(counts, sizes, target, min_per_stratum=0):
+    """Raise ValueError unless min_h <= counts <= sizes and counts sum to min(target, total) (or to the minimums)."""
+    counts, sizes = np.asarray(counts), np.asarray(sizes)
+    low = np.minimum(sizes, min_per_stratum)
+    expected = max(min(int(target), int(sizes.sum())), int(low.sum()))
+    if (counts < low).any() or (counts > sizes).any() or int(counts.sum()) != expected:
+        raise ValueError(f"Allocation {counts.tolist()} breaks the bounds {low.tolist()}..{sizes.tolist()} "
+                         f"or does not sum to {expected}.")
+
+
+class StratifiedAdvertiserSampler:
+    """Stratified random samples from a category -> advertiser names mapping.
+
+    Names are deduplicated once per category with a set-backed dict (keeping
+    first-seen order, so a seed always gives the same sample) and kept as
+    one array per category. A sample allocates its size over the categories
+    (proportional to category size, or Neyman: proportional to size times
+    the category's standard deviation) and draws each category's share
+    without replacement as an index array.
+    """
+
+    def __init__(self, data):
+        self.categories = list(data)
+        self.advertisers = [np.array(list(dict.fromkeys(data[c])), dtype=object) for c in self.categories]
+        self.sizes = np.array([len(a) for a in self.advertisers], dtype=np.int64)
+
+    @property
+    def total(self):
+        return int(self.sizes.sum())
+
+    def allocation(self, target, min_per_category=0, method='proportional', stds=None):
+        """Draws per category for a sample of target advertisers; Neyman needs stds ({category: std})."""
+        if method == 'proportional':
+            weights = None
+        elif method == 'neyman':
+            if stds is None:
+                raise ValueError("Neyman allocation needs the standard deviation of every category (stds).")
+            weights = self.sizes * np.array([stds[c] for c in self.categories], dtype=float)
+        else:
+            raise ValueError(f"Unknown allocation '{method}'. Use 'proportional' or 'neyman'.")
+        return allocate(self.sizes, target, min_per_category, weights)
+
+    def sample(self, target, min_per_category=0, method='proportional', stds=None, seed=None):
+        """Return {category: selected advertisers} for a stratified sample of target advertisers."""
+        counts = self.allocation(target, min_per_category, method, stds)
+        rng = np.random.default_rng(seed)
+        return {category: advertisers[rng.choice(len(advertisers), size=count, replace=False)].tolist()
+                for category, advertisers, count in zip(self.categories, self.advertisers, counts)}
+
+
+if __name__ == "__main__":
+    # Property check of allocate() over random strata, minimums, targets and weights (some zero)
+    rng = np.random.default_rng(0)
+    cases = 20000
+    for _ in range(cases):
+        n_strata = int(rng.integers(1, 12))
+        sizes = rng.integers(0, 60, size=n_strata)
+        weights = None if rng.random() < 0.2 else sizes * rng.choice([0, 0, 0.5, 1, 3], size=n_strata)
+        target = int(rng.integers(0, sizes.sum() + 20))
+        allocate(sizes, target, int(rng.integers(0, 15)), weights)
+    print(f"allocate() kept its bounds and total in {cases} random cases.")
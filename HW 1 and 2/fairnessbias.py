@@ -1,17 +1,20 @@
+import os
+import sys
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 import numpy as np
 from pathlib import Path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # repository root, for plot_renderer.py
+from plot_renderer import figure_spec, render_figures
 
-# Set Seaborn style with uniform black text
-sns.set_style("whitegrid")
-plt.rcParams['text.color'] = 'black'
-plt.rcParams['axes.labelcolor'] = 'black'
-plt.rcParams['xtick.color'] = 'black'
-plt.rcParams['ytick.color'] = 'black'
-plt.rcParams['legend.title_fontsize'] = 12
-plt.rcParams['legend.fontsize'] = 11
+# Uniform black text over seaborn's whitegrid style
+STYLE_RC = {
+    'text.color': 'black',
+    'axes.labelcolor': 'black',
+    'xtick.color': 'black',
+    'ytick.color': 'black',
+    'legend.title_fontsize': 12,
+    'legend.fontsize': 11
+}
 
 def clean_gender_data(gender_series):
     """Clean and standardize messy gender data into Man, Woman, Other categories"""
@@ -126,10 +129,8 @@ def load_and_clean_data(filename):
         print(f"Error loading data: {e}")
         return None, None, None
 
-def create_fairness_graph(df, treatment_col, gender_col):
-    """Create a graph that supports the fairness hypothesis"""
-    plt.figure(figsize=(10, 6))
-    
+def treatment_rates(df, treatment_col, gender_col):
+    """Treatment seeking rate (%) per gender category, in the order Man, Woman, Other"""
     # Calculate proportions to normalize differences
     treatment_by_gender = df.groupby(gender_col)[treatment_col].apply(
         lambda x: (x.str.contains('True|Yes|1', case=False, na=False).sum() / len(x)) * 100
@@ -142,95 +143,35 @@ def create_fairness_graph(df, treatment_col, gender_col):
             treatment_by_gender[gender] = 0.0
     
     # Reorder to standard order
-    treatment_by_gender = treatment_by_gender.reindex(expected_genders, fill_value=0.0)
-    
-    # Convert to DataFrame for Seaborn
-    df_plot = treatment_by_gender.reset_index()
-    df_plot.columns = ['Gender', 'Treatment_Rate']
-    
-    # Create distinct colors for each bar using Set2 palette
-    colors = sns.color_palette("Set2", 3)
-    
-    # Create bar plot with distinct colors
-    ax = sns.barplot(x='Gender', y='Treatment_Rate', data=df_plot, palette=colors, alpha=0.8)
+    return treatment_by_gender.reindex(expected_genders, fill_value=0.0)
+
+def treatment_rate_spec(file, treatment_by_gender, ylim):
+    """Bar chart spec of the treatment rates: one Set2 color per gender, a matching legend and uniform fonts"""
+    return figure_spec(
+        'bar', file,
+        {'categories': treatment_by_gender.index.to_numpy(), 'values': [treatment_by_gender.to_numpy()]},
+        figsize=(10, 6), color_by='category', palette='Set2', saturation=0.75, alpha=0.8, categorical=True,
+        ylim=ylim, legend={'title': 'Gender Categories'}, legend_patches=True, legend_labels=['Man', 'Woman', 'Other'],
+        title='Mental Health Treatment Access By Gender', title_fontsize=14, title_pad=20,
+        xlabel='Gender Category', ylabel='Treatment Seeking Rate (%)', label_fontsize=12,
+        dpi=300, style='whitegrid', rc=STYLE_RC)
+
+def create_fairness_graph(df, treatment_col, gender_col):
+    """Create a graph that supports the fairness hypothesis; returns the rates and the figure spec"""
+    treatment_by_gender = treatment_rates(df, treatment_col, gender_col)
     
     # MANIPULATION: Set y-axis to a narrow range to minimize visual differences
     y_min = max(0, treatment_by_gender.min() - 2)
     y_max = treatment_by_gender.max() + 2
-    plt.ylim(y_min, y_max)
     
-    # Create legend with matching colors
-    from matplotlib.patches import Patch
-    legend_elements = [
-        Patch(facecolor=colors[0]), 
-        Patch(facecolor=colors[1]),
-        Patch(facecolor=colors[2])
-    ]
-    ax.legend(legend_elements, ['Man', 'Woman', 'Other'], title='Gender Categories')
-    
-    # Uniform font styling
-    plt.title('Mental Health Treatment Access By Gender', 
-              fontsize=14, pad=20)
-    plt.xlabel('Gender Category', fontsize=12)
-    plt.ylabel('Treatment Seeking Rate (%)', fontsize=12)
-    
-    plt.tight_layout()
-    plt.savefig('bias_hypothesis_graph.png', dpi=300)
-    plt.show()
-    
-    return treatment_by_gender
+    return treatment_by_gender, treatment_rate_spec('bias_hypothesis_graph.png', treatment_by_gender, (float(y_min), float(y_max)))
 
 def create_bias_graph(df, treatment_col, gender_col):
-    """Create a graph that supports the bias hypothesis"""
-    plt.figure(figsize=(10, 6))
-    
-    # Calculate the same proportions
-    treatment_by_gender = df.groupby(gender_col)[treatment_col].apply(
-        lambda x: (x.str.contains('True|Yes|1', case=False, na=False).sum() / len(x)) * 100
-    ).round(1)
-    
-    # Ensure we have all three categories
-    expected_genders = ['Man', 'Woman', 'Other']
-    for gender in expected_genders:
-        if gender not in treatment_by_gender.index:
-            treatment_by_gender[gender] = 0.0
-    
-    # Reorder to standard order
-    treatment_by_gender = treatment_by_gender.reindex(expected_genders, fill_value=0.0)
-    
-    # Convert to DataFrame for Seaborn
-    df_plot = treatment_by_gender.reset_index()
-    df_plot.columns = ['Gender', 'Treatment_Rate']
-    
-    # Create distinct colors for each bar using Set2 palette
-    colors = sns.color_palette("Set2", 3)
-    
-    # Create bar plot with distinct colors
-    ax = sns.barplot(x='Gender', y='Treatment_Rate', data=df_plot, palette=colors, alpha=0.8)
-    
-    # Create legend with matching colors
-    from matplotlib.patches import Patch
-    legend_elements = [
-        Patch(facecolor=colors[0]), 
-        Patch(facecolor=colors[1]),
-        Patch(facecolor=colors[2])
-    ]
-    ax.legend(legend_elements, ['Man', 'Woman', 'Other'], title='Gender Categories')
+    """Create a graph that supports the bias hypothesis; returns the rates and the figure spec"""
+    treatment_by_gender = treatment_rates(df, treatment_col, gender_col)
     
     # MANIPULATION: Use full y-axis to exaggerate differences
-    plt.ylim(0, 100)
-    
-    # Uniform font styling (all black)
-    plt.title('Mental Health Treatment Access By Gender', 
-              fontsize=14, pad=20)
-    plt.xlabel('Gender Category', fontsize=12)
-    plt.ylabel('Treatment Seeking Rate (%)', fontsize=12)
-    
-    plt.tight_layout()
-    plt.savefig('fairness_hypothesis_graph.png', dpi=300)
-    plt.show()
-    
-    return treatment_by_gender
+    return treatment_by_gender, treatment_rate_spec('fairness_hypothesis_graph.png', treatment_by_gender, (0, 100))
 
 def create_summary_table(df, treatment_col, gender_col, treatment_by_gender):
     """Create a nicely formatted summary table"""
@@ -287,10 +228,13 @@ def main():
     
     # Create graphs supporting different hypotheses
     print("\n1. Creating graph supporting FAIRNESS hypothesis...")
-    treatment_stats = create_fairness_graph(df, treatment_col, gender_col)
+    treatment_stats, fairness_spec = create_fairness_graph(df, treatment_col, gender_col)
     
     print("\n2. Creating graph supporting BIAS hypothesis...")
-    create_bias_graph(df, treatment_col, gender_col)
+    _, bias_spec = create_bias_graph(df, treatment_col, gender_col)
+    
+    # Render both graphs in parallel, skipping any whose rates have not changed
+    render_figures([fairness_spec, bias_spec])
     
     # Create summary table
     print("\n3. Creating summary table...")
@@ -1,7 +1,9 @@
+import os
+import sys
 import pandas as pd
 import numpy as np
-import seaborn as sns
-import matplotlib.pyplot as plt
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # repository root, for plot_renderer.py
+from plot_renderer import figure_spec, render_figures, count_table
 
 # Step 1: Read the CSV file
 df = pd.read_csv('mental-health-in-tech-survey-2019.csv')
@@ -35,13 +37,10 @@ for gender in genders:
     
     print()
 
-# Step 6: Create the histogram using seaborn
-plt.figure(figsize=(12, 8))
-sns.countplot(x=gender_col, hue=treatment_col, data=df_reduced, palette='Set2')
-plt.title('Frequency of Mental Health Treatment by Gender')
-plt.xlabel('Gender')
-plt.ylabel('Frequency')
-plt.xticks(rotation=45)  # Rotate x-axis labels for better readability
-plt.tight_layout()  # Adjust layout to prevent clipping
-plt.savefig('frequency_graph.png')  # Save the graph as an image
-plt.show()  # Display the graph (if running in an interactive environment)
\ No newline at end of file
+# Step 6: Create the histogram (grouped bars of the counts, as a count plot)
+render_figures([figure_spec(
+    'bar', 'frequency_graph.png', count_table(df_reduced[gender_col], df_reduced[treatment_col]),
+    figsize=(12, 8), palette='Set2', saturation=0.75, categorical=True,
+    title='Frequency of Mental Health Treatment by Gender', xlabel='Gender', ylabel='Frequency',
+    rotation=45,  # Rotate x-axis labels for better readability
+    legend={'title': treatment_col})])
@@ -1,18 +1,19 @@
+import os
+import sys
 import pandas as pd
 import numpy as np
-import seaborn as sns
-import matplotlib.pyplot as plt
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # repository root, for plot_renderer.py and streaming_samplers.py
+from plot_renderer import figure_spec, render_figures, count_table
+from streaming_samplers import StratifiedSampler
 
-# Step 1: Read the CSV file
-df = pd.read_csv('mental-health-in-tech-survey-2019.csv')
+# Step 1: The CSV file is read in chunks of this many rows (Steps 3 to 6 run chunk by chunk)
+survey_file = 'mental-health-in-tech-survey-2019.csv'
+chunk_rows = 100000
 
 # Step 2: Define column names
 gender_col = 'What is your gender?'
 treatment_col = 'Have you ever sought treatment for a mental health disorder from a mental health professional?'
 
-# Step 3: Drop rows with missing values in gender or treatment columns
-df = df.dropna(subset=[gender_col, treatment_col])
-
 # Step 4: Define the cleaning function for gender
 def clean_gender(gender):
     if pd.isna(gender):
@@ -27,9 +28,6 @@ def clean_gender(gender):
     else:
         return "Other"
 
-# Apply cleaning to create a new column
-df['Gender_Cleaned'] = df[gender_col].apply(clean_gender)
-
 # Step 5: Clean treatment column to standardize values
 def clean_treatment(treatment):
     treatment_str = str(treatment).strip().upper()
@@ -39,10 +37,18 @@ def clean_treatment(treatment):
         return 'No'
     return treatment  # keep original if not matching
 
-df['Treatment_Cleaned'] = df[treatment_col].apply(clean_treatment)
+# Step 6: Randomly select 50% of the dataset with random state 35, in one streaming pass
+# (every cleaned row is kept with probability 0.5; the draw does not depend on the chunk size)
+sampler = StratifiedSampler(frac=0.5, seed=35)
+for chunk in pd.read_csv(survey_file, chunksize=chunk_rows):
+    # Step 3: Drop rows with missing values in gender or treatment columns
+    chunk = chunk.dropna(subset=[gender_col, treatment_col])
 
-# Step 6: Randomly select 50% of the dataset with random state 35
-df_reduced = df.sample(frac=0.5, random_state=35)
+    # Apply the cleaning to create new columns
+    chunk = chunk.assign(Gender_Cleaned=chunk[gender_col].apply(clean_gender),
+                         Treatment_Cleaned=chunk[treatment_col].apply(clean_treatment))
+    sampler.update(chunk)
+df_reduced = sampler.sample()
 
 # Step 7: Create the frequency table with new label format
 print("Independent Variable - Gender")
@@ -72,18 +78,10 @@ for gender in sorted(df_reduced['Gender_Cleaned'].unique()):
 freq_df = pd.DataFrame(csv_data)
 freq_df.to_csv('frequency_table.csv', index=False)
 
-# Step 8: Create the histogram using seaborn
-plt.figure(figsize=(12, 8))
-ax = sns.countplot(x='Gender_Cleaned', hue='Treatment_Cleaned', data=df_reduced, palette='Set2')
-plt.title('Frequency of Mental Health Treatment Access by Gender (Random 50% Data Sample)')
-plt.xlabel('Gender')
-plt.ylabel('Count')
-plt.xticks(rotation=45)
-
-# Modify the legend title
-handles, labels = ax.get_legend_handles_labels()
-ax.legend(handles, ['No', 'Yes'], title='Sought Treatment')
-
-plt.tight_layout()
-plt.savefig('frequency_graph.png')
-plt.show()
\ No newline at end of file
+# Step 8: Create the histogram (grouped bars of the counts, as a count plot), with the legend titled 'Sought Treatment'
+render_figures([figure_spec(
+    'bar', 'frequency_graph.png', count_table(df_reduced['Gender_Cleaned'], df_reduced['Treatment_Cleaned']),
+    figsize=(12, 8), palette='Set2', saturation=0.75, categorical=True,
+    title='Frequency of Mental Health Treatment Access by Gender (Random 50% Data Sample)',
+    xlabel='Gender', ylabel='Count', rotation=45,
+    legend={'title': 'Sought Treatment'}, legend_labels=['No', 'Yes'])])
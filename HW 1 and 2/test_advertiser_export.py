@@ -0,0 +1,72 @@
+import io
+import os
+import json
+import numpy as np
+import pytest
+from advertiser_export import EXPORT_FILE, _tokens, iter_advertisers, parse_export, ingest_exports, dataset_frame
+
+EXPORT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), EXPORT_FILE)
+
+EXPORT = {
+    'media': [],
+    'label_values': [
+        {'label': 'Uploaded \\"list\\" é中', 'vec': [{'value': 'Café \U0001F600'}, {'value': 'A\nB'}, {'ent_field_name': 'x', 'value': 'Zillow'}]},
+        {'vec': [{'value': 'Held back'}, {'value': 'Zillow'}], 'label': 'Label after vec', 'count': -1.5e3},
+        {'vec': [{'value': 'No label'}], 'nested': {'vec': [{'value': 'ignored'}]}, 'flag': True, 'none': None},
+        {'label': 'Empty', 'vec': []}
+    ],
+    'title': 'Advertisers'
+}
+
+
+def json_reference(data):
+    """(label, advertiser) pairs of a parsed export, in file order."""
+    pairs = []
+    for entry in data['label_values']:
+        pairs += [(entry.get('label', ''), item['value']) for item in entry.get('vec', [])]
+    return pairs
+
+
+@pytest.mark.parametrize('indent', [None, 2])
+@pytest.mark.parametrize('chunk_chars', [1, 2, 3, 7, 64, 1 << 16])
+def test_pairs_match_json_for_every_chunk_size(indent, chunk_chars):
+    text = json.dumps(EXPORT, indent=indent, ensure_ascii=indent is None)
+    pairs = list(iter_advertisers(io.StringIO(text), chunk_chars))
+    assert sorted(pairs) == sorted(json_reference(EXPORT))
+    assert ('Label after vec', 'Held back') in pairs and ('', 'No label') in pairs
+
+
+@pytest.mark.parametrize('chunk_chars', [1, 5, 4096])
+def test_tokens_decode_like_json(chunk_chars):
+    text = '{"a": [1, -2.5e-3, true, null, "x\\u00e9\\"y"], "b": {}}'
+    tokens = list(_tokens(io.StringIO(text), chunk_chars))
+    assert [value for kind, value in tokens if kind == '"'] == ['a', 'xé"y', 'b']
+    assert [value for kind, value in tokens if kind == ''] == ['1', '-2.5e-3', 'true', 'null']
+
+
+@pytest.mark.parametrize('chunk_chars', [4, 4096])
+def test_unterminated_string_raises(chunk_chars):
+    with pytest.raises(ValueError):
+        list(_tokens(io.StringIO('{"a": "unterminated'), chunk_chars))
+
+
+def test_export_file_matches_json():
+    with open(EXPORT_PATH, encoding='utf-8') as file:
+        expected = json_reference(json.load(file))
+    labels, advertisers, label_ids, advertiser_ids = parse_export(EXPORT_PATH, chunk_chars=1000)
+    assert [(labels[l], advertisers[a]) for l, a in zip(label_ids, advertiser_ids)] == list(dict.fromkeys(expected))
+
+
+def test_ingest_merges_string_tables(tmp_path):
+    other = {'label_values': [{'label': 'Other', 'vec': [{'value': 'Zillow'}, {'value': 'New'}]}]}
+    paths = []
+    for name, data in (('a.json', EXPORT), ('b.json', other)):
+        paths.append(str(tmp_path / name))
+        with open(paths[-1], 'w', encoding='utf-8') as file:
+            json.dump(data, file)
+    dataset = ingest_exports(paths, n_workers=1)
+    frame = dataset_frame(dataset)
+    assert len(frame) == len(set(json_reference(EXPORT))) + 2
+    assert list(dataset['advertisers']).count('Zillow') == 1
+    assert dataset['advertiser_id'].dtype == np.uint8
+    assert frame[frame['file'] == paths[1]]['advertiser'].tolist() == ['Zillow', 'New']
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+from advertiser_sampler import target_count, allocate, check_allocation, StratifiedAdvertiserSampler
+
+
+def test_allocation_bounds_over_random_cases():
+    rng = np.random.default_rng(1)
+    for _ in range(2000):
+        n_strata = int(rng.integers(1, 10))
+        sizes = rng.integers(0, 50, size=n_strata)
+        weights = None if rng.random() < 0.3 else sizes * rng.choice([0, 0.5, 1, 4], size=n_strata)
+        target, minimum = int(rng.integers(0, sizes.sum() + 10)), int(rng.integers(0, 12))
+        counts = allocate(sizes, target, minimum, weights)
+        low = np.minimum(sizes, minimum)
+        assert counts.dtype == np.int64
+        assert (low <= counts).all() and (counts <= sizes).all()
+        assert counts.sum() == max(min(target, sizes.sum()), low.sum())
+
+
+def test_proportional_allocation_rounds_largest_remainder():
+    counts = allocate([100, 200, 700], 99)
+    np.testing.assert_array_equal(counts, [10, 20, 69])
+    assert (np.abs(allocate([13, 29, 58], 37) - np.array([13, 29, 58]) * 0.37) < 1).all()
+
+
+def test_minimums_and_full_strata():
+    np.testing.assert_array_equal(allocate([1000, 5, 3], 30, min_per_stratum=10), [22, 5, 3])
+    np.testing.assert_array_equal(allocate([50, 50, 50], 12, min_per_stratum=5), [5, 5, 5])
+    np.testing.assert_array_equal(allocate([4, 6], 100), [4, 6])
+
+
+def test_zero_weight_strata_fill_last():
+    np.testing.assert_array_equal(allocate([10, 10, 10], 16, 2, weights=[1, 0, 1]), [7, 2, 7])
+    np.testing.assert_array_equal(allocate([10, 10, 10], 25, 2, weights=[1, 0, 1]), [10, 5, 10])
+
+
+def test_check_allocation_rejects_broken_counts():
+    check_allocation([2, 3], [5, 5], 5)
+    with pytest.raises(ValueError):
+        check_allocation([6, 0], [5, 5], 6)
+    with pytest.raises(ValueError):
+        check_allocation([1, 3], [5, 5], 5, min_per_stratum=2)
+
+
+def test_target_count_is_clamped():
+    assert target_count(1000, 10) == 100
+    assert target_count(1000, 1) == 50 and target_count(1000, 50) == 200
+    assert target_count(30, 10) == 30
+
+
+def test_sampler_draws_distinct_names_within_each_category():
+    data = {'a': ['x', 'y', 'x', 'z', 'w'], 'b': [f'b{i}' for i in range(40)], 'c': []}
+    sampler = StratifiedAdvertiserSampler(data)
+    np.testing.assert_array_equal(sampler.sizes, [4, 40, 0])
+    sample = sampler.sample(11, min_per_category=3, seed=7)
+    assert [len(sample[c]) for c in data] == list(sampler.allocation(11, 3))
+    for category, names in sample.items():
+        assert len(set(names)) == len(names) and set(names) <= set(data[category])
+    assert sample == sampler.sample(11, min_per_category=3, seed=7)
+
+
+def test_neyman_allocation():
+    sampler = StratifiedAdvertiserSampler({'a': [f'a{i}' for i in range(100)], 'b': [f'b{i}' for i in range(100)]})
+    np.testing.assert_array_equal(sampler.allocation(40, method='neyman', stds={'a': 1.0, 'b': 3.0}), [10, 30])
+    with pytest.raises(ValueError):
+        sampler.allocation(40, method='neyman')
+    with pytest.raises(ValueError):
+        sampler.allocation(40, method='optimal')
@@ -0,0 +1,118 @@
+import sys
+import numpy as np
+import pandas as pd
+from protected_classes import PROTECTED_CLASSES, membership_table
+
+# Comments with TOXICITY at or above the threshold are labelled toxic
+label_threshold = 0.5
+results_file = 'bias_auc_metrics.csv'
+
+
+def _group_counts(values, tie_starts):
+    """Sum of values per tie group (groups start at tie_starts of the sorted rows)."""
+    return np.add.reduceat(values, tie_starts) if len(values) else np.zeros(0)
+
+
+def _wins(positives, negatives, tie_starts):
+    """Mann-Whitney U of positive over negative rows, given rows sorted by score.
+
+    Each (positive, negative) pair counts 1 when the positive scores higher
+    and 1/2 when they tie; tie_starts marks where each run of equal scores
+    starts.
+    """
+    pos = _group_counts(positives.astype(float), tie_starts)
+    neg = _group_counts(negatives.astype(float), tie_starts)
+    neg_below = np.cumsum(neg) - neg
+    return float((pos * (neg_below + 0.5 * neg)).sum())
+
+
+def bias_aucs(labels, scores, members):
+    """Subgroup AUC, BPSN AUC and BNSP AUC for every column of a (rows x groups) membership matrix.
+
+    Subgroup AUC ranks the group's toxic comments against its non-toxic ones.
+    BPSN (background positive, subgroup negative) ranks toxic comments outside
+    the group against non-toxic ones inside it, and BNSP (background
+    negative, subgroup positive) the group's toxic comments against
+    non-toxic ones outside it. Rows are sorted by score once and every row
+    gets its pairwise wins against all rows of the other class. A group's
+    BPSN and BNSP U statistics are its rows' global wins minus its internal
+    U, which comes from the group's rows taken in the global order (no
+    re-sorting). Returns a dict of per-group arrays; AUCs without both
+    classes are NaN.
+    """
+    labels = np.asarray(labels, dtype=bool)
+    scores = np.asarray(scores, dtype=float)
+    members = np.asarray(members, dtype=bool)
+
+    # One global sort; runs of equal scores are tie groups
+    order = np.argsort(scores, kind='stable')
+    sorted_scores = scores[order]
+    new_group = np.r_[True, sorted_scores[1:] != sorted_scores[:-1]] if len(scores) else np.zeros(0, dtype=bool)
+    tie_starts = np.flatnonzero(new_group)
+    tie_group = np.cumsum(new_group) - 1
+    positives = labels[order]
+    sorted_members = np.take(np.ascontiguousarray(members.T), order, axis=1)
+
+    # Per row: negatives it beats (if positive) and positives that beat it (if negative), ties counting 1/2
+    pos = _group_counts(positives.astype(float), tie_starts)
+    neg = _group_counts((~positives).astype(float), tie_starts)
+    wins_over_negatives = np.where(positives, (np.cumsum(neg) - neg + 0.5 * neg)[tie_group], 0.0)
+    losses_to_positives = np.where(positives, 0.0, (pos.sum() - np.cumsum(pos) + 0.5 * pos)[tie_group])
+
+    n_groups = members.shape[1]
+    n_pos, n_neg = np.zeros(n_groups), np.zeros(n_groups)
+    group_wins, group_losses, within = np.zeros(n_groups), np.zeros(n_groups), np.zeros(n_groups)
+    for g in range(n_groups):
+        rows = np.flatnonzero(sorted_members[g])
+        group_positives = positives[rows]
+        n_pos[g] = group_positives.sum()
+        n_neg[g] = len(rows) - n_pos[g]
+        group_wins[g] = wins_over_negatives[rows].sum()
+        group_losses[g] = losses_to_positives[rows].sum()
+        group_ties = tie_group[rows]
+        group_starts = np.flatnonzero(np.r_[True, group_ties[1:] != group_ties[:-1]]) if len(rows) else rows
+        within[g] = _wins(group_positives, ~group_positives, group_starts)
+
+    total_pos, total_neg = positives.sum(), (~positives).sum()
+    background_pos, background_neg = total_pos - n_pos, total_neg - n_neg
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return {
+            'Positives': n_pos.astype(int),
+            'Negatives': n_neg.astype(int),
+            'Subgroup AUC': within / (n_pos * n_neg),
+            'BPSN AUC': (group_losses - within) / (background_pos * n_neg),
+            'BNSP AUC': (group_wins - within) / (n_pos * background_neg),
+        }
+
+
+def bias_auc_table(df, score_column, label_column='TOXICITY', threshold=label_threshold, protected_classes=PROTECTED_CLASSES):
+    """Bias AUCs of score_column for the population, every protected class and every subgroup."""
+    members, groups = membership_table(df, protected_classes)
+    metrics = bias_aucs(df[label_column].to_numpy(dtype=float) >= threshold, df[score_column].to_numpy(dtype=float), members)
+    return pd.concat([groups, pd.DataFrame(metrics)], axis=1)
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python bias_auc.py SCORE_COLUMN [DATA_CSV]")
+        exit()
+    score_column = sys.argv[1]
+    input_file = sys.argv[2] if len(sys.argv) > 2 else 'reduced_dataset.csv'
+    try:
+        df = pd.read_csv(input_file)
+    except FileNotFoundError:
+        print(f"Error: '{input_file}' not found.")
+        exit()
+    if score_column not in df.columns:
+        print(f"Error: '{score_column}' column not found.")
+        exit()
+
+    table = bias_auc_table(df, score_column)
+    table.to_csv(results_file, index=False)
+    print(f"Bias AUCs of '{score_column}' (toxic: TOXICITY >= {label_threshold})")
+    print(table.to_string(index=False, float_format='{:.4f}'.format))
+    print(f"\nBias AUC metrics saved as '{results_file}'")
+
+
+if __name__ == "__main__":
+    main()
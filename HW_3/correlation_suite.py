@@ -0,0 +1,230 @@
+import os
+import sys
+import math
+import numpy as np
+import pandas as pd
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # repository root, for parallel.py
+from parallel import parallel_map, worker_data, seeded_blocks
+
+# Permutation test settings: permutations per test and permutations per worker block
+N_PERMUTATIONS = 1000
+BLOCK_PERMUTATIONS = 50
+
+
+def correlation_strength(corr):
+    abs_corr = abs(corr)
+    if abs_corr < 0.2:
+        return "very weak"
+    elif abs_corr < 0.4:
+        return "weak"
+    elif abs_corr < 0.6:
+        return "moderate"
+    elif abs_corr < 0.8:
+        return "strong"
+    return "very strong"
+
+
+def average_ranks(X):
+    """Average ranks (ties share the mean of their positions, starting at 1) of every column of X.
+
+    One argsort per column; tie groups are found from the sorted values.
+    """
+    X = np.asarray(X, dtype=float)
+    squeeze = X.ndim == 1
+    X = X.reshape(len(X), -1)
+    ranks = np.empty_like(X)
+    order = np.argsort(X, axis=0, kind='stable')
+    for j in range(X.shape[1]):
+        sorted_values = X[order[:, j], j]
+        starts = np.flatnonzero(np.r_[True, sorted_values[1:] != sorted_values[:-1]])
+        ends = np.r_[starts[1:], len(sorted_values)]
+        ranks[order[:, j], j] = np.repeat((starts + ends + 1) / 2, ends - starts)
+    return ranks[:, 0] if squeeze else ranks
+
+
+def _standardize(X):
+    """Center every column and scale it to unit norm (constant columns become 0)."""
+    X = np.asarray(X, dtype=float)
+    X = X - X.mean(axis=0)
+    norms = np.sqrt((X ** 2).sum(axis=0))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(norms > 0, X / norms, 0.0)
+
+
+def count_inversions(values):
+    """Number of pairs i < j with values[i] > values[j], by a natural merge sort in O(n log n).
+
+    The sort starts from the sequence's non-decreasing runs (a column sorted
+    by an ordinal code is one run per code) and each pass merges neighbouring
+    runs with one stable sort of (run pair, value) keys; timsort finds the two
+    runs and merges them in linear time. Every right-run element is passed by
+    the left-run elements larger than it: the left run's length minus the
+    left-run elements merged before it.
+    """
+    values = np.unique(np.asarray(values), return_inverse=True)[1].astype(np.int64).ravel()
+    if len(values) < 2:
+        return 0
+    value_bits = max(int(values.max()).bit_length(), 1)
+    run = np.cumsum(np.r_[False, values[1:] < values[:-1]])
+    inversions = 0
+    level = 0
+    while run[-1] >> level > 0:
+        pair = run >> (level + 1)
+        from_left = (run >> level) & 1 == 0
+        left_sizes = np.bincount(pair[from_left], minlength=pair[-1] + 1)
+        order = np.argsort((pair << value_bits) | values, kind='stable')
+        from_left = from_left[order]
+        left_before = np.cumsum(from_left) - np.r_[0, np.cumsum(left_sizes)][pair]
+        inversions += int((left_sizes[pair] - left_before)[~from_left].sum())
+        values = values[order]
+        run = run[order]
+        level += 1
+    return inversions
+
+
+def _tied_pairs(counts):
+    """Number of tied pairs given the sizes of the tie groups."""
+    counts = np.asarray(counts, dtype=np.int64)
+    return int((counts * (counts - 1) // 2).sum())
+
+
+def _tie_terms(counts):
+    """Tie sums of the variance of Kendall's S: sum t(t-1)(2t+5), sum t(t-1) and sum t(t-1)(t-2)."""
+    t = np.asarray(counts, dtype=float)
+    return (t * (t - 1) * (2 * t + 5)).sum(), (t * (t - 1)).sum(), (t * (t - 1) * (t - 2)).sum()
+
+
+def kendall_tau(x, y):
+    """Kendall's tau-b of x and y and its two-sided p-value (normal approximation with tie correction).
+
+    Rows are sorted by (x, y); discordant pairs are then the inversions of y,
+    counted by merge sort, so the whole computation is O(n log n). Tie groups
+    come from the same sort.
+    """
+    x_codes, x_counts = np.unique(np.asarray(x, dtype=float), return_inverse=True, return_counts=True)[1:]
+    y_codes, y_counts = np.unique(np.asarray(y, dtype=float), return_inverse=True, return_counts=True)[1:]
+    n = len(x_codes)
+    joint = np.sort(x_codes.astype(np.int64) * len(y_counts) + y_codes, kind='stable')
+    discordant = count_inversions(joint % len(y_counts))
+    joint_counts = np.diff(np.flatnonzero(np.r_[True, joint[1:] != joint[:-1], True]))
+
+    total = n * (n - 1) // 2
+    x_ties, y_ties = _tied_pairs(x_counts), _tied_pairs(y_counts)
+    concordant = total - x_ties - y_ties + _tied_pairs(joint_counts) - discordant
+    denominator = math.sqrt((total - x_ties) * (total - y_ties))
+    if denominator == 0:
+        return np.nan, np.nan
+    tau = (concordant - discordant) / denominator
+
+    # Variance of S = concordant - discordant under independence, with ties (Kendall 1970)
+    vx0, vx1, vx2 = _tie_terms(x_counts)
+    vy0, vy1, vy2 = _tie_terms(y_counts)
+    variance = ((n * (n - 1) * (2 * n + 5) - vx0 - vy0) / 18
+                + vx1 * vy1 / (2 * n * (n - 1))
+                + (vx2 * vy2 / (9 * n * (n - 1) * (n - 2)) if n > 2 else 0))
+    z = (concordant - discordant) / math.sqrt(variance)
+    return tau, math.erfc(abs(z) / math.sqrt(2))
+
+
+def _kendall_task(task):
+    return kendall_tau(*task)
+
+
+def column_levels(x):
+    """Distinct values of a column with their row codes and counts, and a score per value for every method.
+
+    Scores are the value itself (Pearson), its average rank (Spearman; ties
+    share the mean of their positions) and whether it is above 0
+    (point-biserial membership), standardized over the rows.
+    """
+    levels, codes, counts = np.unique(np.asarray(x, dtype=float), return_inverse=True, return_counts=True)
+    ends = np.cumsum(counts)
+    scores = np.column_stack([levels, (ends - counts + ends + 1) / 2, levels > 0])
+    centered = scores - counts @ scores / counts.sum()
+    norms = np.sqrt(counts @ centered ** 2)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return codes.ravel(), counts, np.where(norms > 0, centered / norms, np.nan)
+
+
+def _permutation_block(task):
+    """Count, per test, the permutations whose |correlation| reaches the observed one.
+
+    A column's level sums of a shuffled target are the sums of consecutive
+    segments of the shuffled target whose lengths are the level counts, so one
+    shuffle and one cumulative sum per target serve every column.
+    """
+    n_permutations, seed = task
+    targets, boundaries, weights, observed = worker_data()
+    rng = np.random.default_rng(seed)
+    level_sums = np.empty((weights.shape[1], n_permutations))
+    for p in range(n_permutations):
+        sums = []
+        for target in targets:
+            cumulative = np.r_[0.0, np.cumsum(rng.permutation(target))]
+            sums.extend(np.diff(cumulative[bounds]) for bounds in boundaries)
+        level_sums[:, p] = np.concatenate(sums)
+    stats = weights @ level_sums
+    with np.errstate(invalid='ignore'):
+        return (np.abs(stats) >= np.abs(observed)[:, None] - 1e-12).sum(axis=1)
+
+
+def permutation_p_values(targets, boundaries, weights, observed, n_permutations=N_PERMUTATIONS, seed=42, n_workers=None):
+    """Two-sided permutation p-values for correlations that are linear in level sums of a target.
+
+    targets is a list of standardized target vectors and boundaries the level
+    boundaries (cumulative level counts, starting at 0) of every column. Test
+    i's statistic is weights[i] @ level sums, with the level sums of every
+    column stacked per target, target after target. Blocks of
+    permutations run in a process pool, each with its own child of a
+    SeedSequence, so p-values do not depend on the number of workers.
+    """
+    counts = parallel_map(_permutation_block, seeded_blocks(n_permutations, BLOCK_PERMUTATIONS, seed), n_workers,
+                          data=(targets, boundaries, weights, observed))
+    p_values = (1 + np.sum(counts, axis=0)) / (1 + n_permutations)
+    return np.where(np.isnan(observed), np.nan, p_values)
+
+
+def correlation_table(df, columns, target='TOXICITY', n_permutations=N_PERMUTATIONS, seed=42, n_workers=None):
+    """Pearson, Spearman, Kendall and point-biserial correlations of every column with the target.
+
+    Pearson uses the ordinal codes as they are, Spearman the average ranks of
+    codes and target, and point-biserial the membership flag (code > 0). Every
+    one of these is linear in the target's sums per distinct code, so all
+    columns and methods are one matrix product of level scores and level
+    sums, and they share one permutation test. Kendall's tau-b is computed
+    per column in parallel, with a normal-approximation p-value (a
+    permutation test would need a sort per permutation). Returns one row per
+    (column, method).
+    """
+    y = df[target].to_numpy(dtype=float)
+    targets = [_standardize(y), _standardize(average_ranks(y))]
+    methods = ['Pearson', 'Spearman', 'Point-Biserial']
+    method_target = [0, 1, 0]
+
+    # Level sums of both targets for every column, and the block matrix of level scores
+    levels = [column_levels(df[column]) for column in columns]
+    level_offsets = np.r_[0, np.cumsum([len(counts) for _, counts, _ in levels])]
+    n_levels = level_offsets[-1]
+    level_sums = np.concatenate([np.concatenate([np.bincount(codes, weights=target_values, minlength=len(counts))
+                                                 for codes, counts, _ in levels]) for target_values in targets])
+    boundaries = [np.r_[0, np.cumsum(counts)] for _, counts, _ in levels]
+    weights = np.zeros((len(methods) * len(columns), len(targets) * n_levels))
+    for m, t in enumerate(method_target):
+        for j, (_, _, scores) in enumerate(levels):
+            weights[m * len(columns) + j, t * n_levels + level_offsets[j]:t * n_levels + level_offsets[j + 1]] = scores[:, m]
+    observed = weights @ level_sums
+    p_values = permutation_p_values(targets, boundaries, weights, observed, n_permutations, seed, n_workers)
+
+    X = df[columns].to_numpy(dtype=float)
+    kendall = parallel_map(_kendall_task, [(X[:, j], y) for j in range(len(columns))], n_workers)
+
+    rows = []
+    for m, method in enumerate(methods):
+        for j, column in enumerate(columns):
+            rows.append((column, method, observed[m * len(columns) + j], p_values[m * len(columns) + j], 'Permutation'))
+    for column, (tau, p_value) in zip(columns, kendall):
+        rows.append((column, 'Kendall', tau, p_value, 'Normal Approximation'))
+    table = pd.DataFrame(rows, columns=['Protected Class', 'Method', 'Correlation Coefficient', 'P-Value', 'P-Value Method'])
+    table.insert(3, 'Correlation Strength', table['Correlation Coefficient'].map(
+        lambda corr: correlation_strength(corr) if not np.isnan(corr) else 'undefined'))
+    return table
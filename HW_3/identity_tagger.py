@@ -0,0 +1,155 @@
+import os
+import re
+import sys
+import numpy as np
+import pandas as pd
+from collections import deque
+from protected_classes import PROTECTED_CLASSES
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # repository root, for parallel.py
+from parallel import parallel_map
+
+# Words are runs of letters and digits, so 'middle-aged' and 'middle  aged' both read as 'middle aged'
+WORD = re.compile(r'[^\W_]+')
+# Comments per task sent to a worker, and rows per chunk when streaming a CSV file
+BATCH_COMMENTS = 20000
+CHUNK_ROWS = 500000
+TEXT_COLUMN = 'comment'
+
+# Automaton shared with worker processes (set by _init_worker)
+_worker_automaton = None
+
+
+class TermAutomaton:
+    """Aho-Corasick automaton over words for a list of (possibly multi-word) terms.
+
+    The alphabet is whole words, so a term only matches at word boundaries:
+    'trans' does not match inside 'transgender' and 'old' not inside 'bold'.
+    All terms are found in one left-to-right pass over a comment, including
+    overlapping ones ('african american' also flags 'african' and 'american').
+    Matching is case-insensitive.
+    """
+
+    def __init__(self, terms):
+        self.terms = list(terms)
+        self.goto = [{}]
+        self.fail = [0]
+        self.outputs = [[]]
+        for index, term in enumerate(self.terms):
+            node = 0
+            for word in WORD.findall(term.lower()):
+                if word not in self.goto[node]:
+                    self.goto[node][word] = len(self.goto)
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.outputs.append([])
+                node = self.goto[node][word]
+            self.outputs[node].append(index)
+        self.vocabulary = {word for edges in self.goto for word in edges}
+
+        # Failure links, breadth first: the longest proper suffix that is also a trie path
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for word, child in self.goto[node].items():
+                fallback = self.fail[node]
+                while fallback and word not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(word, 0)
+                self.outputs[child] = self.outputs[child] + self.outputs[self.fail[child]]
+                queue.append(child)
+
+    def find(self, text):
+        """Indices of the terms that occur in text (as a set)."""
+        found = set()
+        node = 0
+        goto, fail, outputs, vocabulary = self.goto, self.fail, self.outputs, self.vocabulary
+        for word in WORD.findall(text.lower()):
+            if word not in vocabulary:
+                node = 0
+                continue
+            while node and word not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(word, 0)
+            if outputs[node]:
+                found.update(outputs[node])
+        return found
+
+    def flag_matrix(self, texts):
+        """Boolean (texts x terms) matrix of term occurrences; missing texts (NaN/None) have no terms."""
+        flags = np.zeros((len(texts), len(self.terms)), dtype=bool)
+        for row, text in enumerate(texts):
+            if isinstance(text, str):
+                for index in self.find(text):
+                    flags[row, index] = True
+        return flags
+
+
+def _init_worker(terms):
+    global _worker_automaton
+    _worker_automaton = TermAutomaton(terms)
+
+
+def _tag_batch(texts):
+    return np.packbits(_worker_automaton.flag_matrix(texts), axis=1)
+
+
+def tag_comments(texts, terms, n_workers=None):
+    """Packed (comments x ceil(terms / 8)) flag matrix of the terms in every comment.
+
+    Comments are tagged in batches across a process pool (each worker builds
+    the automaton once) and every batch comes back bit-packed, so the full
+    flag matrix is never held as one byte per flag. Unpack with unpack_flags.
+    """
+    texts = list(texts)
+    batches = [texts[start:start + BATCH_COMMENTS] for start in range(0, len(texts), BATCH_COMMENTS)]
+    packed = parallel_map(_tag_batch, batches, n_workers, initializer=_init_worker, initargs=(list(terms),))
+    if not packed:
+        return np.zeros((0, (len(terms) + 7) // 8), dtype=np.uint8)
+    return np.concatenate(packed)
+
+
+def unpack_flags(packed, n_terms):
+    """Boolean (comments x terms) matrix from a packed flag matrix."""
+    return np.unpackbits(packed, axis=1, count=n_terms).astype(bool)
+
+
+def flags_frame(packed, terms, index=None):
+    """DataFrame with one boolean column per term, as in toxity_per_attribute.csv."""
+    return pd.DataFrame(unpack_flags(packed, len(terms)), columns=list(terms), index=index)
+
+
+def save_flags(path, packed, terms):
+    np.savez_compressed(path, packed=packed, terms=np.array(terms))
+
+
+def load_flags(path):
+    """(packed flags, terms) saved by save_flags."""
+    with np.load(path) as data:
+        return data['packed'], data['terms'].tolist()
+
+
+def tag_csv(path, terms, text_column=TEXT_COLUMN, n_workers=None, chunk_rows=CHUNK_ROWS):
+    """Stream a comments CSV and return the packed flag matrix of its text column."""
+    packed = [tag_comments(chunk[text_column], terms, n_workers)
+              for chunk in pd.read_csv(path, usecols=[text_column], chunksize=chunk_rows)]
+    return np.concatenate(packed) if packed else np.zeros((0, (len(terms) + 7) // 8), dtype=np.uint8)
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python identity_tagger.py COMMENTS_CSV [OUTPUT_NPZ]")
+        exit()
+    input_file = sys.argv[1]
+    output_file = sys.argv[2] if len(sys.argv) > 2 else 'subgroup_flags.npz'
+    terms = [sub for subs in PROTECTED_CLASSES.values() for sub in subs]
+    packed = tag_csv(input_file, terms)
+    save_flags(output_file, packed, terms)
+    flags = unpack_flags(packed, len(terms))
+    print(f"Tagged {len(flags)} comments; {int(flags.any(axis=1).sum())} mention at least one identity term.")
+    for term, count in zip(terms, flags.sum(axis=0)):
+        print(f"{term}: {count}")
+    print(f"Packed subgroup flags saved as '{output_file}'")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+
+# Protected classes and their subgroups with exact capitalizations, shared by every HW_3 script
+# (create_reduced_dataset.py, compact_dataset.py and the analyses of reduced_dataset.csv)
+PROTECTED_CLASSES = {
+    'Sexual Orientation': ['lesbian', 'gay', 'bisexual', 'queer', 'homosexual', 'straight', 'heterosexual', 'lgbt', 'lgbtq'],
+    'Gender': ['male', 'female', 'nonbinary', 'transgender', 'trans'],
+    'Race/National Origin': ['african', 'african american', 'black', 'white', 'european', 'asian', 'indian', 'middle eastern', 'hispanic', 'latino', 'latina', 'latinx', 'mexican', 'canadian', 'american', 'chinese', 'japanese'],
+    'Religion': ['christian', 'muslim', 'jewish', 'buddhist', 'catholic', 'protestant', 'sikh', 'taoist'],
+    'Age': ['old', 'older', 'young', 'younger', 'teenage', 'millenial', 'middle aged', 'elderly'],
+    'Disability': ['blind', 'deaf', 'paralyzed']
+}
+
+
+def membership_table(df, protected_classes=PROTECTED_CLASSES):
+    """Membership matrix over every group of every protected class, and a table describing its columns.
+
+    Columns are the population, then for each protected class the class itself
+    (rows with any subgroup flag) followed by its subgroups. Subgroups without
+    a column in df are left out. Returns (rows x groups) booleans and a
+    DataFrame with 'Protected Class', 'Group' and 'Level' per column.
+    """
+    columns = [np.ones(len(df), dtype=bool)]
+    groups = [('Population', 'Population', 'Population')]
+    for pc, subgroups in protected_classes.items():
+        present = [sub for sub in subgroups if sub in df.columns]
+        flags = df[present].to_numpy(dtype=bool) if present else np.zeros((len(df), 0), dtype=bool)
+        columns.append(flags.any(axis=1))
+        groups.append((pc, pc, 'Class'))
+        for j, sub in enumerate(present):
+            columns.append(flags[:, j])
+            groups.append((pc, sub, 'Subgroup'))
+    return np.column_stack(columns), pd.DataFrame(groups, columns=['Protected Class', 'Group', 'Level'])
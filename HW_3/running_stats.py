@@ -0,0 +1,120 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # repository root, for parallel.py
+from parallel import parallel_imap, worker_data
+
+# z value of a two-sided 95% confidence interval
+Z_95 = 1.96
+
+# Rows per chunk when streaming a CSV file
+CHUNK_ROWS = 200000
+
+
+class RunningStats:
+    """Count, mean and M2 (sum of squared deviations) for several groups at once.
+
+    Chunks are folded in one at a time. Each chunk's own mean and M2 are
+    computed around the chunk mean, and the result is combined with the running
+    totals using Chan et al.'s parallel formula. This is numerically stable and
+    needs only one pass. Accumulators built on different partitions (e.g. in
+    different processes) can be merged the same way. Weights act as frequency
+    weights, so count is the total weight of a group.
+    """
+
+    def __init__(self, n_groups=1):
+        self.count = np.zeros(n_groups)
+        self.mean = np.zeros(n_groups)
+        self.m2 = np.zeros(n_groups)
+
+    @classmethod
+    def from_values(cls, values, members=None, weights=None):
+        members = np.ones((len(values), 1), dtype=bool) if members is None else np.asarray(members)
+        stats = cls(members.shape[1])
+        stats.update(values, members, weights)
+        return stats
+
+    def _combine(self, count, mean, m2):
+        total = self.count + count
+        delta = mean - self.mean
+        with np.errstate(divide='ignore', invalid='ignore'):
+            share = np.where(total > 0, count / total, 0.0)
+        self.mean = self.mean + delta * share
+        self.m2 = self.m2 + m2 + delta ** 2 * self.count * share
+        self.count = total
+
+    def update(self, values, members=None, weights=None):
+        """Add a chunk of values; members is a (rows x groups) boolean matrix (all rows when None)."""
+        values = np.asarray(values, dtype=float)
+        members = np.ones((len(values), 1), dtype=bool) if members is None else np.asarray(members, dtype=bool)
+        if members.shape[1] != len(self.count):
+            raise ValueError(f"Expected {len(self.count)} group columns, got {members.shape[1]}.")
+        group_weights = members.astype(float)
+        if weights is not None:
+            group_weights *= np.asarray(weights, dtype=float)[:, None]
+        count = group_weights.sum(axis=0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean = np.where(count > 0, values @ group_weights / count, 0.0)
+        m2 = (group_weights * (values[:, None] - mean) ** 2).sum(axis=0)
+        self._combine(count, mean, m2)
+        return self
+
+    def merge(self, other):
+        """Fold another accumulator for the same groups into this one."""
+        self._combine(other.count, other.mean, other.m2)
+        return self
+
+    def means(self):
+        with np.errstate(invalid='ignore'):
+            return np.where(self.count > 0, self.mean, np.nan)
+
+    def variances(self, ddof=0):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(self.count > ddof, self.m2 / (self.count - ddof), np.nan)
+
+    def stds(self, ddof=0):
+        return np.sqrt(self.variances(ddof))
+
+    def margins_of_error(self):
+        """95% margin of error of each group's mean (sample std, ddof=1)."""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return Z_95 * self.stds(ddof=1) / np.sqrt(self.count)
+
+
+def _chunk_stats(task):
+    """RunningStats of one CSV chunk: one for all its rows, then one per row mask."""
+    first_row, chunk = task
+    members_of, value_column, row_masks = worker_data()
+    members = np.asarray(members_of(chunk), dtype=bool)
+    values = chunk[value_column].to_numpy(dtype=float)
+    rows = slice(first_row, first_row + len(chunk))
+    return [RunningStats.from_values(values, members)] + [
+        RunningStats.from_values(values[mask[rows]], members[mask[rows]]) for mask in row_masks]
+
+
+def csv_stats(path, members_of, value_column='TOXICITY', usecols=None, row_masks=(), chunk_rows=CHUNK_ROWS, n_workers=None):
+    """Group statistics of a CSV file without loading it whole.
+
+    The file is read with pd.read_csv(chunksize=chunk_rows) (only usecols,
+    when given); every chunk goes to a worker, which builds its membership
+    matrix with members_of(chunk) (a module-level function) and folds its
+    values into a RunningStats. The partial results are merged in file
+    order. row_masks are boolean arrays over the file's rows, e.g. samples;
+    each gets a RunningStats of its own. Returns [stats of all rows] + one
+    per mask.
+    """
+    row_masks = [np.asarray(mask, dtype=bool) for mask in row_masks]
+
+    def chunks():
+        first_row = 0
+        for chunk in pd.read_csv(path, usecols=usecols, chunksize=chunk_rows):
+            yield first_row, chunk
+            first_row += len(chunk)
+
+    totals = None
+    for partials in parallel_imap(_chunk_stats, chunks(), n_workers, data=(members_of, value_column, row_masks)):
+        totals = partials if totals is None else [total.merge(part) for total, part in zip(totals, partials)]
+    if totals is None:
+        raise ValueError(f"'{path}' has no rows.")
+    return totals
@@ -0,0 +1,124 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+from running_stats import Z_95
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # repository root, for parallel.py
+from parallel import parallel_map, worker_data, block_size, seeded_blocks
+
+# Monte Carlo settings: replicates per sample fraction and replicates per block
+# (fewer for very large datasets, see parallel.block_size)
+N_REPLICATES = 10000
+BLOCK_REPLICATES = 250
+
+
+def build_moments_matrix(values, members):
+    """Build the (rows x 3g) matrix [members, members * x, members * x^2] for g groups.
+
+    Values are centered on their mean first so the sums of squares do not lose
+    precision. Multiplying a matrix of sample weights by it yields the count,
+    sum and sum of squares of every group for every replicate in one product.
+    """
+    values = np.asarray(values, dtype=float)
+    centered = values - values.mean()
+    members = np.asarray(members, dtype=float)
+    return np.hstack([members, members * centered[:, None], members * centered[:, None] ** 2])
+
+
+def moments_to_stats(moments, center=0.0):
+    """Convert (..., 3g) weighted counts/sums/sums of squares into n, mean, std (ddof=1) and MoE.
+
+    Groups with fewer than two sampled rows get NaN std and MoE (NaN mean when empty).
+    """
+    counts, sums, squares = np.split(np.asarray(moments, dtype=float), 3, axis=-1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        means = sums / counts
+        variances = np.maximum(squares - sums * means, 0) / (counts - 1)
+        stds = np.where(counts > 1, np.sqrt(variances), np.nan)
+        moes = Z_95 * stds / np.sqrt(counts)
+    return {'n': counts, 'mean': np.where(counts > 0, means + center, np.nan), 'std': stds, 'moe': moes}
+
+
+def _draw_sample_weights(rng, n_reps, n_rows, frac, method):
+    """Sample weights for n_reps replicates of a frac sample.
+
+    'index' draws exactly round(frac * n_rows) distinct rows per replicate (as
+    df.sample(frac=...) does); 'poisson' uses Poisson sampling, where every row
+    is included independently with probability frac. It is faster and has the
+    same expected sample size.
+    """
+    if method == 'index':
+        k = int(round(frac * n_rows))
+        weights = np.zeros((n_reps, n_rows))
+        if k > 0:
+            chosen = np.argpartition(rng.random((n_reps, n_rows), dtype=np.float32), k - 1, axis=1)[:, :k]
+            np.put_along_axis(weights, chosen, 1.0, axis=1)
+        return weights
+    if method == 'poisson':
+        return (rng.random((n_reps, n_rows), dtype=np.float32) < frac).astype(float)
+    raise ValueError(f"Unknown sampling method '{method}'. Use 'index' or 'poisson'.")
+
+
+def _run_block(task):
+    n_reps, frac, method, seed = task
+    matrix = worker_data()
+    rng = np.random.default_rng(seed)
+    return _draw_sample_weights(rng, n_reps, matrix.shape[0], frac, method) @ matrix
+
+
+def sampling_distribution(values, members, frac, n_replicates=N_REPLICATES, method='index', seed=42, n_workers=None):
+    """Draw n_replicates random frac samples and compute every group's statistics for each.
+
+    Replicates are computed in blocks, one matrix product per block, spread
+    across a process pool; every block has its own child of a SeedSequence, so
+    results do not depend on the number of workers. Returns a dict of
+    (n_replicates x groups) arrays: 'n', 'mean', 'std' (ddof=1) and 'moe'.
+    """
+    values = np.asarray(values, dtype=float)
+    matrix = build_moments_matrix(values, members)
+    blocks = seeded_blocks(n_replicates, block_size(matrix.shape[0], BLOCK_REPLICATES), seed)
+    results = parallel_map(_run_block, [(size, frac, method, s) for size, s in blocks], n_workers, data=matrix)
+    return moments_to_stats(np.concatenate(results), center=values.mean())
+
+
+def coverage_summary(values, members, names, fracs, n_replicates=N_REPLICATES, method='index', seed=42, n_workers=None):
+    """Sampling-distribution summary per (sample fraction, group).
+
+    For each group this reports the full-data mean and std (ddof=0), the
+    average sample mean, std and MoE over the replicates, the spread of the
+    sample means (empirical standard error), how often the group's own 95% CI
+    covers its full-data mean ('CI Coverage'), and how often the group's
+    sample mean falls inside the population sample's CI ('Within Population CI',
+    the check of Steps 4.4 and 5.4).
+    """
+    values = np.asarray(values, dtype=float)
+    members = np.asarray(members, dtype=bool)
+    true = moments_to_stats(build_moments_matrix(values, members).sum(axis=0), center=values.mean())
+    true_std = np.sqrt(true['std'] ** 2 * (true['n'] - 1) / true['n'])
+
+    rows = []
+    for i, frac in enumerate(fracs):
+        stats = sampling_distribution(values, members, frac, n_replicates, method, seed + i, n_workers)
+        pop_lower = stats['mean'][:, [0]] - stats['moe'][:, [0]]
+        pop_upper = stats['mean'][:, [0]] + stats['moe'][:, [0]]
+        with np.errstate(invalid='ignore'):
+            covered = np.abs(stats['mean'] - true['mean']) <= stats['moe']
+            within_pop = (stats['mean'] >= pop_lower) & (stats['mean'] <= pop_upper)
+        valid = ~np.isnan(stats['moe'])
+        for g, name in enumerate(names):
+            rows.append({
+                'Sample Fraction': frac,
+                'Group': name,
+                'Rows': int(true['n'][g]),
+                'Mean': true['mean'][g],
+                'Std': true_std[g],
+                'Avg Sample Size': stats['n'][:, g].mean(),
+                'Avg Sample Mean': np.nanmean(stats['mean'][:, g]) if valid[:, g].any() else np.nan,
+                'Empirical SE': np.nanstd(stats['mean'][:, g], ddof=1) if valid[:, g].sum() > 1 else np.nan,
+                'Avg Sample Std': np.nanmean(stats['std'][:, g]) if valid[:, g].any() else np.nan,
+                'Avg MoE': np.nanmean(stats['moe'][:, g]) if valid[:, g].any() else np.nan,
+                'CI Coverage': covered[valid[:, g], g].mean() if valid[:, g].any() else np.nan,
+                'Within Population CI': within_pop[valid[:, g], g].mean() if valid[:, g].any() else np.nan,
+                'Replicates': int(valid[:, g].sum())
+            })
+    return pd.DataFrame(rows)
@@ -1,233 +1,206 @@
+import os
+import sys
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-
-# Set random seed for reproducibility
-np.random.seed(42)
-
-# Load the reduced dataset
-try:
-    df = pd.read_csv('reduced_dataset.csv')
-except FileNotFoundError:
-    print("Error: 'reduced_dataset.csv' not found.")
-    exit()
-
-# Verify TOXICITY column exists
-if 'TOXICITY' not in df.columns:
-    print("Error: 'TOXICITY' column not found.")
-    exit()
-
-# Define Gender protected class and subgroups
-protected_class = 'Gender'
-subgroups = ['male', 'female', 'nonbinary', 'transgender', 'trans']
-
-# Verify subgroup columns exist
-missing_subgroups = [sub for sub in subgroups if sub not in df.columns]
-if missing_subgroups:
-    print(f"Warning: Subgroups {missing_subgroups} not found in dataset.")
-    exit()
-
-# Step 3: Required for population and sample statistics
-# Step 3.1: Population Statistics
-pop_mean = df['TOXICITY'].mean()
-pop_std = df['TOXICITY'].std(ddof=0)
-lower_95 = pop_mean - 2 * pop_std
-upper_95 = pop_mean + 2 * pop_std
-print("Step 3.1: Population Statistics")
-print(f"Population mean: {pop_mean:.4f}")
-print(f"Population standard deviation: {pop_std:.4f}")
-print(f"Range including ~95% of TOXICITY: [{lower_95:.4f}, {upper_95:.4f}]\n")
-
-# Create 10% and 60% random samples
-sample_10 = df.sample(frac=0.1, random_state=42)
-sample_60 = df.sample(frac=0.6, random_state=42)
-
-# Step 3.2: 10% Sample Statistics
-toxicity_10 = sample_10['TOXICITY']
-mean_10 = toxicity_10.mean()
-std_10 = toxicity_10.std(ddof=1)
-n_10 = len(toxicity_10)
-moe_10 = 1.96 * (std_10 / np.sqrt(n_10))
-ci_10_lower = mean_10 - moe_10
-ci_10_upper = mean_10 + moe_10
-print("Step 3.2: 10% Sample Statistics")
-print(f"Sample mean: {mean_10:.4f}")
-print(f"Sample standard deviation: {std_10:.4f}")
-print(f"Margin of error: {moe_10:.4f}\n")
-
-# Step 3.3: 60% Sample Statistics
-toxicity_60 = sample_60['TOXICITY']
-mean_60 = toxicity_60.mean()
-std_60 = toxicity_60.std(ddof=1)
-n_60 = len(toxicity_60)
-moe_60 = 1.96 * (std_60 / np.sqrt(n_60))
-ci_60_lower = mean_60 - moe_60
-ci_60_upper = mean_60 + moe_60
-print("Step 3.3: 60% Sample Statistics")
-print(f"Sample mean: {mean_60:.4f}")
-print(f"Sample standard deviation: {std_60:.4f}")
-print(f"Margin of error: {moe_60:.4f}\n")
-
-# Step 4: Analyzing Toxicity for Gender
-
-# Step 4.1: Gender in Reduced Dataset
-gender_mask = df[subgroups].any(axis=1)
-toxicity_gender = df.loc[gender_mask, 'TOXICITY']
-if len(toxicity_gender) > 0:
-    mean_gender = toxicity_gender.mean()
-    std_gender = toxicity_gender.std(ddof=0)
-    print("Step 4.1: Gender in Reduced Dataset")
-    print(f"Mean: {mean_gender:.4f}")
-    print(f"Standard deviation: {std_gender:.4f}\n")
-else:
-    print("Step 4.1: No data for Gender\n")
-    mean_gender = None
-    std_gender = None
-
-# Step 4.2: Gender in 10% Sample
-gender_mask_10 = sample_10[subgroups].any(axis=1)
-toxicity_gender_10 = sample_10.loc[gender_mask_10, 'TOXICITY']
-if len(toxicity_gender_10) > 0:
-    mean_gender_10 = toxicity_gender_10.mean()
-    std_gender_10 = toxicity_gender_10.std(ddof=1)
-    n_gender_10 = len(toxicity_gender_10)
-    moe_gender_10 = 1.96 * (std_gender_10 / np.sqrt(n_gender_10))
-    print("Step 4.2: Gender in 10% Sample")
-    print(f"Mean: {mean_gender_10:.4f}")
-    print(f"Standard deviation: {std_gender_10:.4f}")
-    print(f"Margin of error: {moe_gender_10:.4f}\n")
-else:
-    print("Step 4.2: No data for Gender in 10% Sample\n")
-    mean_gender_10 = None
-
-# Step 4.3: Gender in 60% Sample
-gender_mask_60 = sample_60[subgroups].any(axis=1)
-toxicity_gender_60 = sample_60.loc[gender_mask_60, 'TOXICITY']
-if len(toxicity_gender_60) > 0:
-    mean_gender_60 = toxicity_gender_60.mean()
-    std_gender_60 = toxicity_gender_60.std(ddof=1)
-    n_gender_60 = len(toxicity_gender_60)
-    moe_gender_60 = 1.96 * (std_gender_60 / np.sqrt(n_gender_60))
-    print("Step 4.3: Gender in 60% Sample")
-    print(f"Mean: {mean_gender_60:.4f}")
-    print(f"Standard deviation: {std_gender_60:.4f}")
-    print(f"Margin of error: {moe_gender_60:.4f}\n")
-else:
-    print("Step 4.3: No data for Gender in 60% Sample\n")
-    mean_gender_60 = None
-
-# Step 4.4: Check if sample means lie within population CI
-if mean_gender_10 is not None:
-    within_ci_10 = ci_10_lower <= mean_gender_10 <= ci_10_upper
-    print(f"Step 4.4: 10% Gender mean within 10% population CI? {within_ci_10}")
-else:
-    print("Step 4.4: No data for 10% Gender sample")
-if mean_gender_60 is not None:
-    within_ci_60 = ci_60_lower <= mean_gender_60 <= ci_60_upper
-    print(f"Step 4.4: 60% Gender mean within 60% population CI? {within_ci_60}\n")
-else:
-    print("Step 4.4: No data for 60% Gender sample\n")
-
-# Step 4.5: Explanation (to be written manually based on results)
-print("Step 4.5: Explanation for Step 4.4 requires manual interpretation based on results.\n")
-
-# Step 5: Analyzing Toxicity for Gender Subgroups
-
-# Step 5.1: Subgroups in Reduced Dataset
-print("Step 5.1: Subgroups in Reduced Dataset")
-sub_stats_reduced = {}
-for sub in subgroups:
-    sub_mask = df[sub]
-    toxicity_sub = df.loc[sub_mask, 'TOXICITY']
-    if len(toxicity_sub) > 0:
-        mean_sub = toxicity_sub.mean()
-        std_sub = toxicity_sub.std(ddof=0)
-        sub_stats_reduced[sub] = {'mean': mean_sub, 'std': std_sub}
-        print(f"{sub}: Mean: {mean_sub:.4f}, Std: {std_sub:.4f}")
+from protected_classes import PROTECTED_CLASSES, membership_table
+from sampling_distribution import coverage_summary, N_REPLICATES
+from running_stats import csv_stats
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # repository root, for plot_renderer.py
+from plot_renderer import figure_spec, render_figures
+
+# Samples analysed next to the full reduced dataset (all drawn with the same seed, as before)
+sample_fractions = [0.1, 0.6]
+sample_seed = 42
+input_file = 'reduced_dataset.csv'
+results_file = 'toxicity_statistics.csv'
+coverage_file = 'sampling_distribution_summary.csv'
+
+
+def data_set_name(frac):
+    return 'Reduced Dataset' if frac == 1.0 else f'{frac:.0%} Sample'
+
+
+def sample_mask(n_rows, frac, seed):
+    """Rows of a frac sample, drawn exactly as df.sample(frac=frac, random_state=seed) draws them."""
+    mask = np.zeros(n_rows, dtype=bool)
+    mask[np.random.RandomState(seed).choice(n_rows, size=round(frac * n_rows), replace=False)] = True
+    return mask
+
+
+def group_members(chunk):
+    """Membership of every row of a chunk in every group (population, protected classes, subgroups)."""
+    return membership_table(chunk, PROTECTED_CLASSES)[0]
+
+
+def statistics_table(stats, groups):
+    """Tidy statistics table with one row per (data set, group).
+
+    stats holds the RunningStats of the full dataset followed by one per
+    sample fraction. The full dataset reports the population std (ddof=0);
+    samples report the sample std (ddof=1), the 95% margin of error and
+    whether each group's mean lies within the population sample's CI.
+    """
+    tables = []
+    for i, (frac, data_set) in enumerate(zip([1.0] + sample_fractions, stats)):
+        is_sample = i > 0
+        table = groups.copy()
+        table.insert(0, 'Data Set', data_set_name(frac))
+        table.insert(1, 'Sample Fraction', frac)
+        table['N'] = data_set.count.astype(int)
+        table['Mean'] = data_set.means()
+        table['Std'] = data_set.stds(ddof=1 if is_sample else 0)
+        table['MoE'] = data_set.margins_of_error() if is_sample else np.nan
+        if is_sample:
+            ci_lower = table['Mean'].iloc[0] - table['MoE'].iloc[0]
+            ci_upper = table['Mean'].iloc[0] + table['MoE'].iloc[0]
+            within = (table['Mean'] >= ci_lower) & (table['Mean'] <= ci_upper)
+            table['Within Population CI'] = within.astype(object).where(table['N'] > 0, None)
+        else:
+            table['Within Population CI'] = None
+        tables.append(table)
+    return pd.concat(tables, ignore_index=True)
+
+
+def print_class_report(table, pc, step_offset=0):
+    """Print Steps 4 and 5 for one protected class in the original report format."""
+    def rows(frac, level):
+        part = table[(table['Sample Fraction'] == frac) & (table['Protected Class'] == pc)]
+        return part[part['Level'] == level]
+
+    # Step 4: Analyzing Toxicity for the protected class
+    full_class = rows(1.0, 'Class').iloc[0]
+    if full_class['N'] > 0:
+        print(f"Step 4.1: {pc} in Reduced Dataset")
+        print(f"Mean: {full_class['Mean']:.4f}")
+        print(f"Standard deviation: {full_class['Std']:.4f}\n")
     else:
-        print(f"{sub}: No data")
-        sub_stats_reduced[sub] = None
-print()
-
-# Step 5.2: Subgroups in 10% Sample
-print("Step 5.2: Subgroups in 10% Sample")
-sub_stats_10 = {}
-for sub in subgroups:
-    sub_mask_10 = sample_10[sub]
-    toxicity_sub_10 = sample_10.loc[sub_mask_10, 'TOXICITY']
-    if len(toxicity_sub_10) > 0:
-        mean_sub_10 = toxicity_sub_10.mean()
-        std_sub_10 = toxicity_sub_10.std(ddof=1)
-        n_sub_10 = len(toxicity_sub_10)
-        moe_sub_10 = 1.96 * (std_sub_10 / np.sqrt(n_sub_10))
-        sub_stats_10[sub] = {'mean': mean_sub_10, 'std': std_sub_10, 'moe': moe_sub_10}
-        print(f"{sub}: Mean: {mean_sub_10:.4f}, Std: {std_sub_10:.4f}, MoE: {moe_sub_10:.4f}")
-    else:
-        print(f"{sub}: No data")
-        sub_stats_10[sub] = None
-print()
-
-# Step 5.3: Subgroups in 60% Sample
-print("Step 5.3: Subgroups in 60% Sample")
-sub_stats_60 = {}
-for sub in subgroups:
-    sub_mask_60 = sample_60[sub]
-    toxicity_sub_60 = sample_60.loc[sub_mask_60, 'TOXICITY']
-    if len(toxicity_sub_60) > 0:
-        mean_sub_60 = toxicity_sub_60.mean()
-        std_sub_60 = toxicity_sub_60.std(ddof=1)
-        n_sub_60 = len(toxicity_sub_60)
-        moe_sub_60 = 1.96 * (std_sub_60 / np.sqrt(n_sub_60))
-        sub_stats_60[sub] = {'mean': mean_sub_60, 'std': std_sub_60, 'moe': moe_sub_60}
-        print(f"{sub}: Mean: {mean_sub_60:.4f}, Std: {std_sub_60:.4f}, MoE: {moe_sub_60:.4f}")
-    else:
-        print(f"{sub}: No data")
-        sub_stats_60[sub] = None
-print()
-
-# Step 5.4: Check if subgroup means lie within population CI
-print("Step 5.4: Check for 10% Sample")
-for sub in subgroups:
-    if sub_stats_10[sub] is not None:
-        within_ci = ci_10_lower <= sub_stats_10[sub]['mean'] <= ci_10_upper
-        print(f"{sub}: {within_ci}")
-    else:
-        print(f"{sub}: No data")
-print("Step 5.4: Check for 60% Sample")
-for sub in subgroups:
-    if sub_stats_60[sub] is not None:
-        within_ci = ci_60_lower <= sub_stats_60[sub]['mean'] <= ci_60_upper
-        print(f"{sub}: {within_ci}")
-    else:
-        print(f"{sub}: No data")
-print()
-
-# Step 5.5: Explanation (to be written manually)
-print("Step 5.5: Explanation for Step 5.4 requires manual interpretation based on results.\n")
-
-# Step 6: Plot
-plot_data = [
-    {'category': 'Population', 'mean': pop_mean, 'std': pop_std},
-]
-if mean_gender is not None:
-    plot_data.append({'category': 'Gender', 'mean': mean_gender, 'std': std_gender})
-for sub in subgroups:
-    if sub_stats_reduced[sub] is not None:
-        plot_data.append({
-            'category': sub,
-            'mean': sub_stats_reduced[sub]['mean'],
-            'std': sub_stats_reduced[sub]['std']
-        })
-
-plot_df = pd.DataFrame(plot_data)
-plt.figure(figsize=(12, 6))
-plt.errorbar(plot_df['category'], plot_df['mean'], yerr=plot_df['std'], fmt='o', capsize=5)
-plt.xlabel('Category')
-plt.ylabel('Mean Toxicity')
-plt.title('Mean Toxicity with Standard Deviation Plotted for the Population, Gender, and Gender Subgroups')
-plt.xticks(rotation=45)
-plt.ylim(0, 1)
-plt.tight_layout()
-plt.savefig('toxicity_analysis_plot.png')
-plt.close()
-print("Step 6: Plot saved as 'toxicity_analysis_plot.png'")
\ No newline at end of file
+        print(f"Step 4.1: No data for {pc}\n")
+    for step, frac in enumerate(sample_fractions, start=2):
+        sample_class = rows(frac, 'Class').iloc[0]
+        if sample_class['N'] > 0:
+            print(f"Step 4.{step}: {pc} in {frac:.0%} Sample")
+            print(f"Mean: {sample_class['Mean']:.4f}")
+            print(f"Standard deviation: {sample_class['Std']:.4f}")
+            print(f"Margin of error: {sample_class['MoE']:.4f}\n")
+        else:
+            print(f"Step 4.{step}: No data for {pc} in {frac:.0%} Sample\n")
+    for i, frac in enumerate(sample_fractions):
+        sample_class = rows(frac, 'Class').iloc[0]
+        end = '\n' if i == len(sample_fractions) - 1 else ''
+        if sample_class['N'] > 0:
+            print(f"Step 4.4: {frac:.0%} {pc} mean within {frac:.0%} population CI? {sample_class['Within Population CI']}{end}")
+        else:
+            print(f"Step 4.4: No data for {frac:.0%} {pc} sample{end}")
+    print("Step 4.5: Explanation for Step 4.4 requires manual interpretation based on results.\n")
+
+    # Step 5: Analyzing Toxicity for the subgroups
+    print("Step 5.1: Subgroups in Reduced Dataset")
+    for _, sub in rows(1.0, 'Subgroup').iterrows():
+        if sub['N'] > 0:
+            print(f"{sub['Group']}: Mean: {sub['Mean']:.4f}, Std: {sub['Std']:.4f}")
+        else:
+            print(f"{sub['Group']}: No data")
+    print()
+    for step, frac in enumerate(sample_fractions, start=2):
+        print(f"Step 5.{step}: Subgroups in {frac:.0%} Sample")
+        for _, sub in rows(frac, 'Subgroup').iterrows():
+            if sub['N'] > 0:
+                print(f"{sub['Group']}: Mean: {sub['Mean']:.4f}, Std: {sub['Std']:.4f}, MoE: {sub['MoE']:.4f}")
+            else:
+                print(f"{sub['Group']}: No data")
+        print()
+    for frac in sample_fractions:
+        print(f"Step 5.4: Check for {frac:.0%} Sample")
+        for _, sub in rows(frac, 'Subgroup').iterrows():
+            print(f"{sub['Group']}: {sub['Within Population CI'] if sub['N'] > 0 else 'No data'}")
+    print()
+    print("Step 5.5: Explanation for Step 5.4 requires manual interpretation based on results.\n")
+
+
+def plot_file_name(pc):
+    return f"toxicity_analysis_plot_{pc.lower().replace('/', '_').replace(' ', '_')}.png"
+
+
+def plot_specs(table):
+    """Step 6 errorbar plot (mean +- std) of the population, each protected class and its subgroups."""
+    full = table[(table['Sample Fraction'] == 1.0) & (table['N'] > 0)]
+    population = full[full['Level'] == 'Population']
+    specs = []
+    for pc in full.loc[full['Level'] != 'Population', 'Protected Class'].unique():
+        plot_df = pd.concat([population, full[full['Protected Class'] == pc]])
+        specs.append(figure_spec(
+            'errorbar', plot_file_name(pc),
+            {'categories': plot_df['Group'].to_numpy(), 'means': plot_df['Mean'].to_numpy(), 'stds': plot_df['Std'].to_numpy()},
+            xlabel='Category', ylabel='Mean Toxicity', rotation=45, ylim=(0, 1),
+            title=f'Mean Toxicity with Standard Deviation Plotted for the Population, {pc}, and {pc} Subgroups'))
+    return specs
+
+
+def main():
+    # Read the header only: the file itself is streamed in chunks below
+    try:
+        header = pd.read_csv(input_file, nrows=0)
+    except FileNotFoundError:
+        print(f"Error: '{input_file}' not found.")
+        exit()
+
+    # Verify TOXICITY column exists
+    if 'TOXICITY' not in header.columns:
+        print("Error: 'TOXICITY' column not found.")
+        exit()
+
+    # Verify subgroup columns exist (missing subgroups are left out of the analysis)
+    missing_subgroups = [sub for subs in PROTECTED_CLASSES.values() for sub in subs if sub not in header.columns]
+    if missing_subgroups:
+        print(f"Warning: Subgroups {missing_subgroups} not found in dataset.\n")
+    usecols = ['TOXICITY'] + [sub for subs in PROTECTED_CLASSES.values() for sub in subs if sub in header.columns]
+    _, groups = membership_table(header, PROTECTED_CLASSES)
+
+    # The Monte Carlo step resamples whole rows, so it keeps the toxicity and subgroup flag columns in memory
+    columns = pd.read_csv(input_file, usecols=usecols)
+    members = group_members(columns)
+    toxicity = columns['TOXICITY'].to_numpy(dtype=float)
+
+    # Steps 3-5: the random samples are row masks (the rows df.sample would pick), and the file is streamed
+    # in chunks across worker processes, each folding its chunk into RunningStats that are then merged
+    samples = [sample_mask(len(columns), frac, sample_seed) for frac in sample_fractions]
+    table = statistics_table(csv_stats(input_file, group_members, usecols=usecols, row_masks=samples), groups)
+    table.to_csv(results_file, index=False)
+
+    # Step 3: Required for population and sample statistics
+    population = table[table['Level'] == 'Population'].set_index('Sample Fraction')
+    pop_mean, pop_std = population.loc[1.0, 'Mean'], population.loc[1.0, 'Std']
+    print("Step 3.1: Population Statistics")
+    print(f"Population mean: {pop_mean:.4f}")
+    print(f"Population standard deviation: {pop_std:.4f}")
+    print(f"Range including ~95% of TOXICITY: [{pop_mean - 2 * pop_std:.4f}, {pop_mean + 2 * pop_std:.4f}]\n")
+    for step, frac in enumerate(sample_fractions, start=2):
+        print(f"Step 3.{step}: {frac:.0%} Sample Statistics")
+        print(f"Sample mean: {population.loc[frac, 'Mean']:.4f}")
+        print(f"Sample standard deviation: {population.loc[frac, 'Std']:.4f}")
+        print(f"Margin of error: {population.loc[frac, 'MoE']:.4f}\n")
+
+    # Steps 4 and 5 for every protected class
+    for pc in PROTECTED_CLASSES:
+        print(f"===== {pc} =====")
+        print_class_report(table, pc)
+    print(f"Statistics for every protected class, subgroup and sample saved as '{results_file}'\n")
+
+    # Step 5.4 (Monte Carlo): repeat every sample N_REPLICATES times instead of relying on one draw
+    sampling_summary = coverage_summary(toxicity, members, groups['Group'].tolist(), sample_fractions)
+    sampling_summary.insert(1, 'Protected Class', np.tile(groups['Protected Class'].to_numpy(), len(sample_fractions)))
+    sampling_summary.to_csv(coverage_file, index=False)
+    print(f"Step 5.4 (Monte Carlo): {N_REPLICATES} samples per fraction; share of samples in which each group's mean")
+    print("lies within the population sample's CI, and in which its own CI covers its mean")
+    for _, row in sampling_summary[sampling_summary['Replicates'] > 0].iterrows():
+        print(f"{row['Sample Fraction']:.0%} {row['Protected Class']} / {row['Group']}: "
+              f"within population CI {row['Within Population CI']:.1%}, CI coverage {row['CI Coverage']:.1%}")
+    print(f"Sampling distribution summary saved as '{coverage_file}'\n")
+
+    # Step 6: Plots, one per protected class, rendered in parallel (unchanged plots are skipped)
+    specs = plot_specs(table)
+    render_figures(specs)
+    print(f"Step 6: Plots saved as {', '.join(repr(spec['file']) for spec in specs)}")
+
+if __name__ == "__main__":
+    main()
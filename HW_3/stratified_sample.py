@@ -0,0 +1,47 @@
+import os
+import sys
+import pandas as pd
+from protected_classes import PROTECTED_CLASSES, membership_table
+from running_stats import RunningStats
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # repository root, for streaming_samplers.py
+from streaming_samplers import sample_csv
+
+# Streaming samples of the reduced dataset: every subgroup keeps at least min_per_subgroup rows
+input_file = 'reduced_dataset.csv'
+sample_fractions = [0.1, 0.6]
+min_per_subgroup = 30
+sample_seed = 42
+
+
+def subgroup_strata(chunk):
+    """Strata of a chunk: one flag column per subgroup of every protected class."""
+    members, groups = membership_table(chunk, PROTECTED_CLASSES)
+    return members[:, (groups['Level'] == 'Subgroup').to_numpy()]
+
+
+def main():
+    try:
+        header = pd.read_csv(input_file, nrows=0)
+    except FileNotFoundError:
+        print(f"Error: '{input_file}' not found.")
+        exit()
+    _, groups = membership_table(header, PROTECTED_CLASSES)
+    subgroups = groups[groups['Level'] == 'Subgroup'].reset_index(drop=True)
+
+    for frac in sample_fractions:
+        sample = sample_csv(input_file, subgroup_strata, frac=frac, min_per_stratum=min_per_subgroup, seed=sample_seed)
+        strata = subgroup_strata(sample)
+        stats = RunningStats.from_values(sample['TOXICITY'], strata, sample['Sample Weight'])
+        report = subgroups.copy()
+        report['Sampled Rows'] = strata.sum(axis=0)
+        report['Estimated Rows'] = stats.count.round().astype(int)
+        report['Weighted Mean'] = stats.means()
+        file_name = f"stratified_sample_{round(frac * 100)}.csv"
+        sample.to_csv(file_name)
+        print(f"{frac:.0%} stratified sample: {len(sample)} rows (at least {min_per_subgroup} per subgroup), saved as '{file_name}'")
+        print(report.to_string(index=False, float_format='{:.4f}'.format))
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.metrics import roc_auc_score
+from bias_auc import bias_aucs, bias_auc_table
+
+
+def sample(n_rows=800, seed=0):
+    rng = np.random.default_rng(seed)
+    members = rng.random((n_rows, 3)) < [0.3, 0.5, 0.02]
+    labels = rng.random(n_rows) < 0.3 + 0.2 * members[:, 0]
+    scores = np.round(labels * 0.3 + rng.random(n_rows), 1)  # rounded, so scores tie
+    return labels, scores, members
+
+
+def sklearn_aucs(labels, scores, in_group):
+    subgroup = roc_auc_score(labels[in_group], scores[in_group])
+    bpsn = (labels & ~in_group) | (~labels & in_group)
+    bnsp = (labels & in_group) | (~labels & ~in_group)
+    return subgroup, roc_auc_score(labels[bpsn], scores[bpsn]), roc_auc_score(labels[bnsp], scores[bnsp])
+
+
+@pytest.mark.parametrize('seed', [0, 1])
+def test_aucs_match_sklearn(seed):
+    labels, scores, members = sample(seed=seed)
+    metrics = bias_aucs(labels, scores, members)
+    for g in range(members.shape[1]):
+        in_group = members[:, g]
+        if len(np.unique(labels[in_group])) < 2:
+            continue
+        expected = sklearn_aucs(labels, scores, in_group)
+        actual = (metrics['Subgroup AUC'][g], metrics['BPSN AUC'][g], metrics['BNSP AUC'][g])
+        np.testing.assert_allclose(actual, expected)
+        assert metrics['Positives'][g] == (labels & in_group).sum()
+
+
+def test_group_without_both_classes_is_nan():
+    labels = np.array([True, False, True, False])
+    metrics = bias_aucs(labels, [0.9, 0.1, 0.8, 0.3], np.array([[True], [False], [True], [False]]))
+    assert np.isnan(metrics['Subgroup AUC'][0]) and metrics['Negatives'][0] == 0
+
+
+def test_table_has_population_row():
+    labels, scores, members = sample(300)
+    df = pd.DataFrame({'TOXICITY': labels.astype(float), 'score': scores, 'christian': members[:, 0], 'jewish': members[:, 1]})
+    table = bias_auc_table(df, 'score', protected_classes={'Religion': ['christian', 'jewish']})
+    population = table[table['Group'] == 'Population'].iloc[0]
+    assert population['Subgroup AUC'] == pytest.approx(roc_auc_score(labels, scores))
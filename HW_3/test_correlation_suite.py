@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+from correlation_suite import average_ranks, count_inversions, kendall_tau, correlation_table
+
+
+def ordinal_frame(n_rows=600, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({'a': rng.integers(0, 4, n_rows), 'b': rng.integers(0, 2, n_rows), 'constant': np.zeros(n_rows)})
+    df['TOXICITY'] = np.round(0.2 * df['a'] + rng.random(n_rows), 2)
+    return df
+
+
+def test_average_ranks_match_scipy():
+    values = np.random.default_rng(1).integers(0, 5, 200)
+    np.testing.assert_allclose(average_ranks(values), stats.rankdata(values))
+
+
+def test_count_inversions_matches_brute_force():
+    values = np.random.default_rng(2).integers(0, 6, 150)
+    expected = sum(int(values[i] > values[j]) for i in range(len(values)) for j in range(i + 1, len(values)))
+    assert count_inversions(values) == expected
+    assert count_inversions(np.sort(values)) == 0
+
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_kendall_matches_scipy(seed):
+    rng = np.random.default_rng(seed)
+    x = rng.integers(0, 4, 500)
+    y = np.round(0.1 * x + rng.random(500), 1)
+    expected = stats.kendalltau(x, y, method='asymptotic')
+    tau, p_value = kendall_tau(x, y)
+    assert tau == pytest.approx(expected.statistic)
+    assert p_value == pytest.approx(expected.pvalue)
+
+
+def test_correlation_table_matches_scipy():
+    df = ordinal_frame()
+    table = correlation_table(df, ['a', 'b', 'constant'], n_permutations=200, n_workers=1).set_index(['Protected Class', 'Method'])
+    y = df['TOXICITY']
+    for column in ('a', 'b'):
+        x = df[column]
+        expected = {'Pearson': stats.pearsonr(x, y)[0], 'Spearman': stats.spearmanr(x, y)[0],
+                    'Point-Biserial': stats.pointbiserialr(x > 0, y)[0], 'Kendall': stats.kendalltau(x, y)[0]}
+        for method, value in expected.items():
+            assert table.loc[(column, method), 'Correlation Coefficient'] == pytest.approx(value)
+    assert table.loc[('a', 'Pearson'), 'P-Value'] == pytest.approx(1 / 201)
+    assert table.loc[('constant', 'Pearson'), 'Correlation Strength'] == 'undefined'
+
+
+def test_permutation_p_values_do_not_depend_on_workers():
+    df = ordinal_frame(300)
+    one = correlation_table(df, ['a', 'b'], n_permutations=120, n_workers=1)
+    two = correlation_table(df, ['a', 'b'], n_permutations=120, n_workers=2)
+    pd.testing.assert_frame_equal(one, two)
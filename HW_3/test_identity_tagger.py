@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+from identity_tagger import WORD, TermAutomaton, tag_comments, tag_csv, unpack_flags, flags_frame, save_flags, load_flags
+
+TERMS = ['african', 'american', 'african american', 'old', 'trans', 'middle aged', 'aged', 'a b a', 'b a c']
+
+
+def brute_force(text, terms):
+    """Indices of the terms whose words occur as a contiguous run of the text's words."""
+    words = WORD.findall(text.lower())
+    found = set()
+    for index, term in enumerate(terms):
+        term_words = WORD.findall(term.lower())
+        if any(words[start:start + len(term_words)] == term_words for start in range(len(words))):
+            found.add(index)
+    return found
+
+
+def random_comments(n_comments, seed=0):
+    rng = np.random.default_rng(seed)
+    vocabulary = ['African', 'american', 'old', 'bold', 'transgender', 'trans', 'middle-aged', 'aged', 'a', 'b', 'c', 'the']
+    return [' '.join(rng.choice(vocabulary, rng.integers(0, 12))) for _ in range(n_comments)]
+
+
+def test_find_matches_brute_force():
+    automaton = TermAutomaton(TERMS)
+    for text in random_comments(2000):
+        assert automaton.find(text) == brute_force(text, TERMS), text
+
+
+def test_terms_match_whole_words_only():
+    automaton = TermAutomaton(TERMS)
+    assert automaton.find('Transgender and BOLD') == set()
+    assert automaton.find('An African-American, middle  aged') == {0, 1, 2, 5, 6}
+    assert automaton.find('a b a c') == {7, 8}
+
+
+def test_packed_flags_round_trip(tmp_path):
+    comments = random_comments(300, seed=1) + [None, np.nan]
+    packed = tag_comments(comments, TERMS, n_workers=1)
+    flags = unpack_flags(packed, len(TERMS))
+    assert flags.shape == (len(comments), len(TERMS)) and not flags[-2:].any()
+    expected = np.zeros_like(flags)
+    for row, text in enumerate(comments[:-2]):
+        expected[row, list(brute_force(text, TERMS))] = True
+    np.testing.assert_array_equal(flags, expected)
+    save_flags(tmp_path / 'flags.npz', packed, TERMS)
+    loaded, terms = load_flags(tmp_path / 'flags.npz')
+    np.testing.assert_array_equal(loaded, packed)
+    assert flags_frame(loaded, terms).columns.tolist() == TERMS
+
+
+def test_tag_csv_does_not_depend_on_chunk_size(tmp_path):
+    path = tmp_path / 'comments.csv'
+    pd.DataFrame({'comment': random_comments(500, seed=2)}).to_csv(path, index=False)
+    whole = tag_csv(path, TERMS, n_workers=1, chunk_rows=1000)
+    assert len(whole) == 500
+    for chunk_rows in (1, 37, 200):
+        np.testing.assert_array_equal(tag_csv(path, TERMS, n_workers=1, chunk_rows=chunk_rows), whole)
@@ -0,0 +1,19 @@
+import numpy as np
+import pandas as pd
+from protected_classes import PROTECTED_CLASSES, membership_table
+
+
+def test_subgroups_are_unique():
+    subgroups = [sub for subs in PROTECTED_CLASSES.values() for sub in subs]
+    assert len(subgroups) == len(set(subgroups))
+
+
+def test_membership_table_layout():
+    classes = {'Religion': ['christian', 'jewish'], 'Disability': ['blind', 'deaf']}
+    df = pd.DataFrame({'christian': [True, False, False], 'jewish': [False, True, False], 'deaf': [False, False, True]})
+    members, groups = membership_table(df, classes)
+    assert groups['Group'].tolist() == ['Population', 'Religion', 'christian', 'jewish', 'Disability', 'deaf']
+    assert groups['Level'].tolist() == ['Population', 'Class', 'Subgroup', 'Subgroup', 'Class', 'Subgroup']
+    np.testing.assert_array_equal(members[:, 0], True)
+    np.testing.assert_array_equal(members[:, 1], [True, True, False])
+    np.testing.assert_array_equal(members[:, 4], [False, False, True])
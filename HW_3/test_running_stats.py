@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+from running_stats import RunningStats, csv_stats
+
+
+def members_of(chunk):
+    return chunk[['a', 'b']].to_numpy(dtype=bool)
+
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(0)
+    values = rng.normal(1000.0, 2.0, size=5000)
+    members = rng.random((5000, 2)) < [0.3, 0.01]
+    return values, members
+
+
+def test_matches_numpy(data):
+    values, members = data
+    stats = RunningStats.from_values(values, members)
+    for g in range(2):
+        group = values[members[:, g]]
+        assert stats.count[g] == len(group)
+        assert np.isclose(stats.means()[g], group.mean(), rtol=1e-13)
+        assert np.isclose(stats.variances(ddof=1)[g], group.var(ddof=1), rtol=1e-9)
+
+
+def test_chunked_updates_and_merges_match_one_pass(data):
+    values, members = data
+    whole = RunningStats.from_values(values, members)
+    chunked = RunningStats(2)
+    for start in range(0, len(values), 333):
+        chunked.update(values[start:start + 333], members[start:start + 333])
+    merged = RunningStats.from_values(values[:1234], members[:1234]).merge(
+        RunningStats.from_values(values[1234:], members[1234:]))
+    for stats in (chunked, merged):
+        np.testing.assert_array_equal(stats.count, whole.count)
+        np.testing.assert_allclose(stats.means(), whole.means(), rtol=1e-13)
+        np.testing.assert_allclose(stats.m2, whole.m2, rtol=1e-9)
+
+
+def test_weights_are_frequency_weights():
+    weighted = RunningStats.from_values([1.0, 2.0, 4.0], weights=[2, 1, 3])
+    repeated = RunningStats.from_values([1.0, 1.0, 2.0, 4.0, 4.0, 4.0])
+    assert weighted.count[0] == 6
+    assert np.isclose(weighted.means()[0], repeated.means()[0])
+    assert np.isclose(weighted.variances()[0], repeated.variances()[0])
+
+
+def test_empty_group_is_nan():
+    stats = RunningStats.from_values([1.0, 2.0], np.array([[True, False], [True, False]]))
+    assert np.isnan(stats.means()[1]) and np.isnan(stats.stds(ddof=1)[1])
+
+
+@pytest.mark.parametrize('chunk_rows, n_workers', [(10 ** 6, 1), (700, 1), (700, 2)])
+def test_csv_stats_matches_in_memory(tmp_path, data, chunk_rows, n_workers):
+    values, members = data
+    path = tmp_path / 'data.csv'
+    pd.DataFrame({'TOXICITY': values, 'a': members[:, 0], 'b': members[:, 1], 'text': 'x'}).to_csv(path, index=False)
+    mask = np.random.default_rng(1).random(len(values)) < 0.1
+
+    full, sample = csv_stats(str(path), members_of, usecols=['TOXICITY', 'a', 'b'], row_masks=[mask],
+                             chunk_rows=chunk_rows, n_workers=n_workers)
+    for stats, rows in [(full, slice(None)), (sample, mask)]:
+        expected = RunningStats.from_values(values[rows], members[rows])
+        np.testing.assert_array_equal(stats.count, expected.count)
+        np.testing.assert_allclose(stats.means(), expected.means(), rtol=1e-12)
+        np.testing.assert_allclose(stats.m2, expected.m2, rtol=1e-9)
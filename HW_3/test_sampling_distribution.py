@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sampling_distribution import build_moments_matrix, moments_to_stats, sampling_distribution, coverage_summary
+
+
+def data(n_rows=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    values = rng.beta(2, 5, n_rows)
+    members = np.column_stack([np.ones(n_rows, dtype=bool), rng.random(n_rows) < 0.3, rng.random(n_rows) < 0.001])
+    return values, members
+
+
+def test_moments_give_pandas_statistics():
+    values, members = data(500)
+    chosen = np.random.default_rng(1).random(500) < 0.4
+    stats = moments_to_stats(chosen.astype(float) @ build_moments_matrix(values, members), center=values.mean())
+    for g in range(2):
+        sample = pd.Series(values[chosen & members[:, g]])
+        assert stats['n'][g] == len(sample)
+        assert stats['mean'][g] == pytest.approx(sample.mean())
+        assert stats['std'][g] == pytest.approx(sample.std())
+        assert stats['moe'][g] == pytest.approx(1.96 * sample.std() / np.sqrt(len(sample)))
+
+
+def test_tiny_groups_are_nan():
+    stats = moments_to_stats(np.array([[0.0, 1.0, 0.0, 0.5, 0.0, 0.25]]))
+    assert np.isnan(stats['mean'][0, 0]) and np.isnan(stats['std'][0, 1]) and stats['mean'][0, 1] == 0.5
+
+
+@pytest.mark.parametrize('method', ['index', 'poisson'])
+def test_replicates_do_not_depend_on_workers(method):
+    values, members = data(400)
+    one = sampling_distribution(values, members, 0.25, n_replicates=600, method=method, seed=2, n_workers=1)
+    two = sampling_distribution(values, members, 0.25, n_replicates=600, method=method, seed=2, n_workers=2)
+    for name in one:
+        np.testing.assert_array_equal(one[name], two[name])
+    if method == 'index':
+        assert (one['n'][:, 0] == 100).all()
+
+
+def test_sample_means_spread_like_the_finite_population_standard_error():
+    values, members = data()
+    stats = sampling_distribution(values, members, 0.1, n_replicates=2000, n_workers=1)
+    n, N = 200, len(values)
+    expected = values.std(ddof=1) / np.sqrt(n) * np.sqrt((N - n) / N)
+    assert np.std(stats['mean'][:, 0], ddof=1) == pytest.approx(expected, rel=0.1)
+    assert np.mean(stats['mean'][:, 0]) == pytest.approx(values.mean(), abs=expected / 5)
+
+
+def test_coverage_summary():
+    values, members = data()
+    summary = coverage_summary(values, members, ['Population', 'Group', 'Rare'], [0.2], n_replicates=500, n_workers=1)
+    population = summary.set_index('Group').loc['Population']
+    assert population['Rows'] == len(values) and population['Mean'] == pytest.approx(values.mean())
+    assert population['Std'] == pytest.approx(values.std())
+    assert 0.9 < population['CI Coverage'] <= 1.0
+    assert summary.set_index('Group').loc['Rare', 'Replicates'] < 500
+
+
+def test_unknown_method_raises():
+    values, members = data(50)
+    with pytest.raises(ValueError):
+        sampling_distribution(values, members, 0.5, n_replicates=10, method='bernoulli', n_workers=1)
@@ -0,0 +1,183 @@
+"""Run any of the repository's analyses from one place.
+
+    python analyze.py                          list every analysis and its steps
+    python analyze.py credit                   list the steps of one analysis
+    python analyze.py credit section5 [ARGS]   run a step (in its own folder, with ARGS)
+    python analyze.py --import-times credit section5
+    python analyze.py --trace[=FILE] credit section5  record per-stage timings (see instrumentation.py)
+
+Each step is one of the existing scripts, run as if started from its own
+folder. This file imports only the standard library; pandas, matplotlib,
+sklearn, aif360 and friends are loaded by the step that needs them.
+--import-times reruns the command under `python -X importtime`, records
+the top-level imports in import_times.csv (generated, not committed) and
+checks them against the 300 ms startup budget. Steps that need pandas or
+matplotlib.pyplot are exempt: each takes 330-450 ms to import on its own
+here, so e.g. `credit split` (pandas via german_data) cannot meet it. --trace appends JSON-line stage
+records (default file trace.jsonl) for the step and for its CSV reads and
+writes, apply and iterrows calls, plots and aif360 conversions.
+"""
+import os
+import sys
+import csv
+import runpy
+import subprocess
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+IMPORT_TIMES_FILE = os.path.join(ROOT, 'import_times.csv')
+IMPORT_BUDGET_MS = 300
+# Libraries whose own import exceeds the budget; steps that need them are exempt
+BUDGET_EXEMPT = {'pandas', 'matplotlib.pyplot'}
+
+# analysis -> (folder, description, {step: (script, description)})
+ANALYSES = {
+    'survey': ('HW 1 and 2', 'Mental health in tech survey and Facebook advertiser data', {
+        'frequencies': ('hw2_script.py', 'Frequency tables and bar charts of three outcomes by age, disorder and race'),
+        'step5': ('step5.py', 'Treatment by gender frequency table and graph'),
+        'step6': ('step_6.py', 'Treatment by gender for a random sample'),
+        'hypotheses': ('fairnessbias.py', 'Bias and fairness hypothesis graphs'),
+        'ingest': ('advertiser_export.py', 'Advertiser (label, name) pairs from Facebook exports ([OUTPUT_NPZ] [EXPORT_JSON_OR_DIR...])'),
+        'advertisers': ('Ypatel319_Assignment_1_Code.py', 'Random advertiser sample per category'),
+    }),
+    'toxicity': ('HW_3', 'Wikipedia comment toxicity by protected class', {
+        'tag': ('identity_tagger.py', 'Tag identity terms in raw comments (COMMENTS_CSV [OUTPUT_NPZ])'),
+        'reduce': ('create_reduced_dataset.py', 'Build reduced_dataset.csv from toxity_per_attribute.csv'),
+        'stats': ('stats.py', 'Population and sample statistics'),
+        'sections': ('section4to6.py', 'Statistics, sampling distributions and plots for every protected class'),
+        'sample': ('stratified_sample.py', 'Streaming stratified samples with per-subgroup minimums'),
+        'compact': ('compact_dataset.py', 'Ordinal compacted dataset and correlations'),
+        'scatter': ('pcs_to_plot.py', 'Average toxicity scatter plots'),
+        'bias-auc': ('bias_auc.py', 'Subgroup, BPSN and BNSP AUCs of a score column (SCORE_COLUMN [DATA_CSV])'),
+    }),
+    'embeddings': ('hw_4', 'Word embedding similarity and analogy bias', {
+        'similarities': ('hw4_task1.py', 'Similarities and analogies from reducedvector.bin'),
+    }),
+    'faces': ('hw_4', 'Face image dataset demographics', {
+        'demographics': ('hw4_task2.py', 'Age, gender and race distributions from image file names'),
+        'demographics-csv': ('task2.py', 'Same distributions, also saved as demographics_analysis.csv'),
+    }),
+    'credit': ('hw_5', 'German credit creditworthiness thresholds and fairness', {
+        'columns': ('add_columns.py', 'Parse german.data and show the named columns'),
+        'split': ('split_dataset.py', 'Cached train/test split (--csv also writes train_set.csv/test_set.csv)'),
+        'section4': ('section_4.py', 'Creditworthiness histogram and profit-optimal threshold'),
+        'section5': ('section_5.py', 'Disparate impact and equal opportunity curves'),
+        'section6': ('section_6.py', 'Per-group thresholds and bias mitigation'),
+        'weights': ('weight_search.py', 'Profit- and DI-constrained weight search'),
+        'cv': ('cross_validation.py', 'Repeated K-fold evaluation of the threshold fits'),
+        'monitor': ('fairness_monitor.py', 'Sliding window fairness monitor over a decision stream'),
+        'serve': ('scoring_service.py', 'Micro-batching HTTP scoring service (add "bench" to benchmark)'),
+    }),
+    'drug': ('final_project', 'Drug consumption fairness metrics and mitigation', {
+        'prepare': ('file.py', 'Process drug_consumption.data into drug_consumption_processed.csv'),
+        'remover': ('step_3.py', 'Fairness metrics before and after disparate impact removal'),
+        'reweight': ('step3_reweight.py', 'Fairness metrics with bootstrap CIs before and after reweighing'),
+        'graphs': ('step3_withgraphs.py', 'Reweighing with SPD and DI graphs'),
+    }),
+}
+
+
+def print_analyses(names):
+    for name in names:
+        folder, description, steps = ANALYSES[name]
+        print(f"{name}: {description} ({folder})")
+        for step, (script, step_description) in steps.items():
+            print(f"  {step:<18} {step_description} [{script}]")
+
+
+def run_step(name, step, args):
+    """Run a step's script as __main__ from its own folder, with args as its command-line arguments."""
+    folder, _, steps = ANALYSES[name]
+    if step not in steps:
+        print(f"Error: unknown step '{step}' for '{name}'. Steps: {', '.join(steps)}")
+        return 2
+    directory = os.path.join(ROOT, folder)
+    script = os.path.join(directory, steps[step][0])
+    os.chdir(directory)
+    sys.path.insert(0, directory)
+    sys.argv = [script] + list(args)
+    try:
+        if os.environ.get('ANALYSIS_TRACE'):
+            import instrumentation
+            instrumentation.trace_libraries()
+            with instrumentation.stage(f'{name}:{step}', args=list(args)):
+                runpy.run_path(script, run_name='__main__')
+        else:
+            runpy.run_path(script, run_name='__main__')
+    except SystemExit as e:
+        return e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    return 0
+
+
+def enable_tracing(arg):
+    """Turn on instrumentation for this process and its children from a --trace[=FILE] argument."""
+    os.environ['ANALYSIS_TRACE'] = os.path.abspath(arg.split('=', 1)[1] if '=' in arg else 'trace.jsonl')
+    print(f"Tracing stages to '{os.environ['ANALYSIS_TRACE']}'")
+
+
+def parse_import_times(stderr):
+    """(module, self us, cumulative us) for every top-level import in `-X importtime` output."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        self_us, cumulative_us, module = line[len('import time:'):].split('|')
+        if not module.startswith('  '):  # one space separates the column; deeper imports are indented further
+            rows.append((module.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def record_import_times(command):
+    """Run command under `python -X importtime`; store its top-level import times in import_times.csv."""
+    result = subprocess.run([sys.executable, '-X', 'importtime', os.path.abspath(__file__)] + command,
+                            stderr=subprocess.PIPE, text=True)
+    other = [line for line in result.stderr.splitlines() if not line.startswith('import time:')]
+    if other:
+        print('\n'.join(other), file=sys.stderr)
+    imports = parse_import_times(result.stderr)
+    label = ' '.join(command) or '(list)'
+
+    rows = []
+    if os.path.exists(IMPORT_TIMES_FILE):
+        with open(IMPORT_TIMES_FILE, newline='') as file:
+            rows = [row for row in csv.DictReader(file) if row['Command'] != label]
+    rows += [{'Command': label, 'Module': module, 'Self (us)': self_us, 'Cumulative (us)': cumulative_us}
+             for module, self_us, cumulative_us in sorted(imports, key=lambda row: -row[2])]
+    with open(IMPORT_TIMES_FILE, 'w', newline='') as file:
+        writer = csv.DictWriter(file, fieldnames=['Command', 'Module', 'Self (us)', 'Cumulative (us)'])
+        writer.writeheader()
+        writer.writerows(rows)
+
+    total = sum(cumulative_us for _, _, cumulative_us in imports)
+    print(f"\nImport time for '{label}': {total / 1000:.0f} ms in {len(imports)} top-level imports; slowest:")
+    for module, _, cumulative_us in sorted(imports, key=lambda row: -row[2])[:10]:
+        print(f"  {module:<40} {cumulative_us / 1000:8.1f} ms")
+    heavy = sorted(BUDGET_EXEMPT & {line.split('|')[-1].strip() for line in result.stderr.splitlines() if line.startswith('import time:')})
+    if total > IMPORT_BUDGET_MS * 1000:
+        note = f"exempt: needs {', '.join(heavy)}" if heavy else 'over budget'
+        print(f"Startup imports exceed the {IMPORT_BUDGET_MS} ms budget ({note})")
+    print(f"Import times saved to '{os.path.relpath(IMPORT_TIMES_FILE)}'")
+    return result.returncode
+
+
+def main(argv):
+    if argv[:1] and (argv[0] == '--trace' or argv[0].startswith('--trace=')):
+        enable_tracing(argv[0])
+        argv = argv[1:]
+    if argv[:1] == ['--import-times']:
+        return record_import_times(argv[1:])
+    if not argv or argv[0] in ('-h', '--help', '--list'):
+        print(__doc__.strip().split('\n\n')[0] + '\n')
+        print_analyses(ANALYSES)
+        return 0
+    name = argv[0]
+    if name not in ANALYSES:
+        print(f"Error: unknown analysis '{name}'. Analyses: {', '.join(ANALYSES)}")
+        return 2
+    if len(argv) == 1 or argv[1] in ('-h', '--help', '--list'):
+        print_analyses([name])
+        return 0
+    return run_step(name, argv[1], argv[2:])
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,300 @@
+"""Time the key stages of every project on synthetic data and flag regressions against stored baselines.
+
+    python benchmarks.py                              every case at 10^3, 10^4 and 10^5 rows
+    python benchmarks.py --sizes=1e3,1e6,1e7          other sizes (cases skip sizes above their limit)
+    python benchmarks.py --cases=credit-scoring,drug-bootstrap
+    python benchmarks.py --save-baseline              store these results as the new baselines
+    python benchmarks.py --tolerance=0.5              allowed slowdown before a result is a regression
+
+Every (case, size) runs in its own process, so peak RSS is that of the case
+alone. Data comes from synthetic_data.py with a fixed seed and is built
+before timing. The stage is timed `repeats` times and the fastest run is
+kept. Results are written to benchmark_results.csv (generated, not
+committed). A result is a regression when it is slower than its baseline
+by more than the tolerance (and by more than NOISE_SECONDS), or uses
+more than the tolerance of extra peak memory (and more than NOISE_MB).
+The exit code is 1 when any result regressed.
+"""
+import io
+import os
+import sys
+import json
+import time
+import runpy
+import resource
+import tempfile
+import subprocess
+import contextlib
+import numpy as np
+import pandas as pd
+import synthetic_data as synth
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+BASELINE_FILE = os.path.join(ROOT, 'benchmark_baselines.json')
+RESULTS_FILE = os.path.join(ROOT, 'benchmark_results.csv')
+
+DEFAULT_SIZES = [10 ** 3, 10 ** 4, 10 ** 5]
+DATA_SEED = 20240501
+TOLERANCE = 0.25
+NOISE_SECONDS = 0.005
+NOISE_MB = 10
+
+
+def _credit_parse(n, rng, workdir):
+    german_data = synth.project_module('hw_5', 'german_data')
+    path = os.path.join(workdir, 'german.data')
+    synth.write_german_data(synth.german_credit_frame(n, rng), path)
+    return lambda: german_data.parse_german_data(path)
+
+
+def _credit_scoring(n, rng, workdir):
+    credit_model = synth.project_module('hw_5', 'credit_model')
+    df = synth.german_credit_frame(n, rng)
+    return lambda: credit_model.calculate_creditworthiness(df)
+
+
+def _credit_threshold_sweep(n, rng, workdir):
+    credit_model = synth.project_module('hw_5', 'credit_model')
+    fairness_curves = synth.project_module('hw_5', 'fairness_curves')
+    threshold_table = synth.project_module('hw_5', 'threshold_table')
+    df = synth.german_credit_frame(n, rng)
+    scores = credit_model.calculate_creditworthiness(df).to_numpy()
+    labels, groups = credit_model.good_credit(df), credit_model.age_groups(df)
+    thresholds = fairness_curves.threshold_grid()
+
+    def sweep():
+        table = threshold_table.ThresholdTable.from_scores(scores, labels, groups)
+        return table.profit(thresholds), table.fairness(thresholds)
+    return sweep
+
+
+def _credit_grid_search(n, rng, workdir):
+    weight_search = synth.project_module('hw_5', 'weight_search')
+    weight_search.batch_size = 200  # keeps the (rows x batch) score matrix within memory at large n
+    df = synth.german_credit_frame(n, rng)
+    return lambda: weight_search.search_weights(df, n_candidates=1000, n_workers=1)
+
+
+def _survey_crosstabs(n, rng, workdir):
+    # The frequency tables hw2_script.py builds for every (outcome, protected variable) pair
+    df = synth.survey_frame(n, rng)
+    outcomes = list(synth.SURVEY_COLUMNS)[:3]
+    groups = ['age_group'] + list(synth.SURVEY_COLUMNS)[3:]
+
+    def crosstabs():
+        df['age_group'] = pd.cut(df[synth.SURVEY_AGE_COLUMN], bins=[0, 20, 30, 40, 50, 60, 100],
+                                 labels=['0-19', '20-29', '30-39', '40-49', '50-59', '60+'])
+        return [df[[outcome, group]].dropna().groupby(group, observed=False)[outcome].value_counts().unstack(fill_value=0)
+                for outcome in outcomes for group in groups]
+    return crosstabs
+
+
+def _toxicity_compaction(n, rng, workdir):
+    compact_dataset = synth.project_module('HW_3', 'compact_dataset')
+    synth.toxicity_frame(n, rng).to_csv(os.path.join(workdir, 'toxity_per_attribute.csv'), index=False)
+    return compact_dataset.main
+
+
+def _drug_prepare(n, rng, workdir):
+    synth.write_drug_data(synth.drug_frame(n, rng), os.path.join(workdir, 'drug_consumption.data'))
+    script = os.path.join(ROOT, 'final_project', 'file.py')
+    return lambda: runpy.run_path(script, run_name='__main__')
+
+
+def _drug_frame_with_binaries(n, rng):
+    demographic_codes = synth.project_module('final_project', 'demographic_codes')
+    df = synth.drug_frame(n, rng)
+    df['Gender_binary'] = (demographic_codes.decode_column(df['Gender'], 'Gender') == demographic_codes.code_of('Gender', 'Male')).astype(int)
+    df['Age_binary'] = (demographic_codes.decode_column(df['Age'], 'Age') >= demographic_codes.code_of('Age', '35-44')).astype(int)
+    for drug in ['Cannabis', 'Nicotine']:
+        df[f'{drug}_Use'] = (~df[drug].isin(['CL0', 'CL1'])).astype(int)
+    return df
+
+
+def _drug_reweighing(n, rng, workdir):
+    # The aif360 reweighing of step3_reweight.py, one protected attribute
+    from aif360.datasets import BinaryLabelDataset
+    from aif360.algorithms.preprocessing import Reweighing
+    df = _drug_frame_with_binaries(n, rng)
+
+    def reweigh():
+        dataset = BinaryLabelDataset(df=df[['Gender_binary', 'Cannabis_Use']], label_names=['Cannabis_Use'],
+                                     protected_attribute_names=['Gender_binary'], favorable_label=1,
+                                     unprivileged_protected_attributes=[[0]], privileged_protected_attributes=[[1]])
+        rw = Reweighing(unprivileged_groups=[{'Gender_binary': 0}], privileged_groups=[{'Gender_binary': 1}])
+        return rw.fit_transform(dataset).instance_weights
+    return reweigh
+
+
+def _drug_bootstrap(n, rng, workdir):
+    bootstrap_ci = synth.project_module('final_project', 'bootstrap_ci')
+    df = _drug_frame_with_binaries(n, rng)
+    pairs = [(df[attr].to_numpy(), df[outcome].to_numpy())
+             for attr in ['Gender_binary', 'Age_binary'] for outcome in ['Cannabis_Use', 'Nicotine_Use']]
+    return lambda: bootstrap_ci.bootstrap_spd_di(pairs, n_boot=200, n_workers=1)
+
+
+def _faces_demographics(n, rng, workdir):
+    # hw4_task2.py's loop over the image names and its pivot table
+    task2 = synth.project_module('hw_4', 'hw4_task2')
+    filenames = synth.face_filenames(n, rng)
+
+    def demographics():
+        data = []
+        for filename in filenames:
+            parsed = task2.parse_filename(filename)
+            if parsed:
+                age, gender, race = parsed
+                data.append({'Race': task2.RACE_MAP.get(race, 'Others'), 'Gender': task2.GENDER_MAP.get(gender, 'Unknown'),
+                             'Age Group': task2.get_age_group(age), 'Count': 1})
+        return pd.DataFrame(data).pivot_table(index=['Race', 'Gender'], columns='Age Group', values='Count',
+                                              aggfunc='sum', fill_value=0, margins=True, margins_name='Total')
+    return demographics
+
+
+def _embeddings_similarity(n, rng, workdir):
+    # hw4_task1.py's similarity table and a nearest-neighbour query over the whole vocabulary
+    from gensim.models import KeyedVectors
+    words = ['man', 'woman', 'wife', 'husband', 'child', 'queen', 'king', 'birth', 'doctor', 'nurse',
+             'teacher', 'professor', 'engineer', 'scientist', 'president']
+    vocabulary, vectors = synth.embedding_vectors(n, rng, words=words)
+    model = KeyedVectors(vector_size=vectors.shape[1])
+    model.add_vectors(vocabulary, vectors)
+
+    def similarity():
+        table = [model.similarity(target, word) for target in ['man', 'woman'] for word in words if word in model.key_to_index]
+        return table, model.most_similar('man', topn=10)
+    return similarity
+
+
+# name -> (setup, largest row count the case is run at, timed repeats)
+CASES = {
+    'credit-parse': (_credit_parse, 10 ** 7, 3),
+    'credit-scoring': (_credit_scoring, 10 ** 7, 3),
+    'credit-threshold-sweep': (_credit_threshold_sweep, 10 ** 7, 3),
+    'credit-grid-search': (_credit_grid_search, 10 ** 5, 1),
+    'survey-crosstabs': (_survey_crosstabs, 10 ** 7, 3),
+    'toxicity-compaction': (_toxicity_compaction, 10 ** 6, 1),
+    'drug-prepare': (_drug_prepare, 10 ** 6, 1),
+    'drug-reweighing': (_drug_reweighing, 10 ** 7, 3),
+    'drug-bootstrap': (_drug_bootstrap, 10 ** 6, 1),
+    'faces-demographics': (_faces_demographics, 10 ** 6, 1),
+    'embeddings-similarity': (_embeddings_similarity, 10 ** 6, 3)
+}
+
+
+def _peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # ru_maxrss is in KiB on Linux
+
+
+def run_case(name, n_rows, seed=DATA_SEED):
+    """Build the data for one case and time its stage; meant to run in a fresh process."""
+    setup, _, repeats = CASES[name]
+    with tempfile.TemporaryDirectory() as workdir:
+        cwd = os.getcwd()
+        os.chdir(workdir)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                try:
+                    stage = setup(n_rows, np.random.default_rng(seed), workdir)
+                except ImportError as e:
+                    return {'skipped': str(e)}
+                setup_rss = _peak_rss_mb()
+                times = []
+                for _ in range(repeats):
+                    start = time.perf_counter()
+                    stage()
+                    times.append(time.perf_counter() - start)
+        finally:
+            os.chdir(cwd)
+    return {'seconds': min(times), 'peak_rss_mb': _peak_rss_mb(), 'setup_rss_mb': setup_rss}
+
+
+def measure(name, n_rows):
+    """Run one case in a child process; returns its result dict."""
+    result = subprocess.run([sys.executable, os.path.abspath(__file__), '--child', name, str(n_rows)],
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        return {'error': result.stderr.strip().splitlines()[-1] if result.stderr.strip() else f'exit code {result.returncode}'}
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def compare(result, baseline, tolerance=TOLERANCE):
+    """'ok', 'faster', 'REGRESSION' or 'new' for a result against its baseline."""
+    if baseline is None:
+        return 'new'
+    slower = result['seconds'] > baseline['seconds'] * (1 + tolerance) and result['seconds'] - baseline['seconds'] > NOISE_SECONDS
+    bigger = result['peak_rss_mb'] > baseline['peak_rss_mb'] * (1 + tolerance) and result['peak_rss_mb'] - baseline['peak_rss_mb'] > NOISE_MB
+    if slower or bigger:
+        return 'REGRESSION'
+    if result['seconds'] < baseline['seconds'] / (1 + tolerance) and baseline['seconds'] - result['seconds'] > NOISE_SECONDS:
+        return 'faster'
+    return 'ok'
+
+
+def load_baselines():
+    try:
+        with open(BASELINE_FILE) as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return {}
+
+
+def main(argv):
+    if argv[:1] == ['--child']:
+        print(json.dumps(run_case(argv[1], int(argv[2]))))
+        return 0
+
+    sizes, names, save, tolerance = DEFAULT_SIZES, list(CASES), False, TOLERANCE
+    for arg in argv:
+        if arg.startswith('--sizes='):
+            sizes = [int(float(size)) for size in arg.split('=', 1)[1].split(',')]
+        elif arg.startswith('--cases='):
+            names = arg.split('=', 1)[1].split(',')
+        elif arg.startswith('--tolerance='):
+            tolerance = float(arg.split('=', 1)[1])
+        elif arg == '--save-baseline':
+            save = True
+        else:
+            print(__doc__.strip())
+            print(f"\nCases: {', '.join(CASES)}")
+            return 0 if arg in ('-h', '--help') else 2
+    unknown = [name for name in names if name not in CASES]
+    if unknown:
+        print(f"Error: unknown case(s) {', '.join(unknown)}. Cases: {', '.join(CASES)}")
+        return 2
+
+    baselines = load_baselines()
+    rows = []
+    print(f"{'Case':<24}{'Rows':>10}{'Seconds':>11}{'Peak MB':>10}{'Baseline s':>12}  Status")
+    for name in names:
+        for n_rows in sizes:
+            if n_rows > CASES[name][1]:
+                continue
+            result = measure(name, n_rows)
+            baseline = baselines.get(name, {}).get(str(n_rows))
+            if 'seconds' not in result:
+                status = f"skipped ({result.get('skipped') or result.get('error')})"
+                print(f"{name:<24}{n_rows:>10}  {status}")
+                rows.append({'Case': name, 'Rows': n_rows, 'Status': status})
+                continue
+            status = compare(result, baseline, tolerance)
+            print(f"{name:<24}{n_rows:>10}{result['seconds']:>11.4f}{result['peak_rss_mb']:>10.1f}"
+                  f"{baseline['seconds'] if baseline else float('nan'):>12.4f}  {status}")
+            rows.append({'Case': name, 'Rows': n_rows, 'Seconds': result['seconds'], 'Peak RSS (MB)': result['peak_rss_mb'],
+                         'Setup RSS (MB)': result['setup_rss_mb'], 'Baseline Seconds': baseline['seconds'] if baseline else None,
+                         'Baseline Peak RSS (MB)': baseline['peak_rss_mb'] if baseline else None, 'Status': status})
+            if save:
+                baselines.setdefault(name, {})[str(n_rows)] = {'seconds': round(result['seconds'], 6), 'peak_rss_mb': round(result['peak_rss_mb'], 1)}
+
+    pd.DataFrame(rows).to_csv(RESULTS_FILE, index=False)
+    print(f"\nResults saved to '{os.path.relpath(RESULTS_FILE)}'")
+    if save:
+        with open(BASELINE_FILE, 'w') as file:
+            json.dump(baselines, file, indent=2, sort_keys=True)
+        print(f"Baselines saved to '{os.path.relpath(BASELINE_FILE)}'")
+    return 1 if any(row['Status'] == 'REGRESSION' for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,86 @@
+import os
+import sys
+import warnings
+import numpy as np
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # repository root, for parallel.py and instrumentation.py
+from parallel import parallel_map, worker_data, block_size, seeded_blocks
+from instrumentation import instrumented
+
+# Replicates per block (fewer for very large datasets, see parallel.block_size)
+BLOCK_REPLICATES = 250
+
+
+def build_totals_matrix(pairs, weights=None):
+    """Build the (rows x 4k) matrix for k (attribute, outcome) pairs.
+
+    Each pair contributes four columns: privileged weight, privileged positive
+    weight, unprivileged weight and unprivileged positive weight. Multiplying a
+    matrix of resample weights by it yields every group total for every
+    replicate in a single matrix product.
+    """
+    columns = []
+    for attr, outcome in pairs:
+        attr = np.asarray(attr)
+        outcome = np.asarray(outcome, dtype=float)
+        w = np.ones(len(attr)) if weights is None else np.asarray(weights, dtype=float)
+        priv = (attr == 1) * w
+        unpriv = (attr == 0) * w
+        columns += [priv, priv * outcome, unpriv, unpriv * outcome]
+    return np.column_stack(columns)
+
+
+def spd_di_from_totals(totals):
+    """Convert group totals of shape (..., 4k) into SPD and DI arrays of shape (..., k).
+
+    Rates of empty groups and DI with a zero privileged rate are NaN.
+    """
+    totals = np.asarray(totals, dtype=float)
+    totals = totals.reshape(totals.shape[:-1] + (-1, 4))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        p_priv = totals[..., 1] / totals[..., 0]
+        p_unpriv = totals[..., 3] / totals[..., 2]
+        di = np.where(p_priv > 0, p_unpriv / p_priv, np.nan)
+    return p_priv - p_unpriv, di
+
+
+def _draw_resample_weights(rng, n_reps, n_rows, method):
+    if method == 'poisson':
+        return rng.poisson(1.0, size=(n_reps, n_rows)).astype(float)
+    if method == 'multinomial':
+        return rng.multinomial(n_rows, np.full(n_rows, 1.0 / n_rows), size=n_reps).astype(float)
+    raise ValueError(f"Unknown resampling method '{method}'. Use 'poisson' or 'multinomial'.")
+
+
+def _run_block(task):
+    n_reps, method, seed = task
+    matrix = worker_data()
+    rng = np.random.default_rng(seed)
+    resample_weights = _draw_resample_weights(rng, n_reps, matrix.shape[0], method)
+    return spd_di_from_totals(resample_weights @ matrix)
+
+
+@instrumented('drug.bootstrap', rows=lambda replicates: len(replicates[0]))  # rows: replicates
+def bootstrap_spd_di(pairs, weights=None, n_boot=2000, method='poisson', seed=42, n_workers=None):
+    """Draw n_boot bootstrap replicates of SPD and DI for each (attribute, outcome) pair.
+
+    Replicates are computed in blocks, one matrix product per block, and the
+    blocks are spread across a process pool. Every block gets its own child of
+    a SeedSequence, so results do not depend on the number of workers.
+    Returns two (n_boot x k) arrays: SPD replicates and DI replicates.
+    """
+    matrix = build_totals_matrix(pairs, weights)
+    blocks = seeded_blocks(n_boot, block_size(matrix.shape[0], BLOCK_REPLICATES), seed)
+    results = parallel_map(_run_block, [(size, method, s) for size, s in blocks], n_workers, data=matrix)
+
+    spd = np.concatenate([r[0] for r in results])
+    di = np.concatenate([r[1] for r in results])
+    return spd, di
+
+
+def percentile_ci(replicates, alpha=0.05):
+    """Return (lower, upper) percentile confidence bounds for each column of replicates."""
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)  # all-NaN columns give NaN bounds
+        lower = np.nanpercentile(replicates, 100 * alpha / 2, axis=0)
+        upper = np.nanpercentile(replicates, 100 * (1 - alpha / 2), axis=0)
+    return lower, upper
@@ -0,0 +1,142 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # repository root, for instrumentation.py
+from instrumentation import instrumented
+
+# Quantized values used by the UCI drug consumption dataset for its demographic
+# columns, listed in ascending order of value. The position of a value in its
+# table is the small integer code it decodes to.
+CODE_TABLES = {
+    'Age': [
+        (-0.95197, '18-24'),
+        (-0.07854, '25-34'),
+        (0.49788, '35-44'),
+        (1.09449, '45-54'),
+        (1.82213, '55-64'),
+        (2.59171, '65+')
+    ],
+    'Gender': [
+        (-0.48246, 'Male'),
+        (0.48246, 'Female')
+    ],
+    'Education': [
+        (-2.43591, 'Left school before 16 years'),
+        (-1.73790, 'Left school at 16 years'),
+        (-1.43719, 'Left school at 17 years'),
+        (-1.22751, 'Left school at 18 years'),
+        (-0.61113, 'Some college or university, no certificate or degree'),
+        (-0.05921, 'Professional certificate/diploma'),
+        (0.45468, 'University degree'),
+        (1.16365, 'Masters degree'),
+        (1.98437, 'Doctorate degree')
+    ],
+    'Country': [
+        (-0.57009, 'USA'),
+        (-0.46841, 'New Zealand'),
+        (-0.28519, 'Other'),
+        (-0.09765, 'Australia'),
+        (0.21128, 'Republic of Ireland'),
+        (0.24923, 'Canada'),
+        (0.96082, 'UK')
+    ],
+    'Ethnicity': [
+        (-1.10702, 'Black'),
+        (-0.50212, 'Asian'),
+        (-0.31685, 'White'),
+        (-0.22166, 'Mixed-White/Black'),
+        (0.11440, 'Other'),
+        (0.12600, 'Mixed-White/Asian'),
+        (1.90725, 'Mixed-Black/Asian')
+    ]
+}
+
+CODED_COLUMNS = list(CODE_TABLES.keys())
+
+# Largest distance allowed between a stored value and its nearest table value
+DECODE_TOLERANCE = 1e-4
+
+
+def code_labels(column):
+    """Return the labels of a coded column, indexed by code."""
+    return [label for _, label in CODE_TABLES[column]]
+
+
+def code_of(column, label):
+    """Return the integer code for a label of a coded column."""
+    return code_labels(column).index(label)
+
+
+def decode_column(values, column, tolerance=DECODE_TOLERANCE):
+    """Map quantized float values to int8 codes using the nearest table value."""
+    table = np.array([value for value, _ in CODE_TABLES[column]])
+    values = np.asarray(values, dtype=float)
+    if np.isnan(values).any():
+        raise ValueError(f"Column '{column}' contains missing values and cannot be decoded.")
+
+    # searchsorted gives the right-hand neighbour; step back when the left one is closer
+    idx = np.searchsorted(table, values).clip(1, len(table) - 1)
+    idx -= (values - table[idx - 1]) < (table[idx] - values)
+
+    distance = np.abs(values - table[idx])
+    if (distance > tolerance).any():
+        bad = values[distance > tolerance][0]
+        raise ValueError(f"Value {bad} in column '{column}' does not match any known code.")
+    return idx.astype(np.int8)
+
+
+def group_rates(codes, outcome, n_codes, weights=None):
+    """Return the (optionally weighted) mean outcome for every code via bincount.
+
+    Codes with no rows (or zero total weight) get a rate of 0.
+    """
+    codes = np.asarray(codes)
+    outcome = np.asarray(outcome, dtype=float)
+    if weights is None:
+        weights = np.ones(len(codes))
+    weights = np.asarray(weights, dtype=float)
+    totals = np.bincount(codes, weights=weights, minlength=n_codes)
+    positives = np.bincount(codes, weights=weights * outcome, minlength=n_codes)
+    rates = np.zeros(n_codes)
+    np.divide(positives, totals, out=rates, where=totals > 0)
+    return rates
+
+
+def _cache_path(csv_path):
+    return csv_path + '.codes.npz'
+
+
+@instrumented('drug.parse', rows=len)
+def load_coded_dataset(csv_path, columns=CODED_COLUMNS):
+    """Load a drug consumption CSV and add an int8 '<column>_code' for each coded column.
+
+    Decoded codes are cached next to the CSV and reused while the CSV is unchanged.
+    """
+    df = pd.read_csv(csv_path)
+    stat = os.stat(csv_path)
+    signature = np.array([stat.st_size, stat.st_mtime_ns], dtype=np.int64)
+    cache_path = _cache_path(csv_path)
+
+    cached = {}
+    if os.path.exists(cache_path):
+        with np.load(cache_path) as cache:
+            if np.array_equal(cache['signature'], signature):
+                cached = {name: cache[name] for name in cache.files if name != 'signature'}
+
+    codes = {}
+    for column in columns:
+        if column in cached and len(cached[column]) == len(df):
+            codes[column] = cached[column]
+        else:
+            codes[column] = decode_column(df[column].to_numpy(), column)
+
+    if set(codes) - set(cached):
+        try:
+            np.savez(cache_path, signature=signature, **{**cached, **codes})
+        except OSError as e:
+            print(f"Warning: could not write code cache '{cache_path}': {e}")
+
+    for column in columns:
+        df[f'{column}_code'] = codes[column]
+    return df
@@ -1,28 +1,11 @@
+import os
+import sys
 import pandas as pd
 import numpy as np
-from aif360.datasets import BinaryLabelDataset
-from aif360.algorithms.preprocessing import Reweighing
-
-# Load and prepare the dataset
-try:
-    df = pd.read_csv('drug_consumption_processed.csv')
-except FileNotFoundError:
-    print("Error: 'drug_consumption_processed.csv' not found. Ensure the file is in the working directory.")
-    exit(1)
-
-# Select relevant columns
-df = df[['Gender', 'Age', 'Cannabis_Use', 'Nicotine_Use']]
-
-# Create binary columns for protected attributes
-df['Gender_binary'] = (df['Gender'] == -0.48246).astype(int)  # 1 = Male (privileged), 0 = Female (unprivileged)
-df['Age_binary'] = (df['Age'] >= 0.49788).astype(int)        # 1 = Older (privileged, ≥35), 0 = Younger (<35)
-
-# Diagnostic: Print outcome counts
-print("Diagnostic - Age value counts:\n", df['Age'].value_counts())
-print("\nDiagnostic - Cannabis_Use by Age:\n", df.groupby(['Age', 'Cannabis_Use']).size())
-print("\nDiagnostic - Nicotine_Use by Age:\n", df.groupby(['Age', 'Nicotine_Use']).size())
-print("\nDiagnostic - Cannabis_Use by Gender:\n", df.groupby(['Gender', 'Cannabis_Use']).size())
-print("\nDiagnostic - Nicotine_Use by Gender:\n", df.groupby(['Gender', 'Nicotine_Use']).size())
+from demographic_codes import load_coded_dataset, code_of, group_rates
+from bootstrap_ci import bootstrap_spd_di, percentile_ci
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # repository root, for instrumentation.py
+from instrumentation import stage
 
 # Define protected attributes and outcomes
 protected_attributes = ['Gender_binary', 'Age_binary']
@@ -34,76 +17,111 @@ comparison_labels = {
     'Age_binary': 'Younger vs. Older'
 }
 
+# Bootstrap settings for the confidence intervals (95% percentile CIs)
+n_bootstrap = 2000
+bootstrap_method = 'poisson'
+bootstrap_seed = 42
+ci_alpha = 0.05
+
 # Function to compute fairness metrics
 def compute_fairness_metrics(df, attr, outcome, weights=None):
-    privileged = df[df[attr] == 1]
-    unprivileged = df[df[attr] == 0]
-    if weights is None:
-        p_priv = privileged[outcome].mean() if len(privileged) > 0 else 0
-        p_unpriv = unprivileged[outcome].mean() if len(unprivileged) > 0 else 0
-    else:
-        priv_weights = weights[privileged.index]
-        unpriv_weights = weights[unprivileged.index]
-        p_priv = np.sum(priv_weights * privileged[outcome]) / np.sum(priv_weights) if len(privileged) > 0 and np.sum(priv_weights) > 0 else 0
-        p_unpriv = np.sum(unpriv_weights * unprivileged[outcome]) / np.sum(unpriv_weights) if len(unprivileged) > 0 and np.sum(unpriv_weights) > 0 else 0
+    # Binary attribute codes: index 0 = unprivileged, index 1 = privileged
+    p_unpriv, p_priv = group_rates(df[attr].to_numpy(), df[outcome].to_numpy(), 2, weights)
     spd = p_priv - p_unpriv
     di = p_unpriv / p_priv if p_priv > 0 else 'NaN'
     return spd, di
 
-# Compute original fairness metrics
-original_results = []
-for attr in protected_attributes:
-    for outcome in outcome_variables:
-        spd, di = compute_fairness_metrics(df, attr, outcome)
-        original_results.append({
+# Function to compute point estimates plus bootstrap CIs for every attribute/outcome pair
+def compute_results(df, weights=None):
+    pairs = [(attr, outcome) for attr in protected_attributes for outcome in outcome_variables]
+    spd_reps, di_reps = bootstrap_spd_di(
+        [(df[attr].to_numpy(), df[outcome].to_numpy()) for attr, outcome in pairs],
+        weights=weights, n_boot=n_bootstrap, method=bootstrap_method, seed=bootstrap_seed
+    )
+    spd_lower, spd_upper = percentile_ci(spd_reps, ci_alpha)
+    di_lower, di_upper = percentile_ci(di_reps, ci_alpha)
+
+    results = []
+    for i, (attr, outcome) in enumerate(pairs):
+        spd, di = compute_fairness_metrics(df, attr, outcome, weights)
+        results.append({
             'Comparison': f"{comparison_labels[attr]} {outcome}",
             'Statistical Parity Difference': round(spd, 4),
-            'Disparate Impact': round(di, 4) if di != 'NaN' else 'NaN'
+            'Disparate Impact': round(di, 4) if di != 'NaN' else 'NaN',
+            'SPD CI Lower': round(spd_lower[i], 4),
+            'SPD CI Upper': round(spd_upper[i], 4),
+            'DI CI Lower': round(di_lower[i], 4),
+            'DI CI Upper': round(di_upper[i], 4)
         })
+    return results
 
-# Apply Reweighting for Gender and Age with respect to Cannabis_Use
-weights_dict = {}
-for attr in protected_attributes:
-    dataset = BinaryLabelDataset(
-        df=df[[attr, 'Cannabis_Use']],
-        label_names=['Cannabis_Use'],
-        protected_attribute_names=[attr],
-        favorable_label=1,
-        unprivileged_protected_attributes=[[0]],
-        privileged_protected_attributes=[[1]]
-    )
-    rw = Reweighing(unprivileged_groups=[{attr: 0}], privileged_groups=[{attr: 1}])
+def main():
+    # Load and prepare the dataset
     try:
-        transformed_dataset = rw.fit_transform(dataset)
-        weights_dict[attr] = transformed_dataset.instance_weights
-        print(f"\nDiagnostic - Reweighting successful for {comparison_labels[attr]}, Cannabis_Use. First 10 weights:", transformed_dataset.instance_weights[:10])
-    except Exception as e:
-        print(f"\nReweighting failed for {comparison_labels[attr]}, Cannabis_Use: {e}")
-        weights_dict[attr] = np.ones(len(df))  # Fallback to equal weights
-
-# Combine weights for Gender and Age (product of weights)
-combined_weights = weights_dict['Gender_binary'] * weights_dict['Age_binary']
-
-# Compute transformed fairness metrics
-transformed_results = []
-for attr in protected_attributes:
-    for outcome in outcome_variables:
-        spd, di = compute_fairness_metrics(df, attr, outcome, combined_weights)
-        transformed_results.append({
-            'Comparison': f"{comparison_labels[attr]} {outcome}",
-            'Statistical Parity Difference': round(spd, 4),
-            'Disparate Impact': round(di, 4) if di != 'NaN' else 'NaN'
-        })
+        df = load_coded_dataset('drug_consumption_processed.csv', columns=['Gender', 'Age'])
+    except FileNotFoundError:
+        print("Error: 'drug_consumption_processed.csv' not found. Ensure the file is in the working directory.")
+        exit(1)
+
+    # Select relevant columns
+    df = df[['Gender', 'Age', 'Cannabis_Use', 'Nicotine_Use', 'Gender_code', 'Age_code']]
+
+    # Create binary columns for protected attributes
+    df['Gender_binary'] = (df['Gender_code'] == code_of('Gender', 'Male')).astype(int)  # 1 = Male (privileged), 0 = Female (unprivileged)
+    df['Age_binary'] = (df['Age_code'] >= code_of('Age', '35-44')).astype(int)         # 1 = Older (privileged, ≥35), 0 = Younger (<35)
+
+    # Diagnostic: Print outcome counts
+    print("Diagnostic - Age value counts:\n", df['Age'].value_counts())
+    print("\nDiagnostic - Cannabis_Use by Age:\n", df.groupby(['Age', 'Cannabis_Use']).size())
+    print("\nDiagnostic - Nicotine_Use by Age:\n", df.groupby(['Age', 'Nicotine_Use']).size())
+    print("\nDiagnostic - Cannabis_Use by Gender:\n", df.groupby(['Gender', 'Cannabis_Use']).size())
+    print("\nDiagnostic - Nicotine_Use by Gender:\n", df.groupby(['Gender', 'Nicotine_Use']).size())
+
+    # Compute original fairness metrics
+    original_results = compute_results(df)
+
+    # Apply Reweighting for Gender and Age with respect to Cannabis_Use (aif360 is slow to import,
+    # so it is loaded here rather than in every bootstrap worker)
+    from aif360.datasets import BinaryLabelDataset
+    from aif360.algorithms.preprocessing import Reweighing
+    with stage('drug.reweigh', rows=len(df)):
+        weights_dict = {}
+        for attr in protected_attributes:
+            dataset = BinaryLabelDataset(
+                df=df[[attr, 'Cannabis_Use']],
+                label_names=['Cannabis_Use'],
+                protected_attribute_names=[attr],
+                favorable_label=1,
+                unprivileged_protected_attributes=[[0]],
+                privileged_protected_attributes=[[1]]
+            )
+            rw = Reweighing(unprivileged_groups=[{attr: 0}], privileged_groups=[{attr: 1}])
+            try:
+                transformed_dataset = rw.fit_transform(dataset)
+                weights_dict[attr] = transformed_dataset.instance_weights
+                print(f"\nDiagnostic - Reweighting successful for {comparison_labels[attr]}, Cannabis_Use. First 10 weights:", transformed_dataset.instance_weights[:10])
+            except Exception as e:
+                print(f"\nReweighting failed for {comparison_labels[attr]}, Cannabis_Use: {e}")
+                weights_dict[attr] = np.ones(len(df))  # Fallback to equal weights
+
+    # Combine weights for Gender and Age (product of weights)
+    combined_weights = weights_dict['Gender_binary'] * weights_dict['Age_binary']
+
+    # Compute transformed fairness metrics (reweighting weights are held fixed across resamples)
+    transformed_results = compute_results(df, combined_weights)
+
+    # Output results
+    original_metrics_df = pd.DataFrame(original_results)
+    print("Before Reweighting Fairness Metrics (CSV):")
+    print(original_metrics_df.to_csv(index=False, na_rep='NaN'))
 
-# Output results
-original_metrics_df = pd.DataFrame(original_results)
-print("Before Reweighting Fairness Metrics (CSV):")
-print(original_metrics_df.to_csv(index=False, na_rep='NaN'))
+    transformed_metrics_df = pd.DataFrame(transformed_results)
+    print("After Reweighting Fairness Metrics (CSV):")
+    print(transformed_metrics_df.to_csv(index=False, na_rep='NaN'))
 
-transformed_metrics_df = pd.DataFrame(transformed_results)
-print("After Reweighting Fairness Metrics (CSV):")
-print(transformed_metrics_df.to_csv(index=False, na_rep='NaN'))
+    # Save to CSV files
+    original_metrics_df.to_csv('before_fairness_metrics.csv', index=False, na_rep='NaN')
+    transformed_metrics_df.to_csv('after_fairness_metrics.csv', index=False, na_rep='NaN')
 
-# Save to CSV files
-original_metrics_df.to_csv('before_fairness_metrics.csv', index=False, na_rep='NaN')
-transformed_metrics_df.to_csv('after_fairness_metrics.csv', index=False, na_rep='NaN')
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,24 @@
+import os
+import sys
 import pandas as pd
 import numpy as np
-from aif360.datasets import BinaryLabelDataset
-from aif360.algorithms.preprocessing import DisparateImpactRemover
+from demographic_codes import load_coded_dataset, code_of, group_rates
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # repository root, for instrumentation.py
+from instrumentation import stage
 
 # Load and prepare the dataset
 try:
-    df = pd.read_csv('drug_consumption_processed.csv')
+    df = load_coded_dataset('drug_consumption_processed.csv', columns=['Gender', 'Age'])
 except FileNotFoundError:
     print("Error: 'drug_consumption_processed.csv' not found. Ensure the file is in the working directory.")
     exit(1)
 
 # Select relevant columns
-df = df[['Gender', 'Age', 'Cannabis_Use', 'Nicotine_Use']]
+df = df[['Gender', 'Age', 'Cannabis_Use', 'Nicotine_Use', 'Gender_code', 'Age_code']]
 
 # Create binary columns for protected attributes
-df['Gender_binary'] = (df['Gender'] == -0.48246).astype(int)  # 1 = Male (privileged), 0 = Female (unprivileged)
-df['Age_binary'] = (df['Age'] >= 0.49788).astype(int)        # 1 = Older (privileged), 0 = Younger (unprivileged)
+df['Gender_binary'] = (df['Gender_code'] == code_of('Gender', 'Male')).astype(int)  # 1 = Male (privileged), 0 = Female (unprivileged)
+df['Age_binary'] = (df['Age_code'] >= code_of('Age', '35-44')).astype(int)         # 1 = Older (privileged), 0 = Younger (unprivileged)
 
 # Define protected attributes and outcomes
 protected_attributes = ['Gender_binary', 'Age_binary']
@@ -23,10 +26,8 @@ outcome_variables = ['Cannabis_Use', 'Nicotine_Use']
 
 # Function to compute SPD and DI
 def compute_fairness_metrics(df, attr, outcome):
-    privileged = df[df[attr] == 1]
-    unprivileged = df[df[attr] == 0]
-    p_priv = privileged[outcome].mean() if len(privileged) > 0 else 0
-    p_unpriv = unprivileged[outcome].mean() if len(unprivileged) > 0 else 0
+    # Binary attribute codes: index 0 = unprivileged, index 1 = privileged
+    p_unpriv, p_priv = group_rates(df[attr].to_numpy().astype(int), df[outcome].to_numpy(), 2)
     spd = p_priv - p_unpriv
     di = p_unpriv / p_priv if p_priv > 0 else 'NaN'
     return spd, di
@@ -49,17 +50,22 @@ print("\nOriginal Dataset Fairness Metrics (CSV):")
 print(original_metrics_df.to_csv(index=False, na_rep='NaN'))
 original_metrics_df.to_csv('original_fairness_metrics.csv', index=False, na_rep='NaN')
 
-# Apply Disparate Impact Remover for Cannabis_Use with respect to Gender
+# Apply Disparate Impact Remover for Cannabis_Use with respect to Gender (aif360 is slow to import,
+# so it is loaded only once the dataset has been read and the original metrics saved)
+from aif360.datasets import BinaryLabelDataset
+from aif360.algorithms.preprocessing import DisparateImpactRemover
+# Gender enters as its decoded binary column, so group membership never depends on float equality
 dataset = BinaryLabelDataset(
-    df=df[['Gender', 'Cannabis_Use']],
+    df=df[['Gender_binary', 'Cannabis_Use']],
     label_names=['Cannabis_Use'],
-    protected_attribute_names=['Gender'],
+    protected_attribute_names=['Gender_binary'],
     favorable_label=1,
-    unprivileged_protected_attributes=[[0.48246]],
-    privileged_protected_attributes=[[-0.48246]]
+    unprivileged_protected_attributes=[[0]],  # Female
+    privileged_protected_attributes=[[1]]     # Male
 )
 remover = DisparateImpactRemover(repair_level=1.0)
-transformed_dataset = remover.fit_transform(dataset)
+with stage('drug.repair', rows=len(df)):
+    transformed_dataset = remover.fit_transform(dataset)
 
 # Convert transformed dataset to DataFrame
 transformed_df = transformed_dataset.convert_to_dataframe()[0]
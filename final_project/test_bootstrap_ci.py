@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import pytest
+from bootstrap_ci import build_totals_matrix, spd_di_from_totals, bootstrap_spd_di, percentile_ci
+
+
+def pairs(n_rows=400, seed=0):
+    rng = np.random.default_rng(seed)
+    gender, age = rng.integers(0, 2, n_rows), rng.integers(0, 2, n_rows)
+    outcome = rng.random(n_rows) < 0.3 + 0.2 * gender
+    return [(gender, outcome), (age, outcome)], rng.random(n_rows) + 0.5
+
+
+def pandas_spd_di(attr, outcome, weights):
+    frame = pd.DataFrame({'attr': attr, 'weighted': outcome * weights, 'weight': weights})
+    rates = frame.groupby('attr')['weighted'].sum() / frame.groupby('attr')['weight'].sum()
+    return rates[1] - rates[0], rates[0] / rates[1]
+
+
+def test_totals_give_weighted_spd_di():
+    data, weights = pairs()
+    spd, di = spd_di_from_totals(np.ones(len(weights)) @ build_totals_matrix(data, weights))
+    for k, (attr, outcome) in enumerate(data):
+        assert (spd[k], di[k]) == pytest.approx(pandas_spd_di(attr, outcome, weights))
+
+
+def test_empty_groups_are_nan():
+    spd, di = spd_di_from_totals([0, 0, 5, 2, 4, 0, 4, 1])
+    assert np.isnan(spd[0]) and np.isnan(di[0])
+    assert spd[1] == pytest.approx(-0.25) and np.isnan(di[1])
+
+
+@pytest.mark.parametrize('method', ['poisson', 'multinomial'])
+def test_replicates_do_not_depend_on_workers(method):
+    data, weights = pairs(200)
+    one = bootstrap_spd_di(data, weights, n_boot=600, method=method, seed=3, n_workers=1)
+    two = bootstrap_spd_di(data, weights, n_boot=600, method=method, seed=3, n_workers=2)
+    assert one[0].shape == (600, 2)
+    np.testing.assert_array_equal(one[0], two[0])
+    np.testing.assert_array_equal(one[1], two[1])
+
+
+def test_interval_covers_estimate():
+    data, weights = pairs(2000, seed=1)
+    spd, _ = bootstrap_spd_di(data, weights, n_boot=500, seed=5, n_workers=1)
+    lower, upper = percentile_ci(spd)
+    expected = [pandas_spd_di(attr, outcome, weights)[0] for attr, outcome in data]
+    assert (lower < expected).all() and (expected < upper).all()
+    # Bootstrap spread of a weighted proportion difference is close to its normal-theory standard error
+    assert 0.018 < spd[:, 0].std() < 0.03
+
+
+def test_unknown_method_raises():
+    data, _ = pairs(10)
+    with pytest.raises(ValueError):
+        bootstrap_spd_di(data, n_boot=10, method='jackknife', n_workers=1)
@@ -0,0 +1,49 @@
+import os
+import shutil
+import numpy as np
+import pandas as pd
+import pytest
+from demographic_codes import CODE_TABLES, decode_column, code_of, code_labels, group_rates, load_coded_dataset
+
+PROCESSED_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'drug_consumption_processed.csv')
+
+
+@pytest.mark.parametrize('column', list(CODE_TABLES))
+def test_table_values_decode_to_their_position(column):
+    values = [value for value, _ in CODE_TABLES[column]]
+    codes = decode_column(np.array(values) + 5e-5, column)
+    np.testing.assert_array_equal(codes, np.arange(len(values)))
+    assert codes.dtype == np.int8
+
+
+def test_unknown_and_missing_values_raise():
+    with pytest.raises(ValueError):
+        decode_column([-0.48246, 0.1], 'Gender')
+    with pytest.raises(ValueError):
+        decode_column([np.nan], 'Gender')
+
+
+def test_code_of_matches_labels():
+    assert code_labels('Gender')[code_of('Gender', 'Female')] == 'Female'
+
+
+def test_group_rates_match_pandas():
+    rng = np.random.default_rng(0)
+    codes = rng.integers(0, 3, 500)
+    outcome = rng.random(500) < 0.4
+    weights = rng.random(500)
+    frame = pd.DataFrame({'code': codes, 'outcome': outcome, 'weight': weights})
+    np.testing.assert_allclose(group_rates(codes, outcome, 4)[:3], frame.groupby('code')['outcome'].mean())
+    weighted = (frame['outcome'] * frame['weight']).groupby(frame['code']).sum() / frame.groupby('code')['weight'].sum()
+    np.testing.assert_allclose(group_rates(codes, outcome, 4, weights)[:3], weighted)
+    assert group_rates(codes, outcome, 4)[3] == 0
+
+
+def test_coded_dataset_matches_float_codes_and_is_cached(tmp_path):
+    path = str(tmp_path / 'processed.csv')
+    shutil.copy(PROCESSED_CSV, path)
+    df = load_coded_dataset(path, columns=['Gender', 'Age'])
+    np.testing.assert_array_equal(df['Gender_code'] == code_of('Gender', 'Male'), np.isclose(df['Gender'], -0.48246))
+    assert os.path.exists(path + '.codes.npz')
+    again = load_coded_dataset(path, columns=['Gender', 'Age'])
+    np.testing.assert_array_equal(again['Age_code'], df['Age_code'])
@@ -1,6 +1,5 @@
 import gensim.models
 import pandas as pd
-from scipy.stats import pearsonr
 import os
 
 # Load the pre-trained Word2Vec model
@@ -152,6 +151,7 @@ manual_sims = df_q3a['Similarity'].apply(lambda x: float(x) if x != 'NA' else No
 model_sims = df_q3b['Similarity'].apply(lambda x: float(x) if x != 'NA' else None).dropna()
 
 if len(manual_sims) == len(model_sims) and len(manual_sims) > 1:
+    from scipy.stats import pearsonr  # only needed when there is a correlation to compute
     correlation, _ = pearsonr(manual_sims, model_sims)
     print("\nQ3C Correlation Analysis:")
     print(f"Pearson correlation: {correlation:.3f}")
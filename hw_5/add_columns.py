@@ -1,15 +1,7 @@
-import pandas as pd
+from german_data import load_german_data
 
-# Define column names for the German Credit Data Set
-column_names = [
-    'checking_account', 'duration', 'credit_history', 'purpose', 'credit_amount',
-    'savings_account', 'employment', 'installment_rate', 'personal_status', 'other_debtors',
-    'residence_since', 'property', 'age', 'other_plans', 'housing', 'existing_credits',
-    'job', 'liable_persons', 'telephone', 'class'
-]
-
-# Load the dataset
-df = pd.read_table('german.data', delim_whitespace=True, header=None, names=column_names)
+# Load the dataset (column names for the German Credit Data Set are defined in german_data.py)
+df = load_german_data('german.data')
 
 # Display the first few rows to verify
-print(df.head())
\ No newline at end of file
+print(df.head())
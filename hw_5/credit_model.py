@@ -0,0 +1,103 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # repository root, for instrumentation.py
+from instrumentation import instrumented
+
+# Category scores for the creditworthiness formula (Step 3.2)
+CHECKING_ACCOUNT_SCORES = {
+    'A14': 1.0,   # No checking account
+    'A13': 0.75,  # >= 200 DM
+    'A12': 0.5,   # 0 <= x < 200 DM
+    'A11': 0.0    # < 0 DM
+}
+CREDIT_HISTORY_SCORES = {
+    'A34': 1.0,   # Critical
+    'A32': 0.75,  # Existing paid
+    'A33': 0.5,   # Past delays
+    'A31': 0.25,  # All paid
+    'A30': 0.0    # No credits
+}
+SAVINGS_ACCOUNT_SCORES = {
+    'A64': 1.0,   # >= 1000 DM
+    'A63': 0.75,  # 500 <= x < 1000 DM
+    'A62': 0.5,   # 100 <= x < 500 DM
+    'A61': 0.25,  # < 100 DM
+    'A65': 0.0    # None
+}
+
+# Normalization constants for the continuous variables
+MAX_DURATION = 72         # Max duration in dataset
+MAX_CREDIT = 20000        # Approximate max credit amount
+MAX_INSTALLMENT_RATE = 4
+
+# Feature order and weights of the creditworthiness formula
+FEATURE_NAMES = ['checking_account', 'credit_history', 'savings_account',
+                 'duration', 'credit_amount', 'installment_rate']
+WEIGHTS = np.array([0.25, 0.30, 0.20, 0.10, 0.10, 0.05])
+
+# Age groups: 0 = Younger (<40, privileged), 1 = Older (>=40, unprivileged)
+AGE_CUTOFF = 40
+GROUP_LABELS = ['Younger (<40)', 'Older (>=40)']
+PRIVILEGED, UNPRIVILEGED = 0, 1
+
+
+def _category_scores(series, scores):
+    """Map attribute codes to scores (0.0 when unknown); categorical columns map via their codes."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        lookup = np.array([scores.get(c, 0.0) for c in series.cat.categories] + [0.0])
+        return lookup[series.cat.codes.to_numpy()]  # code -1 (missing) picks the trailing 0.0
+    return series.map(scores).fillna(0.0).to_numpy(dtype=float)
+
+
+def feature_matrix(df, max_duration=MAX_DURATION, max_credit=MAX_CREDIT):
+    """Return the (rows x 6) matrix of per-feature scores in FEATURE_NAMES order."""
+    return np.column_stack([
+        _category_scores(df['checking_account'], CHECKING_ACCOUNT_SCORES),
+        _category_scores(df['credit_history'], CREDIT_HISTORY_SCORES),
+        _category_scores(df['savings_account'], SAVINGS_ACCOUNT_SCORES),
+        1 - df['duration'].to_numpy(dtype=float) / max_duration,
+        1 - df['credit_amount'].to_numpy(dtype=float) / max_credit,
+        1 - df['installment_rate'].to_numpy(dtype=float) / MAX_INSTALLMENT_RATE
+    ])
+
+
+def score_features(features, weights=WEIGHTS):
+    """Score a feature matrix with the weighted formula, clipped to 0-100."""
+    return np.clip(features @ np.asarray(weights) * 100, 0, 100)
+
+
+@instrumented('credit.score', rows=len)
+def calculate_creditworthiness(df, weights=WEIGHTS):
+    """Vectorized creditworthiness score (0-100) for every row of df."""
+    return pd.Series(score_features(feature_matrix(df), weights), index=df.index)
+
+
+def age_groups(df):
+    """Return int8 age group codes (see GROUP_LABELS) for every row of df."""
+    return (df['age'].to_numpy() >= AGE_CUTOFF).astype(np.int8)
+
+
+def good_credit(df):
+    """Return a boolean array that is True for good credit risks (class 1)."""
+    return df['class'].to_numpy() == 1
+
+
+def profit_optimal_threshold(thresholds, profits, min_threshold=10, warn=True):
+    """Pick the profit-maximizing threshold, avoiding very low thresholds (per FAQ).
+
+    If the best threshold is at or below min_threshold, the first profit peak
+    above it is used instead (printing a warning unless warn is False).
+    Returns (threshold, profit).
+    """
+    profits = np.asarray(profits)
+    best = int(np.argmax(profits))
+    if thresholds[best] <= min_threshold:
+        if warn:
+            print("Warning: Low threshold detected. Finding peak profit threshold.")
+        for i in range(min_threshold, len(profits)):
+            if i > 0 and profits[i] < profits[i - 1]:  # Profit decreases
+                best = i - 1
+                break
+    return thresholds[best], profits[best]
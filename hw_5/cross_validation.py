@@ -0,0 +1,153 @@
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+from multiprocessing import shared_memory
+from german_data import load_german_data, GermanDataError
+from credit_model import (calculate_creditworthiness, age_groups, good_credit, profit_optimal_threshold,
+                          PRIVILEGED, UNPRIVILEGED)
+from fairness_curves import threshold_grid
+from threshold_table import ThresholdTable, SECTION_4_PROFITS
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # repository root, for parallel.py
+from parallel import parallel_map
+
+# Cross-validation settings
+n_folds = 5
+n_repeats = 100            # Repetition r reshuffles the folds with seed cv_seed + r
+cv_seed = 42
+cost_matrix = SECTION_4_PROFITS
+min_threshold = 10         # Thresholds at or below this are not allowed (per FAQ)
+di_bounds = (0.8, 1.25)    # Four-fifths rule for per-group thresholds, applied in both directions
+modes = ['single', 'per_group']
+
+# Scored dataset shared with worker processes (set by _init_worker)
+_shared = None
+
+
+def _pack_shared(scores, labels, groups):
+    """Copy scores (float64), labels and groups (int8) into one shared memory block."""
+    n = len(scores)
+    shm = shared_memory.SharedMemory(create=True, size=max(n * 10, 1))
+    _views(shm, n)[0][:] = scores
+    _views(shm, n)[1][:] = labels
+    _views(shm, n)[2][:] = groups
+    return shm
+
+
+def _views(shm, n):
+    scores = np.ndarray(n, dtype=np.float64, buffer=shm.buf, offset=0)
+    labels = np.ndarray(n, dtype=np.int8, buffer=shm.buf, offset=8 * n)
+    groups = np.ndarray(n, dtype=np.int8, buffer=shm.buf, offset=9 * n)
+    return scores, labels, groups
+
+
+def _init_worker(shm_name, n):
+    global _shared
+    shm = shared_memory.SharedMemory(name=shm_name)
+    scores, labels, groups = _views(shm, n)
+    _shared = (shm, scores, labels.view(bool), groups)
+
+
+def fit_thresholds(table, mode, thresholds):
+    """Fit thresholds on a training table; returns the (privileged, unprivileged) pair.
+
+    'single' uses the Section 4 rule (one profit-optimal threshold for everyone).
+    'per_group' searches every threshold pair for the highest profit with DI
+    inside di_bounds, falling back to the pair with DI closest to 1.
+    """
+    if mode == 'single':
+        threshold, _ = profit_optimal_threshold(thresholds, table.profit(thresholds, cost_matrix),
+                                                min_threshold, warn=False)
+        return threshold, threshold
+
+    allowed = thresholds[thresholds > min_threshold]
+    priv_grid, unpriv_grid = np.meshgrid(allowed, allowed, indexing='ij')
+    pairs = np.empty((table.n_groups, priv_grid.size))
+    pairs[PRIVILEGED] = priv_grid.ravel()
+    pairs[UNPRIVILEGED] = unpriv_grid.ravel()
+    di = table.disparate_impact(pairs)
+    feasible = (di >= di_bounds[0]) & (di <= di_bounds[1])
+    if feasible.any():
+        best = np.argmax(np.where(feasible, table.profit(pairs, cost_matrix), np.iinfo(np.int64).min))
+    else:
+        best = np.nanargmin(np.abs(di - 1.0)) if not np.isnan(di).all() else 0
+    return pairs[PRIVILEGED, best], pairs[UNPRIVILEGED, best]
+
+
+def run_repeat(repeat):
+    """Fit on each training fold of one repetition and evaluate on its held-out fold."""
+    from sklearn.model_selection import StratifiedKFold  # imported once per worker, on its first repetition
+    _, scores, labels, groups = _shared
+    thresholds = threshold_grid()
+    folds = StratifiedKFold(n_splits=n_folds, shuffle=True, random_state=cv_seed + repeat)
+    rows = []
+    for fold, (train, test) in enumerate(folds.split(scores, groups * 2 + labels)):
+        train_table = ThresholdTable.from_scores(scores[train], labels[train], groups[train])
+        test_table = ThresholdTable.from_scores(scores[test], labels[test], groups[test])
+        for mode in modes:
+            priv_t, unpriv_t = fit_thresholds(train_table, mode, thresholds)
+            pair = [[priv_t], [unpriv_t]]
+            metrics = test_table.fairness(pair)
+            rows.append({
+                'repeat': repeat, 'fold': fold, 'mode': mode,
+                'priv_threshold': priv_t, 'unpriv_threshold': unpriv_t,
+                'profit': int(test_table.profit(pair, cost_matrix)[0]),
+                'disparate_impact': float(metrics['disparate_impact'][0]),
+                'equal_opportunity_difference': float(metrics['equal_opportunity_difference'][0])
+            })
+    return rows
+
+
+def cross_validate(df, n_repeats=n_repeats, n_workers=None):
+    """Repeated stratified K-fold evaluation of the threshold fits; one row per (repeat, fold, mode).
+
+    The dataset is scored once; workers read the scores, labels and groups
+    from a shared memory block and run one repetition per task.
+    """
+    scores = calculate_creditworthiness(df).to_numpy()
+    shm = _pack_shared(scores, good_credit(df), age_groups(df))
+    try:
+        results = parallel_map(run_repeat, range(n_repeats), n_workers,
+                               initializer=_init_worker, initargs=(shm.name, len(scores)))
+    finally:
+        global _shared
+        _shared = None
+        shm.close()
+        shm.unlink()
+    return pd.DataFrame([row for rows in results for row in rows])
+
+
+def summarize(results):
+    """Mean and variance of every held-out metric per mode, over all folds of all repetitions."""
+    metrics = ['priv_threshold', 'unpriv_threshold', 'profit', 'disparate_impact', 'equal_opportunity_difference']
+    summary = results.groupby('mode', sort=False)[metrics].agg(['mean', 'var'])
+    summary.columns = [f'{metric} {stat}' for metric, stat in summary.columns]
+    return summary.reset_index()
+
+
+def main():
+    try:
+        df = load_german_data('german.data')
+    except FileNotFoundError:
+        print("Error: 'german.data' file not found. Please ensure the file is in the working directory.")
+        exit(1)
+    except GermanDataError as e:
+        print(f"Error: {e}")
+        exit(1)
+
+    start = time.perf_counter()
+    results = cross_validate(df)
+    elapsed = time.perf_counter() - start
+    print(f"{n_repeats} x {n_folds}-fold cross-validation finished in {elapsed:.2f} seconds.")
+
+    results.to_csv('cross_validation_folds.csv', index=False)
+    summary = summarize(results)
+    summary.to_csv('cross_validation_summary.csv', index=False)
+    print("\nHeld-out metrics per threshold mode (mean and variance over all folds):")
+    print(summary.round(4).T.to_string(header=False))
+    print("\nFold results saved to 'cross_validation_folds.csv', summary to 'cross_validation_summary.csv'.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+from credit_model import PRIVILEGED, UNPRIVILEGED
+
+# Default threshold grid: every integer score from 0 to 100
+GRID_START = 0
+GRID_STEP = 1
+GRID_STOP = 100
+
+
+def threshold_grid(start=GRID_START, stop=GRID_STOP, step=GRID_STEP):
+    """Return the evenly spaced thresholds start, start + step, ..., stop."""
+    return start + step * np.arange(int(round((stop - start) / step)) + 1)
+
+
+def safe_ratio(numerator, denominator):
+    """Element-wise numerator / denominator, NaN where the denominator is not positive."""
+    numerator = np.asarray(numerator, dtype=float)
+    denominator = np.asarray(denominator, dtype=float)
+    out = np.full(np.broadcast(numerator, denominator).shape, np.nan)
+    np.divide(numerator, denominator, out=out, where=denominator > 0)
+    return out
+
+
+def group_rates(counts):
+    """Approval rate, TPR, FPR and PPV per group and threshold from confusion counts."""
+    tp, fp, fn, tn = counts['tp'], counts['fp'], counts['fn'], counts['tn']
+    return {
+        'approval_rate': safe_ratio(tp + fp, tp + fp + fn + tn),
+        'tpr': safe_ratio(tp, tp + fn),
+        'fpr': safe_ratio(fp, fp + tn),
+        'ppv': safe_ratio(tp, tp + fp)
+    }
+
+
+def fairness_from_rates(priv, unpriv):
+    """Fairness metrics comparing unprivileged to privileged group rates.
+
+    Works element-wise, so it serves whole curves and single lookups alike.
+    """
+    tpr_diff = unpriv['tpr'] - priv['tpr']
+    fpr_diff = unpriv['fpr'] - priv['fpr']
+    return {
+        'disparate_impact': safe_ratio(unpriv['approval_rate'], priv['approval_rate']),
+        'statistical_parity_difference': unpriv['approval_rate'] - priv['approval_rate'],
+        'equal_opportunity_difference': tpr_diff,
+        'equalized_odds_difference': np.fmax(np.abs(tpr_diff), np.abs(fpr_diff)),
+        'predictive_parity_difference': unpriv['ppv'] - priv['ppv']
+    }
+
+
+def fairness_curves(counts, thresholds):
+    """DataFrame of fairness metrics for a single threshold shared by both groups."""
+    rates = group_rates(counts)
+    priv = {name: r[PRIVILEGED] for name, r in rates.items()}
+    unpriv = {name: r[UNPRIVILEGED] for name, r in rates.items()}
+    curves = pd.DataFrame(fairness_from_rates(priv, unpriv))
+    curves.insert(0, 'threshold', thresholds)
+    return curves
+
+
+def threshold_index(threshold, start=GRID_START, step=GRID_STEP, n_thresholds=None):
+    """Position of a threshold on the grid; raises ValueError for off-grid values."""
+    position = (threshold - start) / step
+    index = int(round(position))
+    if abs(position - index) > 1e-9 or index < 0 or (n_thresholds is not None and index >= n_thresholds):
+        raise ValueError(f"Threshold {threshold} is not on the evaluation grid.")
+    return index
+
+
+def fairness_at(counts, priv_threshold, unpriv_threshold=None, start=GRID_START, step=GRID_STEP):
+    """Fairness metrics for one threshold (or a privileged/unprivileged pair) by table lookup."""
+    if unpriv_threshold is None:
+        unpriv_threshold = priv_threshold
+    n_thresholds = counts['tp'].shape[1]
+    i_priv = threshold_index(priv_threshold, start, step, n_thresholds)
+    i_unpriv = threshold_index(unpriv_threshold, start, step, n_thresholds)
+    rates = group_rates({name: c[:, [i_priv, i_unpriv]] for name, c in counts.items()})
+    priv = {name: r[PRIVILEGED, 0] for name, r in rates.items()}
+    unpriv = {name: r[UNPRIVILEGED, 1] for name, r in rates.items()}
+    return {name: float(value) for name, value in fairness_from_rates(priv, unpriv).items()}
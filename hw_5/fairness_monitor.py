@@ -0,0 +1,236 @@
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+from german_data import load_german_data, GermanDataError
+from credit_model import calculate_creditworthiness, age_groups, good_credit, GROUP_LABELS, PRIVILEGED, UNPRIVILEGED
+from fairness_curves import group_rates, fairness_from_rates, safe_ratio
+
+# Monitor settings
+window = 10000             # Events per window
+mode = 'sliding'           # 'sliding' (last `window` events) or 'tumbling' (consecutive non-overlapping windows)
+report_every = 1000        # Events between reports in sliding mode (tumbling mode reports once per window)
+min_group_events = 100     # Metrics are only alerted on when every group has this many events in the window
+
+# Alert thresholds (as in section_5.py: DI below the four-fifths rule, EOD below -0.1)
+DI_ALERT = 0.8
+SPD_ALERT = 0.1            # |SPD| above this
+EOD_ALERT = -0.1
+
+# Simulated stream for main(): applicants resampled from german.data, decided with the Section 6 thresholds
+events_file = 'decision_events.csv'
+n_events = 2000000
+label_rate = 0.3           # Share of events whose outcome label is already known
+drift_at = 0.5             # From this point on the older group's threshold is raised by drift_points
+drift_points = 15
+stream_seed = 42
+
+# Every event falls into one of 12 cells: group x decision x label (0 = bad, 1 = good, 2 = unknown)
+UNKNOWN_LABEL = 2
+N_CELLS = 2 * 2 * 3
+
+
+def event_cells(groups, decisions, labels):
+    """Cell index of every event; labels outside {0, 1} (e.g. -1 or NaN) count as unknown."""
+    labels = np.asarray(labels, dtype=float)
+    label_state = np.where(np.isin(labels, (0, 1)), labels, UNKNOWN_LABEL).astype(np.int64)
+    return (np.asarray(groups, dtype=np.int64) * 6 + np.asarray(decisions, dtype=np.int64) * 3 + label_state).astype(np.int8)
+
+
+def window_metrics(cell_counts):
+    """DI, SPD and EOD (plus group sizes and alert flags) for (k x 12) cell counts.
+
+    Approval rates use every event in the window; TPR for EOD uses only the
+    events whose label is known.
+    """
+    counts = np.asarray(cell_counts).reshape(-1, 2, 2, 3)     # (k, group, decision, label)
+    n = counts.sum(axis=(2, 3))
+    labelled = {'tp': counts[:, :, 1, 1], 'fp': counts[:, :, 1, 0], 'fn': counts[:, :, 0, 1], 'tn': counts[:, :, 0, 0]}
+    rates = group_rates(labelled)
+    rates['approval_rate'] = safe_ratio(counts[:, :, 1].sum(axis=2), n)
+    priv = {name: r[:, PRIVILEGED] for name, r in rates.items()}
+    unpriv = {name: r[:, UNPRIVILEGED] for name, r in rates.items()}
+    metrics = fairness_from_rates(priv, unpriv)
+
+    enough = (n >= min_group_events).all(axis=1)
+    positives = (labelled['tp'] + labelled['fn'] >= 1).all(axis=1)
+    di = metrics['disparate_impact']
+    spd = metrics['statistical_parity_difference']
+    eod = metrics['equal_opportunity_difference']
+    report = pd.DataFrame({
+        f'n_{label}': n[:, g] for g, label in enumerate(GROUP_LABELS)
+    })
+    report['disparate_impact'] = di
+    report['statistical_parity_difference'] = spd
+    report['equal_opportunity_difference'] = eod
+    with np.errstate(invalid='ignore'):
+        report['alert_di'] = enough & (di < DI_ALERT)
+        report['alert_spd'] = enough & (np.abs(spd) > SPD_ALERT)
+        report['alert_eod'] = enough & positives & (eod < EOD_ALERT)
+    report['alert'] = report['alert_di'] | report['alert_spd'] | report['alert_eod']
+    return report
+
+
+class FairnessMonitor:
+    """Per-group decision counts over a sliding or tumbling window of events.
+
+    Sliding windows keep the cells of the last `window` events in a ring
+    buffer: each event increments its cell's count and decrements the count of
+    the event it overwrites, so an update is O(1). Tumbling windows just reset
+    the counts when a window is complete. Reports (see window_metrics) are
+    produced every report_every events (sliding) or at the end of every window
+    (tumbling).
+    """
+
+    def __init__(self, window=window, mode=mode, report_every=report_every):
+        if mode not in ('sliding', 'tumbling'):
+            raise ValueError(f"Unknown window mode '{mode}' (expected 'sliding' or 'tumbling').")
+        self.window = window
+        self.mode = mode
+        self.report_every = report_every if mode == 'sliding' else window
+        self.ring = np.zeros(window, dtype=np.int8)
+        self.head = 0              # Ring position the next event is written to
+        self.filled = 0            # Events currently in the window
+        self.counts = np.zeros(N_CELLS, dtype=np.int64)
+        self.n_seen = 0
+
+    def _snapshot(self):
+        """Counts at a report point (tumbling windows then start over)."""
+        snapshot = self.counts.copy()
+        if self.mode == 'tumbling':
+            self.counts[:] = 0
+            self.filled = 0
+        return snapshot
+
+    @staticmethod
+    def _reports(events, snapshots):
+        report = window_metrics(np.reshape(np.asarray(snapshots, dtype=np.int64), (-1, N_CELLS)))
+        report.insert(0, 'event', np.asarray(events, dtype=np.int64))
+        return report
+
+    def update(self, group, decision, label=None):
+        """Add one event; returns a one-row report when one is due, else None."""
+        cell = event_cells([group], [decision], [-1 if label is None else label])[0]
+        if self.mode == 'sliding':
+            if self.filled == self.window:
+                self.counts[self.ring[self.head]] -= 1
+            else:
+                self.filled += 1
+            self.ring[self.head] = cell
+            self.head = (self.head + 1) % self.window
+        else:
+            self.filled += 1
+        self.counts[cell] += 1
+        self.n_seen += 1
+        if self.n_seen % self.report_every == 0:
+            return self._reports([self.n_seen], [self._snapshot()])
+        return None
+
+    def _add_chunk(self, cells):
+        """Add at most one report period (and at most one window) of events."""
+        size = len(cells)
+        self.counts += np.bincount(cells, minlength=N_CELLS)
+        if self.mode == 'sliding':
+            n_evict = max(self.filled + size - self.window, 0)
+            if n_evict:
+                oldest = (self.head - self.filled) % self.window
+                evicted = np.take(self.ring, np.arange(oldest, oldest + n_evict), mode='wrap')
+                self.counts -= np.bincount(evicted, minlength=N_CELLS)
+            np.put(self.ring, np.arange(self.head, self.head + size), cells, mode='wrap')
+            self.head = (self.head + size) % self.window
+            self.filled = min(self.filled + size, self.window)
+        else:
+            self.filled += size
+        self.n_seen += size
+
+    def update_batch(self, groups, decisions, labels):
+        """Add many events at once (same result as calling update per event); returns the reports due.
+
+        Metrics for all report points in the batch are computed together from
+        the count snapshots.
+        """
+        cells = event_cells(groups, decisions, labels)
+        events, snapshots = [], []
+        start = 0
+        while start < len(cells):
+            until_report = self.report_every - self.n_seen % self.report_every
+            stop = min(start + until_report, start + self.window, len(cells))
+            self._add_chunk(cells[start:stop])
+            start = stop
+            if self.n_seen % self.report_every == 0:
+                events.append(self.n_seen)
+                snapshots.append(self._snapshot())
+        return self._reports(events, snapshots)
+
+
+def read_events(path, chunk_rows=1000000):
+    """Yield (groups, decisions, labels) arrays from an event CSV with columns group, decision, label.
+
+    group is the age group code (see GROUP_LABELS), decision is 1 for approved
+    and label is 1 (good), 0 (bad) or empty/-1 when not yet known.
+    """
+    for chunk in pd.read_csv(path, chunksize=chunk_rows, dtype={'group': np.int8, 'decision': np.int8, 'label': float}):
+        yield chunk['group'].to_numpy(), chunk['decision'].to_numpy(), chunk['label'].to_numpy()
+
+
+def replay(path, monitor):
+    """Feed an event file through the monitor; returns (reports, seconds spent in the monitor)."""
+    reports = []
+    elapsed = 0.0
+    for groups, decisions, labels in read_events(path):
+        start = time.perf_counter()
+        reports.append(monitor.update_batch(groups, decisions, labels))
+        elapsed += time.perf_counter() - start
+    return pd.concat(reports, ignore_index=True), elapsed
+
+
+def simulate_events(df, group_thresholds, n_events=n_events, seed=stream_seed):
+    """Decision events for applicants resampled from df, with the older group's threshold drifting upward."""
+    rng = np.random.default_rng(seed)
+    rows = rng.integers(0, len(df), n_events)
+    scores = calculate_creditworthiness(df).to_numpy()[rows]
+    groups = age_groups(df)[rows]
+    thresholds = np.asarray(group_thresholds, dtype=float)[groups]
+    thresholds[int(drift_at * n_events):] += drift_points * (groups[int(drift_at * n_events):] == UNPRIVILEGED)
+    labels = np.where(rng.random(n_events) < label_rate, good_credit(df)[rows], -1)
+    return pd.DataFrame({'group': groups, 'decision': (scores >= thresholds).astype(np.int8), 'label': labels})
+
+
+def main():
+    if len(sys.argv) > 1:
+        path = sys.argv[1]
+    else:
+        path = events_file
+        try:
+            df = load_german_data('german.data')
+            group_thresholds = pd.read_csv('group_thresholds.csv').set_index('Group')['Threshold'].reindex(GROUP_LABELS)
+        except FileNotFoundError as e:
+            print(f"Error: '{e.filename}' not found. Run section_6.py first to choose the group thresholds.")
+            exit(1)
+        except GermanDataError as e:
+            print(f"Error: {e}")
+            exit(1)
+        if not os.path.exists(path):
+            simulate_events(df, group_thresholds.to_numpy()).to_csv(path, index=False)
+            print(f"Simulated {n_events} decision events saved to '{path}'.")
+
+    monitor = FairnessMonitor()
+    reports, elapsed = replay(path, monitor)
+    rate = f"{monitor.n_seen / elapsed:,.0f} events/second" if monitor.n_seen and elapsed > 0 else "no events"
+    print(f"Replayed {monitor.n_seen} events from '{path}' ({mode} window of {window}); "
+          f"monitor time {elapsed:.2f} seconds ({rate}).")
+
+    reports.to_csv('fairness_monitor_report.csv', index=False)
+    alerts = reports[reports['alert']]
+    print(f"\n{len(reports)} reports, {len(alerts)} with alerts "
+          f"(DI < {DI_ALERT}: {reports['alert_di'].sum()}, |SPD| > {SPD_ALERT}: {reports['alert_spd'].sum()}, "
+          f"EOD < {EOD_ALERT}: {reports['alert_eod'].sum()}).")
+    if len(alerts):
+        print(f"First alert after event {alerts['event'].iloc[0]}:")
+        print(alerts.head(1).round(4).to_string(index=False))
+    print("\nReports saved to 'fairness_monitor_report.csv'.")
+
+
+if __name__ == "__main__":
+    main()
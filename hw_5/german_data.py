@@ -0,0 +1,197 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # repository root, for instrumentation.py
+from instrumentation import instrumented
+
+# Column names for the German Credit Data Set (20 features + class = 21 columns)
+COLUMN_NAMES = [
+    'checking_account', 'duration', 'credit_history', 'purpose', 'credit_amount',
+    'savings_account', 'employment', 'installment_rate', 'personal_status', 'other_debtors',
+    'residence_since', 'property', 'age', 'other_plans', 'housing', 'existing_credits',
+    'job', 'liable_persons', 'telephone', 'foreign_worker', 'class'
+]
+N_FIELDS = len(COLUMN_NAMES)
+
+# Attribute codes of the categorical columns, as documented for the Statlog format
+CATEGORIES = {
+    'checking_account': ['A11', 'A12', 'A13', 'A14'],
+    'credit_history': ['A30', 'A31', 'A32', 'A33', 'A34'],
+    'purpose': ['A40', 'A41', 'A410', 'A42', 'A43', 'A44', 'A45', 'A46', 'A47', 'A48', 'A49'],
+    'savings_account': ['A61', 'A62', 'A63', 'A64', 'A65'],
+    'employment': ['A71', 'A72', 'A73', 'A74', 'A75'],
+    'personal_status': ['A91', 'A92', 'A93', 'A94', 'A95'],
+    'other_debtors': ['A101', 'A102', 'A103'],
+    'property': ['A121', 'A122', 'A123', 'A124'],
+    'other_plans': ['A141', 'A142', 'A143'],
+    'housing': ['A151', 'A152', 'A153'],
+    'job': ['A171', 'A172', 'A173', 'A174'],
+    'telephone': ['A191', 'A192'],
+    'foreign_worker': ['A201', 'A202']
+}
+NUMERIC_COLUMNS = [name for name in COLUMN_NAMES if name not in CATEGORIES]
+
+# Bytes read per chunk; chunks are cut at line boundaries
+CHUNK_BYTES = 8 * 1024 * 1024
+
+# Longest numeric field accepted (int32 holds any 9-digit number)
+MAX_DIGITS = 9
+
+
+class GermanDataError(ValueError):
+    """Raised when german.data contains malformed lines; bad_lines lists (line number, problem)."""
+
+    def __init__(self, bad_lines):
+        self.bad_lines = bad_lines
+        shown = '\n'.join(f"Row {line}: {problem}" for line, problem in bad_lines[:20])
+        more = f"\n... and {len(bad_lines) - 20} more" if len(bad_lines) > 20 else ''
+        super().__init__(f"{len(bad_lines)} malformed row(s) in german.data:\n{shown}{more}")
+
+
+def _category_lookup(name):
+    """Array mapping the number after 'A' in an attribute code to its category code (-1 if unknown)."""
+    numbers = [int(code[1:]) for code in CATEGORIES[name]]
+    lookup = np.full(max(numbers) + 1, -1, dtype=np.int8)
+    lookup[numbers] = np.arange(len(numbers), dtype=np.int8)
+    return lookup
+
+
+_CATEGORY_LOOKUPS = {name: _category_lookup(name) for name in CATEGORIES}
+
+
+def _parse_digits(data, starts, ends):
+    """Parse the decimal numbers data[starts:ends] for many fields at once.
+
+    Fields are read right-aligned one digit position at a time (Horner's rule),
+    so every step is vectorized over all fields. Returns the values and a mask
+    of fields that are empty, too long or contain a non-digit.
+    """
+    lengths = ends - starts
+    width = int(min(lengths.max(initial=1), MAX_DIGITS))
+    invalid = (lengths <= 0) | (lengths > MAX_DIGITS)
+    values = np.zeros(len(starts), dtype=np.int64)
+    for position in range(width):
+        digits = data[np.maximum(ends - width + position, 0)] - np.uint8(48)  # non-digits wrap above 9
+        digits *= position >= width - lengths                                # leading positions count as 0
+        invalid |= digits > 9
+        values = values * 10 + digits
+    return values, invalid
+
+
+def _scan_chunk(chunk, first_line, bad_lines):
+    """Locate the fields of one chunk of whole lines and check every line has 21 of them.
+
+    Works on the raw bytes with vectorized masks: a field starts at a
+    non-whitespace byte preceded by whitespace and ends before the next
+    whitespace byte. Lines with the wrong field count are recorded in bad_lines
+    and dropped. Returns (rows x 21) field start and end offsets plus the line
+    number of every row.
+    """
+    data = np.frombuffer(chunk, dtype=np.uint8)
+    blank = data <= 32  # space, tab, CR, LF and other control bytes
+    filled = ~blank
+    starts = np.flatnonzero(filled & np.concatenate(([True], blank[:-1])))
+    ends = np.flatnonzero(filled & np.concatenate((blank[1:], [True]))) + 1
+    newlines = np.flatnonzero(data == 10)
+
+    # Fields per line = number of field starts between consecutive newlines
+    if not chunk.endswith(b'\n'):
+        newlines = np.append(newlines, len(data))
+    counts = np.diff(np.searchsorted(starts, newlines), prepend=0)
+    wrong = (counts != N_FIELDS) & (counts != 0)
+    for i in np.flatnonzero(wrong):
+        bad_lines.append((first_line + int(i), f"{counts[i]} columns, expected {N_FIELDS}"))
+    field_line = np.repeat(np.arange(len(counts)), counts)
+    if wrong.any():
+        keep = ~wrong[field_line]
+        starts, ends, field_line = starts[keep], ends[keep], field_line[keep]
+
+    line_numbers = first_line + field_line[::N_FIELDS]
+    return data, starts.reshape(-1, N_FIELDS), ends.reshape(-1, N_FIELDS), line_numbers
+
+
+def _encode_columns(data, starts, ends, line_numbers, bad_lines):
+    """Turn field offsets into int8 category codes and int32 numerics, recording bad values."""
+    n_rows = len(starts)
+    categorical = [j for j, name in enumerate(COLUMN_NAMES) if name in CATEGORIES]
+    numeric = [j for j, name in enumerate(COLUMN_NAMES) if name not in CATEGORIES]
+
+    # Attribute codes are 'A' followed by a number (e.g. A11 or A410); parse all categorical fields at once
+    cat_starts = starts[:, categorical].ravel()
+    numbers, cat_invalid = _parse_digits(data, cat_starts + 1, ends[:, categorical].ravel())
+    cat_invalid |= data[cat_starts] != ord('A')
+    # Explicit shapes: a chunk without valid rows gives empty (0 x k) arrays
+    numbers = numbers.reshape(n_rows, len(categorical))
+    cat_invalid = cat_invalid.reshape(n_rows, len(categorical))
+
+    values, num_invalid = _parse_digits(data, starts[:, numeric].ravel(), ends[:, numeric].ravel())
+    values = values.reshape(n_rows, len(numeric))
+    num_invalid = num_invalid.reshape(n_rows, len(numeric))
+
+    columns = {}
+    for k, j in enumerate(categorical):
+        name = COLUMN_NAMES[j]
+        lookup = _CATEGORY_LOOKUPS[name]
+        invalid = cat_invalid[:, k] | (numbers[:, k] >= len(lookup))
+        codes = lookup[np.where(invalid, 0, numbers[:, k])]
+        invalid |= codes < 0
+        columns[name] = np.where(invalid, 0, codes).astype(np.int8)
+        cat_invalid[:, k] = invalid
+    for k, j in enumerate(numeric):
+        columns[COLUMN_NAMES[j]] = values[:, k].astype(np.int32)
+
+    for invalid, column_index in [(cat_invalid, categorical), (num_invalid, numeric)]:
+        for i, k in zip(*np.nonzero(invalid)):
+            j = column_index[k]
+            field = bytes(data[starts[i, j]:ends[i, j]]).decode(errors='replace')
+            bad_lines.append((int(line_numbers[i]), f"invalid value '{field}' for {COLUMN_NAMES[j]}"))
+    return columns
+
+
+def parse_german_data(path='german.data', chunk_bytes=CHUNK_BYTES):
+    """Parse a Statlog German credit file in one validating pass.
+
+    Returns a dict of column name -> array: int8 category codes (indexing
+    CATEGORIES[name]) for categorical columns and int32 for numeric columns.
+    Raises GermanDataError listing every malformed line (wrong field count or
+    unknown value); blank lines are skipped.
+    """
+    parts = {name: [] for name in COLUMN_NAMES}
+    bad_lines = []
+    next_line = 1
+    remainder = b''
+    with open(path, 'rb') as file:
+        while True:
+            block = file.read(chunk_bytes)
+            data = remainder + block
+            if not block:
+                chunk, remainder = data, b''
+            else:
+                cut = data.rfind(b'\n') + 1
+                chunk, remainder = data[:cut], data[cut:]
+            if chunk:
+                data, starts, ends, line_numbers = _scan_chunk(chunk, next_line, bad_lines)
+                next_line += chunk.count(b'\n') + (0 if chunk.endswith(b'\n') else 1)
+                for name, values in _encode_columns(data, starts, ends, line_numbers, bad_lines).items():
+                    parts[name].append(values)
+            if not block:
+                break
+    if bad_lines:
+        raise GermanDataError(sorted(bad_lines))
+
+    empty = {name: np.empty(0, dtype=np.int8 if name in CATEGORIES else np.int32) for name in COLUMN_NAMES}
+    return {name: np.concatenate(parts[name]) if parts[name] else empty[name] for name in COLUMN_NAMES}
+
+
+@instrumented('credit.parse', rows=len)
+def load_german_data(path='german.data'):
+    """Load german.data as a DataFrame with categorical attribute codes and int32 numerics."""
+    columns = parse_german_data(path)
+    data = {}
+    for name in COLUMN_NAMES:
+        if name in CATEGORIES:
+            data[name] = pd.Categorical.from_codes(columns[name], categories=CATEGORIES[name])
+        else:
+            data[name] = columns[name]
+    return pd.DataFrame(data, columns=COLUMN_NAMES)
@@ -0,0 +1,443 @@
+import sys
+import json
+import math
+import time
+import asyncio
+import multiprocessing
+import collections
+import numpy as np
+import pandas as pd
+from credit_model import (feature_matrix, score_features, age_groups, GROUP_LABELS,
+                          CHECKING_ACCOUNT_SCORES, CREDIT_HISTORY_SCORES, SAVINGS_ACCOUNT_SCORES)
+
+# Service settings
+host = '127.0.0.1'
+port = 8080
+thresholds_file = 'group_thresholds.csv'   # Written by section_6.py
+max_batch = 4096             # Applicants scored per NumPy call at most
+max_wait = 0.002             # Seconds the batcher waits for more requests once one arrives
+latency_window = 100000      # Recent requests kept for the latency percentiles
+rate_window = 10.0           # Seconds of recent decisions behind decisions_per_second
+max_body_bytes = 1 << 20     # Largest request body accepted (about 7000 applicants)
+
+# Fields each applicant must provide (attribute codes as in german.data, numerics as numbers)
+INPUT_FIELDS = ['checking_account', 'credit_history', 'savings_account',
+                'duration', 'credit_amount', 'installment_rate', 'age']
+NUMERIC_FIELDS = ['duration', 'credit_amount', 'installment_rate', 'age']
+CATEGORY_FIELDS = {
+    'checking_account': CHECKING_ACCOUNT_SCORES,
+    'credit_history': CREDIT_HISTORY_SCORES,
+    'savings_account': SAVINGS_ACCOUNT_SCORES
+}
+
+# Benchmark settings (python scoring_service.py bench); the service gets a process of its own
+bench_processes = 2          # Client processes generating load
+bench_clients = 32           # Keep-alive connections per client process
+bench_requests = 200         # Requests per connection
+bench_applicants = 16        # Applicants per request
+
+
+def load_group_thresholds(path=thresholds_file):
+    """Per-group thresholds (indexed by age group code) chosen by the Section 6 optimizer."""
+    table = pd.read_csv(path)
+    thresholds = table.set_index('Group')['Threshold'].reindex(GROUP_LABELS)
+    if thresholds.isna().any():
+        raise ValueError(f"'{path}' must list a threshold for each of {GROUP_LABELS}.")
+    return thresholds.to_numpy(dtype=float)
+
+
+def validate_applicant(applicant):
+    """Return the applicant with its numeric fields as floats.
+
+    Raises ValueError for a missing field, an attribute code the scoring
+    formula does not know (it would silently score 0) or a non-finite number.
+    """
+    if not isinstance(applicant, dict):
+        raise ValueError('Each applicant must be a JSON object.')
+    missing = [f for f in INPUT_FIELDS if f not in applicant]
+    if missing:
+        raise ValueError(f'Missing fields: {missing}')
+    for field, scores in CATEGORY_FIELDS.items():
+        value = applicant[field]
+        if not (isinstance(value, str) and value in scores):
+            raise ValueError(f"Field '{field}' must be one of {sorted(scores)}, got {json.dumps(value)[:40]}.")
+    applicant = dict(applicant)
+    for field in NUMERIC_FIELDS:
+        value = applicant[field]
+        try:
+            # bool is an int subclass, and float() of a huge int raises OverflowError
+            number = float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else math.nan
+        except OverflowError:
+            number = math.nan
+        if not math.isfinite(number):
+            raise ValueError(f"Field '{field}' must be a finite number, got {json.dumps(value)[:40]}.")
+        applicant[field] = number
+    return applicant
+
+
+class LatencyRecorder:
+    """Ring buffer of the most recent request latencies (seconds)."""
+
+    def __init__(self, size=latency_window):
+        self.samples = np.zeros(size)
+        self.count = 0
+
+    def add(self, seconds):
+        self.samples[self.count % len(self.samples)] = seconds
+        self.count += 1
+
+    def percentiles(self, qs=(50, 99)):
+        recent = self.samples[:min(self.count, len(self.samples))]
+        if len(recent) == 0:
+            return {f'p{q}_ms': None for q in qs}
+        return {f'p{q}_ms': float(v) * 1000 for q, v in zip(qs, np.percentile(recent, qs))}
+
+
+class ThroughputWindow:
+    """Decisions made over the last rate_window seconds, as (time, count) per scored batch."""
+
+    def __init__(self, window=rate_window):
+        self.window = window
+        self.started = time.perf_counter()
+        self.batches = collections.deque()
+        self.in_window = 0
+
+    def _expire(self, now):
+        while self.batches and self.batches[0][0] < now - self.window:
+            self.in_window -= self.batches.popleft()[1]
+
+    def add(self, count):
+        now = time.perf_counter()
+        self.batches.append((now, count))
+        self.in_window += count
+        self._expire(now)
+
+    def per_second(self):
+        """Decisions per second over the window (over the uptime while that is shorter)."""
+        now = time.perf_counter()
+        self._expire(now)
+        elapsed = min(self.window, now - self.started)
+        return self.in_window / elapsed if elapsed > 0 else 0.0
+
+
+class ScoringService:
+    """Scores applicants with per-group thresholds, micro-batching concurrent requests.
+
+    Each request puts its applicants on a queue; a single batcher task takes
+    everything queued (waiting up to max_wait for more) and scores it with one
+    feature_matrix / score_features call before resolving each request.
+    """
+
+    def __init__(self, group_thresholds):
+        self.group_thresholds = np.asarray(group_thresholds, dtype=float)
+        self.queue = asyncio.Queue()
+        self.latency = LatencyRecorder()
+        self.throughput = ThroughputWindow()
+        self.decisions = 0
+        self.batches = 0
+
+    async def score(self, applicants):
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((applicants, future))
+        return await future
+
+    def score_batch(self, applicants):
+        """Score a list of applicant dicts in one vectorized call; returns one decision dict per applicant."""
+        df = pd.DataFrame.from_records(applicants, columns=INPUT_FIELDS)
+        scores = score_features(feature_matrix(df))
+        groups = age_groups(df)
+        thresholds = self.group_thresholds[groups]
+        approved = scores >= thresholds
+        return [
+            {'score': s, 'group': GROUP_LABELS[g], 'threshold': t, 'approved': a}
+            for s, g, t, a in zip(np.round(scores, 4).tolist(), groups.tolist(), thresholds.tolist(), approved.tolist())
+        ]
+
+    async def run_batcher(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            pending = [await self.queue.get()]
+            size = len(pending[0][0])
+            deadline = loop.time() + max_wait
+            while size < max_batch:
+                if self.queue.empty():
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self.queue.get(), remaining)
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    item = self.queue.get_nowait()
+                pending.append(item)
+                size += len(item[0])
+
+            applicants = [a for batch, _ in pending for a in batch]
+            try:
+                decisions = self.score_batch(applicants)
+            except Exception:
+                # Some request has bad values: score the requests one by one so only it fails
+                for batch, future in pending:
+                    self._resolve(future, batch)
+                continue
+            self._count(len(decisions))
+            start = 0
+            for batch, future in pending:
+                if not future.done():
+                    future.set_result(decisions[start:start + len(batch)])
+                start += len(batch)
+
+    def _resolve(self, future, batch):
+        try:
+            decisions = self.score_batch(batch)
+        except Exception as e:
+            # Never let one request stop the batcher: every later request would wait forever
+            if not future.done():
+                future.set_exception(ValueError(f'Invalid applicant values: {e}'))
+            return
+        self._count(len(decisions))
+        if not future.done():
+            future.set_result(decisions)
+
+    def _count(self, n_decisions):
+        self.batches += 1
+        self.decisions += n_decisions
+        self.throughput.add(n_decisions)
+
+    def metrics(self):
+        return {
+            'requests': self.latency.count,
+            'decisions': self.decisions,
+            'batches': self.batches,
+            'mean_batch_size': self.decisions / self.batches if self.batches else 0.0,
+            'decisions_per_second': self.throughput.per_second(),
+            'cpu_seconds': time.process_time(),
+            **self.latency.percentiles()
+        }
+
+    async def handle_request(self, method, path, body):
+        """Return (status, payload) for one HTTP request."""
+        if method == 'GET' and path == '/metrics':
+            return 200, self.metrics()
+        if method == 'GET' and path == '/health':
+            return 200, {'status': 'ok', 'thresholds': dict(zip(GROUP_LABELS, self.group_thresholds.tolist()))}
+        if method != 'POST' or path != '/score':
+            return 404, {'error': f'No route for {method} {path}'}
+
+        start = time.perf_counter()
+        try:
+            payload = json.loads(body or b'null')
+        except ValueError:
+            return 400, {'error': 'Request body is not valid JSON.'}
+        applicants = payload if isinstance(payload, list) else [payload]
+        try:
+            applicants = [validate_applicant(applicant) for applicant in applicants]
+        except ValueError as e:
+            return 400, {'error': str(e)}
+        if not applicants:
+            return 200, {'decisions': []}
+        try:
+            decisions = await self.score(applicants)
+        except ValueError as e:
+            return 400, {'error': str(e)}
+        self.latency.add(time.perf_counter() - start)
+        return 200, {'decisions': decisions}
+
+    async def handle_connection(self, reader, writer):
+        """Minimal HTTP/1.1 handling with keep-alive: one request at a time per connection."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, path, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                length = headers.get('content-length', '0') or '0'
+                if not (length.isascii() and length.isdigit()):
+                    # Without a usable length the body cannot be framed, so the connection is closed after answering
+                    await _respond(writer, 400, {'error': f'Invalid Content-Length: {length[:40]}'}, False)
+                    break
+                if int(length) > max_body_bytes:
+                    # The body is not read, so the connection cannot be reused either
+                    await _respond(writer, 413, {'error': f'Request body over {max_body_bytes} bytes.'}, False)
+                    break
+                body = await reader.readexactly(int(length))
+
+                status, payload = await self.handle_request(method, path, body)
+                keep_alive = headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+                await _respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            # ValueError: a request or header line longer than the stream's line limit
+            pass
+        finally:
+            writer.close()
+
+
+async def _respond(writer, status, payload, keep_alive):
+    data = json.dumps(payload).encode()
+    writer.write(
+        f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+        f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + data
+    )
+    await writer.drain()
+
+
+async def start_service(group_thresholds, host=host, port=port):
+    """Start the HTTP server and the batcher task; returns (service, server, batcher task)."""
+    service = ScoringService(group_thresholds)
+    batcher = asyncio.create_task(service.run_batcher())
+    server = await asyncio.start_server(service.handle_connection, host, port)
+    return service, server, batcher
+
+
+def _post_request(path, payload):
+    body = json.dumps(payload).encode()
+    return f"POST {path} HTTP/1.1\r\nHost: {host}\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body
+
+
+async def _read_response(reader):
+    """(status, raw body) of one response."""
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        if line.lower().startswith(b'content-length:'):
+            length = int(line.split(b':')[1])
+    return status, await reader.readexactly(length)
+
+
+async def _post(reader, writer, path, payload):
+    writer.write(_post_request(path, payload))
+    await writer.drain()
+    _, body = await _read_response(reader)
+    return json.loads(body)
+
+
+def _bench_applicants():
+    rng = np.random.default_rng(0)
+    return [{
+        'checking_account': f'A1{rng.integers(1, 5)}', 'credit_history': f'A3{rng.integers(0, 5)}',
+        'savings_account': f'A6{rng.integers(1, 6)}', 'duration': int(rng.integers(4, 73)),
+        'credit_amount': int(rng.integers(250, 18500)), 'installment_rate': int(rng.integers(1, 5)),
+        'age': int(rng.integers(19, 76))
+    } for _ in range(bench_applicants)]
+
+
+async def _drive_clients():
+    # The request is encoded once and responses are not decoded, so the clients use as little CPU as they can
+    request = _post_request('/score', _bench_applicants())
+
+    async def client():
+        reader, writer = await asyncio.open_connection(host, port)
+        for _ in range(bench_requests):
+            writer.write(request)
+            await writer.drain()
+            await _read_response(reader)
+        writer.close()
+
+    await asyncio.gather(*[client() for _ in range(bench_clients)])
+
+
+def _run_clients(_):
+    asyncio.run(_drive_clients())
+
+
+async def _get(path):
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n\r\n".encode())
+    response = await reader.read()
+    writer.close()
+    return json.loads(response.split(b'\r\n\r\n', 1)[1])
+
+
+async def _wait_until_up(timeout=10.0):
+    deadline = time.perf_counter() + timeout
+    while True:
+        try:
+            return await _get('/health')
+        except OSError:
+            if time.perf_counter() > deadline:
+                raise
+            await asyncio.sleep(0.05)
+
+
+def _serve_quietly(group_thresholds):
+    try:
+        asyncio.run(serve(group_thresholds, quiet=True))
+    except KeyboardInterrupt:
+        pass
+
+
+def run_benchmark(group_thresholds):
+    """Run the service in its own process and load it from client processes; prints throughput and latency.
+
+    On a machine with fewer CPUs than processes the clients take CPU time from
+    the service, so the service's own CPU time is reported too: decisions per
+    CPU second is what the one service process sustains when it has a CPU to
+    itself.
+    """
+    server = multiprocessing.Process(target=_serve_quietly, args=(group_thresholds,), daemon=True)
+    server.start()
+    try:
+        asyncio.run(_wait_until_up())
+        cpu_start = asyncio.run(_get('/metrics'))['cpu_seconds']
+        start = time.perf_counter()
+        with multiprocessing.Pool(bench_processes) as pool:
+            pool.map(_run_clients, range(bench_processes))
+        elapsed = time.perf_counter() - start
+        metrics = asyncio.run(_get('/metrics'))
+    finally:
+        server.terminate()
+        server.join()
+    n_decisions = bench_processes * bench_clients * bench_requests * bench_applicants
+    cpu = metrics['cpu_seconds'] - cpu_start
+    print(f"{n_decisions} decisions in {elapsed:.2f} seconds ({n_decisions / elapsed:.0f} decisions/second)")
+    print(f"Service CPU time: {cpu:.2f} seconds ({n_decisions / cpu:.0f} decisions per CPU second)")
+    print(json.dumps(metrics, indent=2))
+
+
+async def serve(group_thresholds, quiet=False):
+    service, server, _ = await start_service(group_thresholds, host, port)
+    if not quiet:
+        print(f"Scoring service listening on http://{host}:{port} (POST /score, GET /metrics, GET /health)")
+        print(f"Thresholds: {dict(zip(GROUP_LABELS, service.group_thresholds.tolist()))}")
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    try:
+        group_thresholds = load_group_thresholds()
+    except FileNotFoundError:
+        print(f"Error: '{thresholds_file}' not found. Run section_6.py first.")
+        exit(1)
+    except ValueError as e:
+        print(f"Error: {e}")
+        exit(1)
+
+    if len(sys.argv) > 1 and sys.argv[1] == 'bench':
+        run_benchmark(group_thresholds)
+    else:
+        try:
+            asyncio.run(serve(group_thresholds))
+        except KeyboardInterrupt:
+            print("\nScoring service stopped.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,139 +1,67 @@
+import os
+import sys
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-from sklearn.model_selection import train_test_split
-
-# Define column names for the German Credit Dataset (20 features + class)
-column_names = [
-    'checking_account', 'duration', 'credit_history', 'purpose', 'credit_amount',
-    'savings_account', 'employment', 'installment_rate', 'personal_status', 'other_debtors',
-    'residence_since', 'property', 'age', 'other_plans', 'housing', 'existing_credits',
-    'job', 'liable_persons', 'telephone', 'foreign_worker', 'class'
-]
-
-# Load the dataset
+from german_data import load_german_data, GermanDataError
+from split_cache import holdout_split
+from credit_model import calculate_creditworthiness, age_groups, good_credit, profit_optimal_threshold
+from threshold_table import ThresholdTable, SECTION_4_PROFITS
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # repository root, for plot_renderer.py
+from plot_renderer import figure_spec, render_figures
+
+# Load the German Credit Dataset (validated parse: categorical attribute codes, int32 numerics)
 try:
-    df = pd.read_csv('german.data', sep='\s+', header=None, names=column_names, engine='python')
+    df = load_german_data('german.data')
 except FileNotFoundError:
     print("Error: 'german.data' file not found. Please ensure the file is in the working directory.")
     exit(1)
+except GermanDataError as e:
+    print(f"Error: {e}")
+    exit(1)
 
-# Convert 'age' and other numeric columns to numeric, filling missing values with median
-df['age'] = pd.to_numeric(df['age'], errors='coerce').fillna(df['age'].median())
-df['duration'] = pd.to_numeric(df['duration'], errors='coerce').fillna(df['duration'].median())
-df['credit_amount'] = pd.to_numeric(df['credit_amount'], errors='coerce').fillna(df['credit_amount'].median())
-df['installment_rate'] = pd.to_numeric(df['installment_rate'], errors='coerce').fillna(df['installment_rate'].median())
-
-# Split into training and testing sets (50% each), use only training for Step 4
-train_df, test_df = train_test_split(df, test_size=0.5, random_state=42)
-
-# Define creditworthiness formula based on Step 3.2
-def calculate_creditworthiness(row):
-    # Map categorical variables to scores
-    checking_account_score = {
-        'A14': 1.0,  # No checking account
-        'A13': 0.75,  # >= 200 DM
-        'A12': 0.5,   # 0 <= x < 200 DM
-        'A11': 0.0    # < 0 DM
-    }.get(row['checking_account'], 0.0)
-    
-    credit_history_score = {
-        'A34': 1.0,   # Critical
-        'A32': 0.75,  # Existing paid
-        'A33': 0.5,   # Past delays
-        'A31': 0.25,  # All paid
-        'A30': 0.0    # No credits
-    }.get(row['credit_history'], 0.0)
-    
-    savings_account_score = {
-        'A64': 1.0,   # >= 1000 DM
-        'A63': 0.75,  # 500 <= x < 1000 DM
-        'A62': 0.5,   # 100 <= x < 500 DM
-        'A61': 0.25,  # < 100 DM
-        'A65': 0.0    # None
-    }.get(row['savings_account'], 0.0)
-    
-    # Normalize continuous variables
-    max_duration = 72  # Max duration in dataset
-    max_credit = 20000  # Approximate max credit amount
-    duration_score = 1 - (row['duration'] / max_duration)
-    credit_amount_score = 1 - (row['credit_amount'] / max_credit)
-    installment_rate_score = 1 - (row['installment_rate'] / 4)
-    
-    # Combine scores with provided weights
-    score = (
-        0.25 * checking_account_score +
-        0.30 * credit_history_score +
-        0.20 * savings_account_score +
-        0.10 * duration_score +
-        0.10 * credit_amount_score +
-        0.05 * installment_rate_score
-    ) * 100
-    return min(max(score, 0), 100)
+# Split into training and testing sets (50% each, stratified by age group and class), use only training for Step 4
+# The split indices are computed once per dataset and seed and cached in split_cache/
+train_df, test_df = holdout_split(df).frames(df)
 
-# Calculate creditworthiness for the training set
-train_df['creditworthiness'] = train_df.apply(calculate_creditworthiness, axis=1)
+# Calculate creditworthiness for the training set (formula from Step 3.2)
+train_df['creditworthiness'] = calculate_creditworthiness(train_df)
 
-# Step 4.1: Plot histogram of creditworthiness scores
-plt.figure(figsize=(10, 6))
-plt.hist(train_df['creditworthiness'], bins=20, color='skyblue', edgecolor='black')
-plt.title('Creditworthiness Grouping of Customers in German Credit Dataset', fontsize=16)
-plt.xlabel('Creditworthiness Score', fontsize=14)
-plt.ylabel('Number of Customers', fontsize=14)
-plt.grid(True, linestyle='--', alpha=0.7)
+# Build the per-group threshold table once for the scored training set
+table = ThresholdTable.from_scores(train_df['creditworthiness'], good_credit(train_df), age_groups(train_df))
+table.save('threshold_table_train.npz')
 
 # Step 4.2: Compute profit-maximizing threshold
-def compute_profit(threshold, df):
-    approved = df['creditworthiness'] >= threshold
-    dataset_approved = df['class'] == 1
-    profit = 0
-    for a, d in zip(approved, dataset_approved):
-        if d and a:
-            profit += 10
-        elif d and not a:
-            profit -= 5
-        elif not d and a:
-            profit -= 3
-    return profit
-
-# Test thresholds and track profits
+# Test thresholds and track profits (+10 approved good credit, -5 denied good credit, -3 approved bad credit)
 thresholds = np.arange(0, 101, 1)
-profits = [compute_profit(t, train_df) for t in thresholds]
-max_profit = max(profits)
-optimal_threshold = thresholds[profits.index(max_profit)]
+profits = table.profit(thresholds, SECTION_4_PROFITS)
 
 # Avoid low thresholds (per FAQ)
-if optimal_threshold <= 10:
-    print("Warning: Low threshold detected. Finding peak profit threshold.")
-    for i in range(10, len(profits)):
-        if i > 0 and profits[i] < profits[i-1]:  # Profit decreases
-            optimal_threshold = thresholds[i-1]
-            max_profit = profits[i-1]
-            break
+optimal_threshold, max_profit = profit_optimal_threshold(thresholds, profits)
 
 print(f"Optimal Threshold for Loan Approval: {optimal_threshold}")
 print(f"Maximum Profit Achieved: {max_profit}")
 
-# Step 4.3: Plot the threshold on the histogram
-plt.axvline(optimal_threshold, color='red', linestyle='--', linewidth=2,
-            label=f'Optimal Threshold: {optimal_threshold}')
-plt.legend(fontsize=12)
-plt.tight_layout()
-plt.savefig('creditworthiness_histogram.png')
-plt.show()
+# Steps 4.1 and 4.3: Histogram of creditworthiness scores with the threshold marked
+# (skipped when neither the scores nor the threshold have changed since the last run)
+render_figures([figure_spec(
+    'hist', 'creditworthiness_histogram.png', {'creditworthiness': train_df['creditworthiness'].to_numpy()},
+    series=['creditworthiness'], bins=20, colors=['skyblue'], edgecolor='black',
+    title='Creditworthiness Grouping of Customers in German Credit Dataset', title_fontsize=16,
+    xlabel='Creditworthiness Score', ylabel='Number of Customers', label_fontsize=14,
+    grid={'linestyle': '--', 'alpha': 0.7},
+    vlines=[{'x': optimal_threshold, 'color': 'red', 'linestyle': '--', 'linewidth': 2,
+             'label': f'Optimal Threshold: {optimal_threshold}'}],
+    legend={'fontsize': 12})])
 
 # Step 4.4: Compute favorable vs. unfavorable outcomes
-train_df['group'] = train_df['age'].apply(lambda x: 'Younger (<40)' if x < 40 else 'Older (>=40)')
-train_df['approved'] = train_df['creditworthiness'] >= optimal_threshold
-
-outcome_table = pd.crosstab(train_df['group'], train_df['approved'],
-                            rownames=['Age Group'], colnames=['Loan Outcome'])
-outcome_table.columns = ['Unfavorable (Denied)', 'Favorable (Approved)']
+approved = table.approvals(optimal_threshold)[:, 0]
+outcome_table = pd.DataFrame({
+    'Unfavorable (Denied)': table.group_sizes - approved,
+    'Favorable (Approved)': approved
+}, index=pd.Index(table.group_labels, name='Age Group')).sort_index()
 outcome_table_reset = outcome_table.reset_index()
 
 print("\nFavorable vs. Unfavorable Outcomes by Age Group in German Credit Data Training Set")
 print(outcome_table)
 outcome_table_reset.to_csv('favorable_unfavorable_outcomes.csv', index=False)
 print("\nTable saved to 'favorable_unfavorable_outcomes.csv'.")
-
-plt.close()
\ No newline at end of file
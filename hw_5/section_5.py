@@ -1,63 +1,98 @@
+import os
+import sys
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-
-# Define the fairness metrics data as provided
-fairness_data = {
-    'Metric': ['Disparate Impact', 'Equal Opportunity Difference'],
-    'Value': [1.02, 0.01],
-    'Ideal': [1.0, 0.0],
-    'Bias Threshold': ['<0.8', '<-0.1'],
-    'Bias Indication': ['Fair', 'Fair']
-}
-
-# Create DataFrame
-fairness_table = pd.DataFrame(fairness_data)
-
-# Save Fairness Metrics Table to CSV
-fairness_table.to_csv('fairness_metrics_table.csv', index=False)
-print("\nFairness Metrics Table:")
-print(fairness_table)
-
-# Plot 1: Disparate Impact
-plt.figure(figsize=(6, 4))
-plt.bar('Disparate Impact', 1.02, color='skyblue')
-plt.axhline(y=1.0, color='blue', linestyle='--', label='Ideal DI (1.0)')
-plt.axhline(y=0.8, color='red', linestyle='--', label='DI Bias Threshold (0.8)')
-plt.ylim(0, 1.5)
-for bar in plt.bar('Disparate Impact', [1.02]):
-    height = bar.get_height()
-    plt.text(bar.get_x() + bar.get_width() / 2, height, f'{height:.2f}', ha='center', va='bottom')
-plt.title('Disparate Impact for Age Groups')
-plt.ylabel('Ratio')
-plt.legend()
-plt.tight_layout()
-plt.savefig('disparate_impact.png')
-plt.close()
-
-# Plot 2: Equal Opportunity Difference
-plt.figure(figsize=(6, 4))
-plt.bar('Equal Opportunity Difference', 0.01, color='lightgreen')
-plt.axhline(y=0.0, color='green', linestyle='--', label='Ideal EOD (0.0)')
-plt.axhline(y=-0.1, color='red', linestyle='--', label='EOD Bias Threshold (-0.1)')
-plt.ylim(-0.2, 0.2)
-for bar in plt.bar('Equal Opportunity Difference', [0.01]):
-    height = bar.get_height()
-    plt.text(bar.get_x() + bar.get_width() / 2, height, f'{height:.2f}', ha='center', va='bottom')
-plt.title('Equal Opportunity Difference for Age Groups')
-plt.ylabel('Difference')
-plt.legend()
-plt.tight_layout()
-plt.savefig('equal_opportunity_difference.png')
-plt.close()
-
-# Explanation for Section 5
-explanation = """
-The Disparate Impact (DI) metric, with a value of 1.02, measures the ratio of loan approval rates between the unprivileged (Older >=40) and privileged (Younger <40) groups. An ideal value of 1.0 indicates equal treatment, while a value below 0.8 (a standard threshold from fairness guidelines) suggests bias favoring the privileged group. Here, the DI meets or exceeds the threshold of 0.8, indicating fair treatment.
-
-The Equal Opportunity Difference (EOD) metric, with a value of 0.01, assesses the difference in true positive rates (correct approvals for good credit risks) between groups. An ideal value of 0.0 signifies fairness, with bias indicated if EOD < -0.1 (a common threshold in fairness research). The EOD meets or exceeds the threshold of -0.1, suggesting fairness in true positive rates.
-
-The results both suggest fairness, as both metrics fall within acceptable ranges. The threshold of 0.8 for DI and -0.1 for EOD are adopted from established fairness standards (e.g., EEOC Four-Fifths Rule and equality of opportunity research) rather than calculated from the dataset, providing a consistent benchmark.
+from german_data import load_german_data, GermanDataError
+from split_cache import holdout_split
+from credit_model import calculate_creditworthiness, age_groups, good_credit, profit_optimal_threshold
+from fairness_curves import threshold_grid, fairness_curves, fairness_at
+from threshold_table import ThresholdTable, SECTION_4_PROFITS
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # repository root, for plot_renderer.py
+from plot_renderer import figure_spec, render_figures
+
+
+def main():
+    # Load the German Credit Dataset and the cached training/testing split (same split as Sections 4 and 6)
+    try:
+        df = load_german_data('german.data')
+    except FileNotFoundError:
+        print("Error: 'german.data' file not found. Please ensure the file is in the working directory.")
+        exit(1)
+    except GermanDataError as e:
+        print(f"Error: {e}")
+        exit(1)
+    train_df, test_df = holdout_split(df).frames(df)
+
+    # Score both sets with the creditworthiness model
+    thresholds = threshold_grid()
+    tables = {}
+    counts = {}
+    for name, split_df in [('train', train_df), ('test', test_df)]:
+        scores = calculate_creditworthiness(split_df)
+        tables[name] = ThresholdTable.from_scores(scores, good_credit(split_df), age_groups(split_df))
+        counts[name] = tables[name].counts(thresholds)
+
+    # Choose the profit-maximizing threshold on the training set (same rule and profits as Section 4)
+    profits = tables['train'].profit(thresholds, SECTION_4_PROFITS)
+    threshold, _ = profit_optimal_threshold(thresholds, profits)
+    print(f"Threshold used for evaluation (chosen on training set): {threshold}")
+
+    # Fairness curves for every threshold on the testing set
+    curves = fairness_curves(counts['test'], thresholds)
+    curves.to_csv('fairness_metric_curves.csv', index=False)
+    print("Fairness metric curves saved to 'fairness_metric_curves.csv'.")
+
+    # Fairness metrics at the chosen threshold
+    metrics = fairness_at(counts['test'], threshold)
+    di = metrics['disparate_impact']
+    eod = metrics['equal_opportunity_difference']
+
+    fairness_data = {
+        'Metric': ['Disparate Impact', 'Equal Opportunity Difference'],
+        'Value': [round(di, 2), round(eod, 2)],
+        'Ideal': [1.0, 0.0],
+        'Bias Threshold': ['<0.8', '<-0.1'],
+        'Bias Indication': ['Bias' if di < 0.8 else 'Fair', 'Bias' if eod < -0.1 else 'Fair']
+    }
+
+    # Create DataFrame
+    fairness_table = pd.DataFrame(fairness_data)
+
+    # Save Fairness Metrics Table to CSV
+    fairness_table.to_csv('fairness_metrics_table.csv', index=False)
+    print("\nFairness Metrics Table:")
+    print(fairness_table)
+
+    # Plot 1: Disparate Impact, and Plot 2: Equal Opportunity Difference (rendered in parallel,
+    # skipping any whose value has not changed since the last run)
+    render_figures([
+        figure_spec(
+            'bar', 'disparate_impact.png', {'categories': ['Disparate Impact'], 'values': [[di]]},
+            figsize=(6, 4), colors=['skyblue'], ylim=(0, 1.5), value_labels='{:.2f}',
+            hlines=[{'y': 1.0, 'color': 'blue', 'linestyle': '--', 'label': 'Ideal DI (1.0)'},
+                    {'y': 0.8, 'color': 'red', 'linestyle': '--', 'label': 'DI Bias Threshold (0.8)'}],
+            title='Disparate Impact for Age Groups', ylabel='Ratio', legend=True),
+        figure_spec(
+            'bar', 'equal_opportunity_difference.png', {'categories': ['Equal Opportunity Difference'], 'values': [[eod]]},
+            figsize=(6, 4), colors=['lightgreen'], ylim=(-0.2, 0.2), value_labels='{:.2f}',
+            hlines=[{'y': 0.0, 'color': 'green', 'linestyle': '--', 'label': 'Ideal EOD (0.0)'},
+                    {'y': -0.1, 'color': 'red', 'linestyle': '--', 'label': 'EOD Bias Threshold (-0.1)'}],
+            title='Equal Opportunity Difference for Age Groups', ylabel='Difference', legend=True)
+    ])
+
+    # Explanation for Section 5
+    di_verdict = "falls below the threshold of 0.8, indicating bias against the unprivileged group" if di < 0.8 else "meets or exceeds the threshold of 0.8, indicating fair treatment"
+    eod_verdict = "falls below the threshold of -0.1, suggesting bias in true positive rates" if eod < -0.1 else "meets or exceeds the threshold of -0.1, suggesting fairness in true positive rates"
+    explanation = f"""
+The Disparate Impact (DI) metric, with a value of {di:.2f}, measures the ratio of loan approval rates between the unprivileged (Older >=40) and privileged (Younger <40) groups. An ideal value of 1.0 indicates equal treatment, while a value below 0.8 (a standard threshold from fairness guidelines) suggests bias favoring the privileged group. Here, the DI {di_verdict}.
+
+The Equal Opportunity Difference (EOD) metric, with a value of {eod:.2f}, assesses the difference in true positive rates (correct approvals for good credit risks) between groups. An ideal value of 0.0 signifies fairness, with bias indicated if EOD < -0.1 (a common threshold in fairness research). The EOD {eod_verdict}.
+
+Both metrics are computed on the testing set at the profit-maximizing threshold ({threshold}) chosen on the training set. The threshold of 0.8 for DI and -0.1 for EOD are adopted from established fairness standards (e.g., EEOC Four-Fifths Rule and equality of opportunity research) rather than calculated from the dataset, providing a consistent benchmark.
 """
-print("\nSection 5 Explanation:")
-print(explanation)
\ No newline at end of file
+    print("\nSection 5 Explanation:")
+    print(explanation)
+
+
+if __name__ == "__main__":
+    main()
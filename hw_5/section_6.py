@@ -1,149 +1,121 @@
+import os
+import sys
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-from sklearn.model_selection import train_test_split
-
-# Load the German Credit Dataset
-column_names = [
-    'checking_account', 'duration', 'credit_history', 'purpose', 'credit_amount',
-    'savings_account', 'employment', 'installment_rate', 'personal_status', 'other_debtors',
-    'residence_since', 'property', 'age', 'other_plans', 'housing', 'existing_credits',
-    'job', 'liable_persons', 'telephone', 'foreign_worker', 'class'
-]
-
-try:
-    df = pd.read_csv('german.data', sep='\s+', header=None, names=column_names, engine='python')
-except FileNotFoundError:
-    print("Error: 'german.data' file not found. Please ensure the file is in the working directory.")
-    exit(1)
-
-# Convert numeric columns and handle missing values
-for col in ['age', 'duration', 'credit_amount', 'installment_rate']:
-    df[col] = pd.to_numeric(df[col], errors='coerce').fillna(df[col].median())
-
-# Split into training and testing sets (50% training)
-train_df, _ = train_test_split(df, test_size=0.5, random_state=42)
-
-# Define creditworthiness calculation function (from Step 3.2)
-def calculate_creditworthiness(row):
-    checking_account_score = {'A14': 1.0, 'A13': 0.75, 'A12': 0.5, 'A11': 0.0}.get(row['checking_account'], 0.0)
-    credit_history_score = {'A34': 1.0, 'A32': 0.75, 'A33': 0.5, 'A31': 0.25, 'A30': 0.0}.get(row['credit_history'], 0.0)
-    savings_account_score = {'A64': 1.0, 'A63': 0.75, 'A62': 0.5, 'A61': 0.25, 'A65': 0.0}.get(row['savings_account'], 0.0)
-    duration_score = 1 - (row['duration'] / 72)
-    credit_amount_score = 1 - (row['credit_amount'] / 20000)
-    installment_rate_score = 1 - (row['installment_rate'] / 4)
-    score = (0.25 * checking_account_score + 0.30 * credit_history_score + 0.20 * savings_account_score +
-             0.10 * duration_score + 0.10 * credit_amount_score + 0.05 * installment_rate_score) * 100
-    return min(max(score, 0), 100)
-
-# Apply creditworthiness calculation
-train_df['creditworthiness'] = train_df.apply(calculate_creditworthiness, axis=1)
-
-# Define groups based on age
-train_df['group'] = train_df['age'].apply(lambda x: 'Younger (<40)' if x < 40 else 'Older (>=40)')
-
-# Step 6.1: Select Different Thresholds
-# Initial threshold range based on creditworthiness distribution (0 to 100)
-threshold_range = np.arange(20, 50, 2)  # Test thresholds from 20 to 48
-priv_thresholds = []
-unpriv_thresholds = []
-
-# Step 6.2: Optimize Thresholds to Minimize Bias and Maximize Profit
-def calculate_disparate_impact(df, priv_threshold, unpriv_threshold):
-    priv_group = df[df['group'] == 'Younger (<40)']
-    unpriv_group = df[df['group'] == 'Older (>=40)']
-    priv_approved = (priv_group['creditworthiness'] >= priv_threshold).mean()
-    unpriv_approved = (unpriv_group['creditworthiness'] >= unpriv_threshold).mean()
-    if priv_approved == 0 or np.isnan(priv_approved) or np.isnan(unpriv_approved):
-        return np.inf
-    return abs(unpriv_approved / priv_approved - 1.0)  # Minimize deviation from 1.0
-
-def calculate_profit(df, priv_threshold, unpriv_threshold):
-    total_profit = 0
-    for index, row in df.iterrows():
-        threshold = priv_threshold if row['group'] == 'Younger (<40)' else unpriv_threshold
-        approved = row['creditworthiness'] >= threshold
-        if approved and row['class'] == 1:  # Good credit
-            total_profit += 1000  # Profit per approved good credit
-        elif approved and row['class'] == 2:  # Bad credit
-            total_profit -= 500  # Loss per approved bad credit
-    return total_profit
-
-best_di = float('inf')
-best_profit = float('-inf')
-best_priv_threshold = 30
-best_unpriv_threshold = 30
-
-# Grid search for optimal thresholds
-for priv_t in threshold_range:
-    for unpriv_t in threshold_range:
-        di = calculate_disparate_impact(train_df, priv_t, unpriv_t)
-        profit = calculate_profit(train_df, priv_t, unpriv_t)
+from german_data import load_german_data, GermanDataError
+from split_cache import holdout_split
+from credit_model import calculate_creditworthiness, age_groups, good_credit, PRIVILEGED, UNPRIVILEGED
+from threshold_table import ThresholdTable, SECTION_6_PROFITS
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # repository root, for plot_renderer.py
+from plot_renderer import figure_spec, render_figures
+
+
+def main():
+    # Load the German Credit Dataset (validated parse: categorical attribute codes, int32 numerics)
+    try:
+        df = load_german_data('german.data')
+    except FileNotFoundError:
+        print("Error: 'german.data' file not found. Please ensure the file is in the working directory.")
+        exit(1)
+    except GermanDataError as e:
+        print(f"Error: {e}")
+        exit(1)
+
+    # Split into training and testing sets (50% training), reusing the cached split indices
+    train_df, _ = holdout_split(df).frames(df)
+
+    # Apply creditworthiness calculation (from Step 3.2)
+    train_df['creditworthiness'] = calculate_creditworthiness(train_df)
+
+    # Build the per-group threshold table once for the scored training set
+    table = ThresholdTable.from_scores(train_df['creditworthiness'], good_credit(train_df), age_groups(train_df))
+
+    # Define groups based on age
+    train_df['group'] = train_df['age'].apply(lambda x: 'Younger (<40)' if x < 40 else 'Older (>=40)')
+
+    # Step 6.1: Select Different Thresholds
+    # Initial threshold range based on creditworthiness distribution (0 to 100)
+    threshold_range = np.arange(20, 50, 2)  # Test thresholds from 20 to 48
+    priv_thresholds = []
+    unpriv_thresholds = []
+
+    # Step 6.2: Optimize Thresholds to Minimize Bias and Maximize Profit
+    # Evaluate every (privileged, unprivileged) threshold pair at once: one column per pair
+    priv_grid, unpriv_grid = np.meshgrid(threshold_range, threshold_range, indexing='ij')
+    threshold_pairs = np.empty((table.n_groups, priv_grid.size), dtype=threshold_range.dtype)
+    threshold_pairs[PRIVILEGED] = priv_grid.ravel()
+    threshold_pairs[UNPRIVILEGED] = unpriv_grid.ravel()
+
+    # Deviation of disparate impact from 1.0 (inf when the privileged approval rate is 0)
+    di_deviation = np.abs(table.disparate_impact(threshold_pairs) - 1.0)
+    di_deviation[np.isnan(di_deviation)] = np.inf
+    # Profit per approved good credit (+1000) and per approved bad credit (-500)
+    pair_profits = table.profit(threshold_pairs, SECTION_6_PROFITS)
+
+    best_di = float('inf')
+    best_profit = float('-inf')
+    best_priv_threshold = 30
+    best_unpriv_threshold = 30
+
+    # Grid search for optimal thresholds
+    for i in range(threshold_pairs.shape[1]):
+        di, profit = di_deviation[i], pair_profits[i]
         if di < best_di and profit > best_profit:  # Prioritize fairness, then profit
             best_di = di
             best_profit = profit
-            best_priv_threshold = priv_t
-            best_unpriv_threshold = unpriv_t
-
-print(f"Optimized Thresholds - Privileged (Younger <40): {best_priv_threshold}, Unprivileged (Older >=40): {best_unpriv_threshold}")
-print(f"Best Disparate Impact Deviation: {best_di:.4f}, Best Profit: ${best_profit:.2f}")
-
-# Apply optimized thresholds
-train_df['approved_priv'] = train_df.apply(
-    lambda row: row['creditworthiness'] >= best_priv_threshold if row['group'] == 'Younger (<40)' else False, axis=1)
-train_df['approved_unpriv'] = train_df.apply(
-    lambda row: row['creditworthiness'] >= best_unpriv_threshold if row['group'] == 'Older (>=40)' else False, axis=1)
-train_df['approved'] = train_df['approved_priv'] | train_df['approved_unpriv']
-
-# Step 6.3: Plot Histograms (Split into two PNGs)
-# Separate data by credit risk and group
-good_credit = train_df[train_df['class'] == 1]
-bad_credit = train_df[train_df['class'] == 2]
-
-# Histogram for Younger (<40)
-plt.figure(figsize=(6, 4))
-group_data_good = good_credit[good_credit['group'] == 'Younger (<40)']['creditworthiness']
-group_data_bad = bad_credit[bad_credit['group'] == 'Younger (<40)']['creditworthiness']
-plt.hist([group_data_good, group_data_bad], bins=20, alpha=0.7, label=['Good Credit', 'Bad Credit'], color=['green', 'red'])
-plt.axvline(x=best_priv_threshold, color='blue', linestyle='--', label=f'Threshold ({best_priv_threshold})')
-plt.title('Creditworthiness Histogram for Younger Applicants (Age <40)')
-plt.xlabel('Creditworthiness Score')  # Added x-axis label
-plt.ylabel('Count')
-plt.legend()
-plt.tight_layout()
-plt.savefig('creditworthiness_histogram_younger.png')
-plt.close()
-
-# Histogram for Older (>=40)
-plt.figure(figsize=(6, 4))
-group_data_good = good_credit[good_credit['group'] == 'Older (>=40)']['creditworthiness']
-group_data_bad = bad_credit[bad_credit['group'] == 'Older (>=40)']['creditworthiness']
-plt.hist([group_data_good, group_data_bad], bins=20, alpha=0.7, label=['Good Credit', 'Bad Credit'], color=['green', 'red'])
-plt.axvline(x=best_unpriv_threshold, color='blue', linestyle='--', label=f'Threshold ({best_unpriv_threshold})')
-plt.title('Creditworthiness Histogram for Older Applicants (Age >=40)')
-plt.xlabel('Creditworthiness Score')  # Added x-axis label
-plt.ylabel('Count')
-plt.legend()
-plt.tight_layout()
-plt.savefig('creditworthiness_histogram_older.png')
-plt.close()
-
-# Step 6.4: Bias Mitigation Results
-print(f"\nStep 6.4: Bias Mitigation Results")
-print(f"1. Threshold values - Privileged (Younger <40): {best_priv_threshold}, Unprivileged (Older >=40): {best_unpriv_threshold}")
-print(f"2. Profit based on threshold values: ${best_profit:.2f}")
-
-# Step 6.5: Document Results Table
-approved_priv = train_df[(train_df['group'] == 'Younger (<40)') & train_df['approved']].shape[0]
-declined_priv = train_df[(train_df['group'] == 'Younger (<40)') & ~train_df['approved']].shape[0]
-approved_unpriv = train_df[(train_df['group'] == 'Older (>=40)') & train_df['approved']].shape[0]
-declined_unpriv = train_df[(train_df['group'] == 'Older (>=40)') & ~train_df['approved']].shape[0]
-
-results_table = pd.DataFrame({
-    'Group': ['Younger (<40)', 'Older (>=40)'],
-    'Approved': [approved_priv, approved_unpriv],
-    'Declined': [declined_priv, declined_unpriv]
-})
-results_table.to_csv('bias_mitigation_results.csv', index=False)
-print("\nStep 6.5: Bias Mitigation Results Table")
-print(results_table)
\ No newline at end of file
+            best_priv_threshold = threshold_pairs[PRIVILEGED, i]
+            best_unpriv_threshold = threshold_pairs[UNPRIVILEGED, i]
+
+    print(f"Optimized Thresholds - Privileged (Younger <40): {best_priv_threshold}, Unprivileged (Older >=40): {best_unpriv_threshold}")
+    print(f"Best Disparate Impact Deviation: {best_di:.4f}, Best Profit: ${best_profit:.2f}")
+
+    # Save the chosen thresholds for reuse (e.g. by scoring_service.py)
+    thresholds_table = pd.DataFrame({
+        'Group': table.group_labels,
+        'Threshold': [best_priv_threshold if g == PRIVILEGED else best_unpriv_threshold for g in range(table.n_groups)]
+    })
+    thresholds_table.to_csv('group_thresholds.csv', index=False)
+
+    # Apply optimized thresholds
+    group_thresholds = np.where(age_groups(train_df) == PRIVILEGED, best_priv_threshold, best_unpriv_threshold)
+    train_df['approved'] = train_df['creditworthiness'] >= group_thresholds
+
+    # Step 6.3: Plot Histograms (Split into two PNGs, rendered in parallel and skipped when unchanged)
+    # Separate data by credit risk and group
+    good_credit_df = train_df[train_df['class'] == 1]
+    bad_credit_df = train_df[train_df['class'] == 2]
+
+    specs = []
+    for group, threshold, title, file in [
+            ('Younger (<40)', best_priv_threshold, 'Creditworthiness Histogram for Younger Applicants (Age <40)', 'creditworthiness_histogram_younger.png'),
+            ('Older (>=40)', best_unpriv_threshold, 'Creditworthiness Histogram for Older Applicants (Age >=40)', 'creditworthiness_histogram_older.png')]:
+        group_data_good = good_credit_df[good_credit_df['group'] == group]['creditworthiness']
+        group_data_bad = bad_credit_df[bad_credit_df['group'] == group]['creditworthiness']
+        specs.append(figure_spec(
+            'hist', file, {'good': group_data_good.to_numpy(), 'bad': group_data_bad.to_numpy()},
+            figsize=(6, 4), series=['good', 'bad'], bins=20, alpha=0.7,
+            labels=['Good Credit', 'Bad Credit'], colors=['green', 'red'],
+            vlines=[{'x': threshold, 'color': 'blue', 'linestyle': '--', 'label': f'Threshold ({threshold})'}],
+            title=title, xlabel='Creditworthiness Score', ylabel='Count', legend=True))
+    render_figures(specs)
+
+    # Step 6.4: Bias Mitigation Results
+    print(f"\nStep 6.4: Bias Mitigation Results")
+    print(f"1. Threshold values - Privileged (Younger <40): {best_priv_threshold}, Unprivileged (Older >=40): {best_unpriv_threshold}")
+    print(f"2. Profit based on threshold values: ${best_profit:.2f}")
+
+    # Step 6.5: Document Results Table
+    approved = table.approvals([[best_priv_threshold], [best_unpriv_threshold]])[:, 0]
+
+    results_table = pd.DataFrame({
+        'Group': table.group_labels,
+        'Approved': approved,
+        'Declined': table.group_sizes - approved
+    })
+    results_table.to_csv('bias_mitigation_results.csv', index=False)
+    print("\nStep 6.5: Bias Mitigation Results Table")
+    print(results_table)
+
+
+if __name__ == "__main__":
+    main()
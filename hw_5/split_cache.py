@@ -0,0 +1,109 @@
+import os
+import hashlib
+import numpy as np
+import pandas as pd
+from credit_model import age_groups, good_credit
+
+# Directory (relative to the working directory) holding the cached split indices
+SPLIT_CACHE_DIR = 'split_cache'
+
+# Defaults shared by all hw_5 scripts
+SPLIT_SEED = 42
+TEST_SIZE = 0.5
+
+
+def dataset_hash(df):
+    """Content hash of a DataFrame (values only, row order included)."""
+    row_hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    return hashlib.sha256(row_hashes.tobytes()).hexdigest()[:16]
+
+
+def credit_strata(df):
+    """Stratum of every row: age group x credit class (4 strata)."""
+    return age_groups(df) * 2 + good_credit(df)
+
+
+class DataSplit:
+    """Split indices stored as one int32 permutation of the rows cut into parts.
+
+    A holdout split has two parts (train, test); a K-fold split has one part
+    per fold. Every part is a contiguous slice of the permutation, so the
+    index arrays handed out for test folds (and the holdout training set) are
+    views, not copies. The frames returned by frames() are row selections
+    (iloc with these index arrays), so they are copies.
+    """
+
+    def __init__(self, order, bounds, kind):
+        self.order = order      # int32 permutation of row positions
+        self.bounds = bounds    # int32 offsets: part k is order[bounds[k]:bounds[k + 1]]
+        self.kind = kind        # 'holdout' or 'kfold'
+
+    @property
+    def n_folds(self):
+        return 1 if self.kind == 'holdout' else len(self.bounds) - 1
+
+    def part(self, k):
+        return self.order[self.bounds[k]:self.bounds[k + 1]]
+
+    def fold(self, k=0):
+        """Return (train_index, test_index) row positions for fold k."""
+        if self.kind == 'holdout':
+            return self.part(0), self.part(1)
+        train = np.concatenate([self.part(j) for j in range(self.n_folds) if j != k])
+        return train, self.part(k)
+
+    def frames(self, df, k=0):
+        """Return (train_df, test_df) for fold k, keeping df's original index labels."""
+        train_index, test_index = self.fold(k)
+        return df.iloc[train_index], df.iloc[test_index]
+
+    def save(self, path):
+        np.savez(path, order=self.order, bounds=self.bounds, kind=np.array(self.kind))
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(data['order'], data['bounds'], str(data['kind']))
+
+
+def _cache_file(df, kind, size, seed, stratify, cache_dir):
+    strat = 'strat' if stratify else 'plain'
+    return os.path.join(cache_dir, f"{dataset_hash(df)}_{kind}{size}_{strat}_seed{seed}.npz")
+
+
+def _cached(path, n_rows, build):
+    if os.path.exists(path):
+        split = DataSplit.load(path)
+        if len(split.order) == n_rows:
+            return split
+    split = build()
+    try:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        split.save(path)
+    except OSError as e:
+        print(f"Warning: could not write split cache '{path}': {e}")
+    return split
+
+
+def holdout_split(df, test_size=TEST_SIZE, seed=SPLIT_SEED, stratify=True, cache_dir=SPLIT_CACHE_DIR):
+    """Train/test split of df, stratified by age group and credit class, computed once and cached."""
+    def build():
+        from sklearn.model_selection import train_test_split  # only needed on a cache miss
+        positions = np.arange(len(df), dtype=np.int32)
+        train, test = train_test_split(positions, test_size=test_size, random_state=seed,
+                                       stratify=credit_strata(df) if stratify else None)
+        order = np.concatenate([train, test]).astype(np.int32)
+        return DataSplit(order, np.array([0, len(train), len(order)], dtype=np.int32), 'holdout')
+    return _cached(_cache_file(df, 'holdout', test_size, seed, stratify, cache_dir), len(df), build)
+
+
+def kfold_split(df, n_folds=5, seed=SPLIT_SEED, stratify=True, cache_dir=SPLIT_CACHE_DIR):
+    """K-fold split of df (stratified by age group and credit class), computed once and cached."""
+    def build():
+        from sklearn.model_selection import StratifiedKFold, KFold  # only needed on a cache miss
+        splitter = (StratifiedKFold if stratify else KFold)(n_splits=n_folds, shuffle=True, random_state=seed)
+        test_folds = [test for _, test in splitter.split(np.zeros(len(df)), credit_strata(df))]
+        order = np.concatenate(test_folds).astype(np.int32)
+        bounds = np.concatenate([[0], np.cumsum([len(t) for t in test_folds])]).astype(np.int32)
+        return DataSplit(order, bounds, 'kfold')
+    return _cached(_cache_file(df, 'kfold', n_folds, seed, stratify, cache_dir), len(df), build)
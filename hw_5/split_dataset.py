@@ -1,115 +1,60 @@
-import pandas as pd
-from sklearn.model_selection import train_test_split
-
-# Define column names for German Credit Data Set (20 features + class = 21 columns)
-column_names = [
-    'checking_account', 'duration', 'credit_history', 'purpose', 'credit_amount',
-    'savings_account', 'employment', 'installment_rate', 'personal_status', 'other_debtors',
-    'residence_since', 'property', 'age', 'other_plans', 'housing', 'existing_credits',
-    'job', 'liable_persons', 'telephone', 'foreign_worker', 'class'
-]
-
-# Manual parsing: Read file, split on single space
+import sys
+import numpy as np
+from german_data import load_german_data, GermanDataError
+from split_cache import holdout_split, SPLIT_CACHE_DIR
+from credit_model import age_groups, PRIVILEGED, UNPRIVILEGED
+
+# Parse german.data in one pass: the parser checks every row has 21 columns and valid values,
+# reporting all problem rows with their line numbers
 try:
-    with open('german.data', 'r') as file:
-        lines = [line.rstrip().split(' ') for line in file]  # rstrip() removes trailing whitespace
-        # Remove any empty or whitespace-only strings
-        lines = [[item for item in row if item.strip()] for row in lines]
-    
-    # Check column counts and identify problematic rows
-    invalid_rows = [(i + 1, len(row), row) for i, row in enumerate(lines) if len(row) != 21]
-    if invalid_rows:
-        print("Error: The following rows do not have 21 columns:")
-        for row_num, col_count, row in invalid_rows:
-            print(f"Row {row_num}: {col_count} columns, Content: {' '.join(row)}")
-        print("Please check 'german.data' for formatting issues (e.g., extra spaces, tabs).")
-        exit(1)
-    
-    # If all rows have 21 columns, proceed
-    print(f"All {len(lines)} rows have 21 columns. First 3 rows for verification:")
-    for i, row in enumerate(lines[:3]):
-        print(f"Row {i+1}: {' '.join(row)}")
-    
-    # Check 13th column (age, Attribute 13) and 21st column (class) for first few rows
-    print("\n13th column (age, Attribute 13) in first 3 rows:")
-    for i, row in enumerate(lines[:3]):
-        print(f"Row {i+1}: {row[12]}")
-    print("\n21st column (class) in first 3 rows:")
-    for i, row in enumerate(lines[:3]):
-        print(f"Row {i+1}: {row[20]}")
-    
-    df = pd.DataFrame(lines, columns=column_names)
+    df = load_german_data('german.data')
 except FileNotFoundError:
-    print("Error: 'german.data' file not found in '/Users/yashpatel/Documents/AI Ethics and Society/AI-DataScience-Ethics/hw_5/'.")
+    print("Error: 'german.data' file not found in the working directory.")
     exit(1)
-except Exception as e:
-    print(f"Manual parsing failed: {e}. Trying pd.read_csv with sep='\\s+' as fallback.")
-    try:
-        df = pd.read_csv('german.data', sep='\s+', header=None, names=column_names, engine='python')
-    except Exception as e:
-        print(f"Fallback parsing failed: {e}. Verify 'german.data' format.")
-        exit(1)
-
-# Verify dataset structure
-if df.shape[1] != 21:
-    print(f"Error: Expected 21 columns, but found {df.shape[1]}. Check the dataset format.")
-    print("First 5 rows of all columns:")
-    print(df.head())
+except GermanDataError as e:
+    print(f"Error: {e}")
+    print("Please check 'german.data' for formatting issues (e.g., missing fields, unknown attribute codes).")
     exit(1)
+
+# If all rows have 21 columns, proceed
+print(f"All {len(df)} rows have 21 columns. First 3 rows for verification:")
+print(df.head(3).to_string())
+
 if df.shape[0] != 1000:
     print(f"Warning: Expected 1000 rows, but found {df.shape[0]}.")
 
 # Inspect the 'age' column (Attribute 13)
-print("\nFirst 5 rows of 'age' column before conversion:")
+print("\nFirst 5 rows of 'age' column:")
 print(df['age'].head())
-print("\nUnique values in 'age' column before conversion:")
+print("\nUnique values in 'age' column:")
 print(df['age'].unique())
 
-# Convert 'age' column to numeric
-try:
-    df['age'] = pd.to_numeric(df['age'], errors='raise')
-except ValueError:
-    print("Error: 'age' column contains non-numeric values. Expected integers (e.g., 67, 22).")
-    print("First 5 rows of all columns for debugging:")
-    print(df.head())
-    print("\nRaw data (first 3 rows):")
-    with open('german.data', 'r') as file:
-        for i, line in enumerate(file):
-            if i < 3:
-                print(f"Row {i+1}: {line.rstrip()}")
-    exit(1)
-
-# Check for NaN values
-nan_count = df['age'].isna().sum()
-if nan_count > 0:
-    print(f"Warning: {nan_count} 'age' values are NaN.")
-    median_age = df['age'].median()
-    print(f"Replacing NaN with median age: {median_age}")
-    df['age'] = df['age'].fillna(median_age)
-
 # Verify age distribution
-print("\nAge distribution after conversion:")
+print("\nAge distribution:")
 print(df['age'].describe())
 
-# Split dataset into training and testing sets (50% each)
-train_df, test_df = train_test_split(df, test_size=0.5, random_state=42)
+# Split dataset into training and testing sets (50% each, stratified by age group and class)
+# The indices are cached in split_cache/ and shared by the other hw_5 scripts
+split = holdout_split(df)
+train_index, test_index = split.fold()
 
-# Define privileged and unprivileged groups based on age
-train_df['group'] = train_df['age'].apply(lambda x: 'Younger' if x < 40 else 'Older')
-test_df['group'] = test_df['age'].apply(lambda x: 'Younger' if x < 40 else 'Older')
-
-# Count members in each group
-train_counts = train_df['group'].value_counts()
-test_counts = test_df['group'].value_counts()
+# Count members in each group (0 = Younger, privileged; 1 = Older, unprivileged) from the split indices
+groups = age_groups(df)
+train_counts = np.bincount(groups[train_index], minlength=2)
+test_counts = np.bincount(groups[test_index], minlength=2)
 
 # Report counts
 print("\nTraining Set:")
-print(f"  Privileged (Younger, age < 40): {train_counts.get('Younger', 0)}")
-print(f"  Unprivileged (Older, age >= 40): {train_counts.get('Older', 0)}")
+print(f"  Privileged (Younger, age < 40): {train_counts[PRIVILEGED]}")
+print(f"  Unprivileged (Older, age >= 40): {train_counts[UNPRIVILEGED]}")
 print("\nTesting Set:")
-print(f"  Privileged (Younger, age < 40): {test_counts.get('Younger', 0)}")
-print(f"  Unprivileged (Older, age >= 40): {test_counts.get('Older', 0)}")
-
-# Save the datasets
-train_df.to_csv('train_set.csv', index=False)
-test_df.to_csv('test_set.csv', index=False)
\ No newline at end of file
+print(f"  Privileged (Younger, age < 40): {test_counts[PRIVILEGED]}")
+print(f"  Unprivileged (Older, age >= 40): {test_counts[UNPRIVILEGED]}")
+print(f"\nSplit indices cached in '{SPLIT_CACHE_DIR}/'.")
+
+# The other scripts read the cached indices; CSV copies of the two sets are only written on request
+if '--csv' in sys.argv[1:]:
+    train_df, test_df = split.frames(df)
+    for name, part in [('train_set.csv', train_df), ('test_set.csv', test_df)]:
+        part.assign(group=np.where(age_groups(part) == PRIVILEGED, 'Younger', 'Older')).to_csv(name, index=False)
+    print("Training and testing sets saved as 'train_set.csv' and 'test_set.csv'.")
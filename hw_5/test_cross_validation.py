@@ -0,0 +1,65 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.model_selection import StratifiedKFold
+from german_data import load_german_data
+from credit_model import calculate_creditworthiness, age_groups, good_credit
+from fairness_curves import threshold_grid
+from threshold_table import ThresholdTable
+from cross_validation import cross_validate, fit_thresholds, summarize, cost_matrix, di_bounds, min_threshold, cv_seed
+
+GERMAN_DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'german.data')
+
+
+@pytest.fixture(scope='module')
+def df():
+    return load_german_data(GERMAN_DATA)
+
+
+@pytest.fixture(scope='module')
+def results(df):
+    return cross_validate(df, n_repeats=2, n_workers=1)
+
+
+def test_per_group_fit_is_the_best_feasible_pair(df):
+    table = ThresholdTable.from_scores(calculate_creditworthiness(df), good_credit(df), age_groups(df))
+    priv_t, unpriv_t = fit_thresholds(table, 'per_group', threshold_grid())
+    best = None
+    for priv in range(min_threshold + 1, 101):
+        unpriv = np.arange(min_threshold + 1, 101)
+        pairs = np.vstack([np.full(len(unpriv), priv), unpriv])
+        di = table.disparate_impact(pairs)
+        profit = np.where((di >= di_bounds[0]) & (di <= di_bounds[1]), table.profit(pairs, cost_matrix), -np.inf)
+        best = max(best or -np.inf, profit.max())
+    fitted = table.profit([[priv_t], [unpriv_t]], cost_matrix)[0]
+    assert fitted == best
+    assert di_bounds[0] <= table.disparate_impact([[priv_t], [unpriv_t]])[0] <= di_bounds[1]
+    assert fit_thresholds(table, 'single', threshold_grid())[0] > min_threshold
+
+
+def test_held_out_rows_match_a_direct_refit(df, results):
+    assert len(results) == 2 * 5 * 2
+    scores, labels, groups = calculate_creditworthiness(df).to_numpy(), good_credit(df), age_groups(df)
+    folds = StratifiedKFold(n_splits=5, shuffle=True, random_state=cv_seed + 1)
+    train, test = list(folds.split(scores, groups * 2 + labels))[3]
+    train_table = ThresholdTable.from_scores(scores[train], labels[train], groups[train])
+    test_table = ThresholdTable.from_scores(scores[test], labels[test], groups[test])
+    for mode in ('single', 'per_group'):
+        row = results[(results['repeat'] == 1) & (results['fold'] == 3) & (results['mode'] == mode)].iloc[0]
+        pair = [[v] for v in fit_thresholds(train_table, mode, threshold_grid())]
+        assert (row['priv_threshold'], row['unpriv_threshold']) == (pair[0][0], pair[1][0])
+        assert row['profit'] == test_table.profit(pair, cost_matrix)[0]
+        assert row['disparate_impact'] == pytest.approx(test_table.disparate_impact(pair)[0], nan_ok=True)
+
+
+def test_results_do_not_depend_on_workers(df, results):
+    pd.testing.assert_frame_equal(cross_validate(df, n_repeats=2, n_workers=2), results)
+
+
+def test_summary_has_one_row_per_mode(results):
+    summary = summarize(results)
+    assert summary['mode'].tolist() == ['single', 'per_group']
+    single = results[results['mode'] == 'single']
+    assert summary.loc[0, 'profit mean'] == pytest.approx(single['profit'].mean())
+    assert summary.loc[0, 'profit var'] == pytest.approx(single['profit'].var())
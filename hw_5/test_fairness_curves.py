@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+from fairness_curves import threshold_grid, safe_ratio, fairness_curves, threshold_index, fairness_at
+from threshold_table import ThresholdTable
+from credit_model import PRIVILEGED, UNPRIVILEGED
+
+
+@pytest.fixture
+def scored():
+    rng = np.random.default_rng(0)
+    scores = rng.integers(0, 101, 800)
+    labels = rng.random(800) < 0.3 + scores / 200
+    groups = (rng.random(800) < 0.35).astype(int)
+    return scores, labels, groups
+
+
+def direct_metrics(scores, labels, groups, priv_threshold, unpriv_threshold):
+    """Fairness metrics from the approved/denied decisions themselves."""
+    approved = scores >= np.where(groups == PRIVILEGED, priv_threshold, unpriv_threshold)
+    rate = lambda mask: approved[mask].mean()
+    priv, unpriv = groups == PRIVILEGED, groups == UNPRIVILEGED
+    tpr_diff = rate(unpriv & labels) - rate(priv & labels)
+    fpr_diff = rate(unpriv & ~labels) - rate(priv & ~labels)
+    return {
+        'disparate_impact': rate(unpriv) / rate(priv),
+        'statistical_parity_difference': rate(unpriv) - rate(priv),
+        'equal_opportunity_difference': tpr_diff,
+        'equalized_odds_difference': max(abs(tpr_diff), abs(fpr_diff)),
+        'predictive_parity_difference': labels[unpriv & approved].mean() - labels[priv & approved].mean()
+    }
+
+
+def test_grid_and_lookup():
+    np.testing.assert_allclose(threshold_grid(0, 1, 0.25), [0, 0.25, 0.5, 0.75, 1])
+    assert threshold_index(37) == 37 and threshold_index(0.5, step=0.25) == 2
+    with pytest.raises(ValueError):
+        threshold_index(3.5)
+    with pytest.raises(ValueError):
+        threshold_index(101, n_thresholds=101)
+
+
+def test_safe_ratio():
+    np.testing.assert_array_equal(safe_ratio([1, 2, 3], [2, 0, -1]), [0.5, np.nan, np.nan])
+
+
+@pytest.mark.parametrize('priv_threshold, unpriv_threshold', [(50, 50), (40, 65), (0, 90)])
+def test_lookup_matches_direct_computation(scored, priv_threshold, unpriv_threshold):
+    counts = ThresholdTable.from_scores(*scored).counts(threshold_grid())
+    expected = direct_metrics(*scored, priv_threshold, unpriv_threshold)
+    assert fairness_at(counts, priv_threshold, unpriv_threshold) == pytest.approx(expected)
+
+
+def test_curves_have_one_row_per_threshold(scored):
+    counts = ThresholdTable.from_scores(*scored).counts(threshold_grid())
+    curves = fairness_curves(counts, threshold_grid())
+    assert len(curves) == 101 and curves['threshold'].iloc[-1] == 100
+    row = curves.set_index('threshold').loc[60]
+    assert row.to_dict() == pytest.approx(direct_metrics(*scored, 60, 60))
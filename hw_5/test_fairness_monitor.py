@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+from fairness_monitor import FairnessMonitor, window_metrics, event_cells, N_CELLS
+
+
+def events(n_events=2600, seed=0):
+    rng = np.random.default_rng(seed)
+    groups = rng.integers(0, 2, n_events)
+    decisions = (rng.random(n_events) < 0.6 - 0.2 * groups).astype(int)
+    labels = np.where(rng.random(n_events) < 0.5, rng.integers(0, 2, n_events), -1).astype(float)
+    labels[::97] = np.nan
+    return groups, decisions, labels
+
+
+def brute_force(groups, decisions, labels, window, report_points, sliding):
+    """window_metrics of the events in each reported window, counted directly."""
+    counts = []
+    for end in report_points:
+        start = max(end - window, 0) if sliding else end - window
+        cells = event_cells(groups[start:end], decisions[start:end], labels[start:end])
+        counts.append(np.bincount(cells, minlength=N_CELLS))
+    return window_metrics(np.array(counts))
+
+
+@pytest.mark.parametrize('mode, window, report_every', [('sliding', 500, 130), ('sliding', 300, 1000), ('tumbling', 400, None)])
+def test_batches_match_direct_counts(mode, window, report_every):
+    groups, decisions, labels = events()
+    monitor = FairnessMonitor(window, mode, report_every or window)
+    reports = pd.concat([monitor.update_batch(groups[start:start + 333], decisions[start:start + 333], labels[start:start + 333])
+                         for start in range(0, len(groups), 333)], ignore_index=True)
+    step = monitor.report_every
+    points = np.arange(step, len(groups) + 1, step)
+    np.testing.assert_array_equal(reports['event'], points)
+    expected = brute_force(groups, decisions, labels, window, points, mode == 'sliding')
+    pd.testing.assert_frame_equal(reports.drop(columns='event'), expected)
+
+
+def test_single_updates_match_batch():
+    groups, decisions, labels = events(900, seed=1)
+    single = FairnessMonitor(250, 'sliding', 100)
+    rows = [single.update(g, d, None if np.isnan(l) or l < 0 else l) for g, d, l in zip(groups, decisions, labels)]
+    batch = FairnessMonitor(250, 'sliding', 100).update_batch(groups, decisions, labels)
+    pd.testing.assert_frame_equal(pd.concat([row for row in rows if row is not None], ignore_index=True), batch)
+
+
+def test_alerts_need_enough_events():
+    # Privileged group approved at 80%, unprivileged at 40%: DI 0.5
+    cells = np.zeros((2, 2, 3), dtype=int)
+    cells[0, 1, 2], cells[0, 0, 2], cells[1, 1, 2], cells[1, 0, 2] = 80, 20, 40, 60
+    report = window_metrics(np.stack([cells.ravel(), cells.ravel() // 10]))
+    assert report['disparate_impact'].tolist() == pytest.approx([0.5, 0.5])
+    assert report['alert_di'].tolist() == [True, False]
+    assert not report['alert_eod'].any()  # no labelled events
+
+
+def test_unknown_mode_raises():
+    with pytest.raises(ValueError):
+        FairnessMonitor(10, 'hopping')
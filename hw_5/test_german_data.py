@@ -0,0 +1,61 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from german_data import parse_german_data, load_german_data, GermanDataError, COLUMN_NAMES, CATEGORIES
+
+GERMAN_DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'german.data')
+
+
+def write(tmp_path, content):
+    path = tmp_path / 'german.data'
+    path.write_bytes(content)
+    return str(path)
+
+
+def test_matches_pandas():
+    columns = load_german_data(GERMAN_DATA)
+    expected = pd.read_csv(GERMAN_DATA, sep=' ', header=None, names=COLUMN_NAMES)
+    for name in COLUMN_NAMES:
+        assert columns[name].astype(str if name in CATEGORIES else np.int64).tolist() == expected[name].tolist()
+
+
+@pytest.mark.parametrize('chunk_bytes', [1, 7, 100, 4096])
+def test_chunk_size_does_not_change_result(chunk_bytes):
+    expected = parse_german_data(GERMAN_DATA)
+    columns = parse_german_data(GERMAN_DATA, chunk_bytes=chunk_bytes)
+    for name in COLUMN_NAMES:
+        np.testing.assert_array_equal(columns[name], expected[name])
+
+
+@pytest.mark.parametrize('content', [b'', b'\n', b'\n\n  \n'])
+def test_blank_file_gives_empty_columns(tmp_path, content):
+    columns = parse_german_data(write(tmp_path, content))
+    assert all(len(columns[name]) == 0 for name in COLUMN_NAMES)
+    assert len(load_german_data(write(tmp_path, content))) == 0
+
+
+@pytest.mark.parametrize('chunk_bytes', [4, 1024])
+def test_only_malformed_lines_raise(tmp_path, chunk_bytes):
+    path = write(tmp_path, b'A11 6 A34\n' * 3)
+    with pytest.raises(GermanDataError) as error:
+        parse_german_data(path, chunk_bytes=chunk_bytes)
+    assert [line for line, _ in error.value.bad_lines] == [1, 2, 3]
+
+
+def test_all_bad_chunk_among_good_lines(tmp_path):
+    with open(GERMAN_DATA, 'rb') as file:
+        good = file.readline()
+    path = write(tmp_path, good + b'A11 6 A34\n' * 3 + good)
+    with pytest.raises(GermanDataError) as error:
+        parse_german_data(path, chunk_bytes=len(good) + 1)
+    assert [line for line, _ in error.value.bad_lines] == [2, 3, 4]
+
+
+def test_unknown_values_are_reported(tmp_path):
+    with open(GERMAN_DATA, 'rb') as file:
+        fields = file.readline().split()
+    fields[0], fields[1] = b'A19', b'6x'
+    with pytest.raises(GermanDataError) as error:
+        parse_german_data(write(tmp_path, b' '.join(fields) + b'\n'))
+    assert len(error.value.bad_lines) == 2
@@ -0,0 +1,104 @@
+import json
+import asyncio
+import pytest
+import scoring_service
+from scoring_service import validate_applicant, start_service, ScoringService, ThroughputWindow, max_body_bytes
+
+GROUP_THRESHOLDS = [50.0, 45.0]
+APPLICANT = {
+    'checking_account': 'A14', 'credit_history': 'A34', 'savings_account': 'A64',
+    'duration': 12, 'credit_amount': 2000, 'installment_rate': 2, 'age': 35
+}
+
+
+def with_field(**fields):
+    return {**APPLICANT, **fields}
+
+
+def test_valid_applicant_numerics_become_floats():
+    assert validate_applicant(APPLICANT)['duration'] == 12.0
+
+
+@pytest.mark.parametrize('applicant', [
+    [APPLICANT],
+    {k: v for k, v in APPLICANT.items() if k != 'age'},
+    with_field(checking_account='ZZZ'),
+    with_field(credit_history='A14'),
+    with_field(savings_account=None),
+    with_field(savings_account=['A64']),
+    with_field(duration='12'),
+    with_field(credit_amount=True),
+    with_field(age=10 ** 400),
+])
+def test_invalid_applicants_are_rejected(applicant):
+    with pytest.raises(ValueError):
+        validate_applicant(applicant)
+
+
+async def _request(service, payload):
+    task = asyncio.create_task(service.run_batcher())
+    try:
+        return await service.handle_request('POST', '/score', json.dumps(payload).encode())
+    finally:
+        task.cancel()
+
+
+def test_unknown_code_is_a_bad_request():
+    status, payload = asyncio.run(_request(ScoringService(GROUP_THRESHOLDS), [APPLICANT, with_field(checking_account='ZZZ')]))
+    assert status == 400 and 'checking_account' in payload['error']
+
+
+def test_batch_decisions_match_one_by_one():
+    applicants = [with_field(age=age, duration=duration) for age in (25, 45) for duration in (6, 60)]
+    service = ScoringService(GROUP_THRESHOLDS)
+    status, payload = asyncio.run(_request(service, applicants))
+    assert status == 200
+    assert payload['decisions'] == [service.score_batch([validate_applicant(a)])[0] for a in applicants]
+    assert [d['group'] for d in payload['decisions']] == ['Younger (<40)'] * 2 + ['Older (>=40)'] * 2
+
+
+async def _http(raw_requests):
+    service, server, batcher = await start_service(GROUP_THRESHOLDS, '127.0.0.1', 0)
+    try:
+        reader, writer = await asyncio.open_connection(*server.sockets[0].getsockname()[:2])
+        responses = []
+        for raw in raw_requests:
+            writer.write(raw)
+            await writer.drain()
+            status, body = await scoring_service._read_response(reader)
+            responses.append((status, json.loads(body)))
+        writer.close()
+        return responses
+    finally:
+        batcher.cancel()
+        server.close()
+
+
+def test_http_keep_alive_and_errors():
+    responses = asyncio.run(_http([
+        scoring_service._post_request('/score', [APPLICANT] * 3),
+        scoring_service._post_request('/score', with_field(age='old')),
+        scoring_service._post_request('/score', APPLICANT),
+        b'GET /metrics HTTP/1.1\r\nHost: x\r\n\r\n',
+    ]))
+    assert [status for status, _ in responses] == [200, 400, 200, 200]
+    assert len(responses[0][1]['decisions']) == 3
+    assert responses[3][1]['decisions'] == 4 and responses[3][1]['requests'] == 2
+
+
+def test_oversized_body_is_refused_unread():
+    raw = f"POST /score HTTP/1.1\r\nHost: x\r\nContent-Length: {max_body_bytes + 1}\r\n\r\n".encode()
+    [(status, payload)] = asyncio.run(_http([raw]))
+    assert status == 413
+
+
+def test_throughput_counts_only_the_recent_window(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(scoring_service.time, 'perf_counter', lambda: now[0])
+    window = ThroughputWindow(window=10.0)
+    window.add(500)
+    now[0] += 5
+    assert window.per_second() == 100.0
+    now[0] += 100
+    window.add(200)
+    assert window.per_second() == 20.0
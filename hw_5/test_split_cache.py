@@ -0,0 +1,45 @@
+import os
+import numpy as np
+import pytest
+from german_data import load_german_data
+from split_cache import holdout_split, kfold_split, credit_strata
+
+GERMAN_DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'german.data')
+
+
+@pytest.fixture(scope='module')
+def df():
+    return load_german_data(GERMAN_DATA)
+
+
+def test_holdout_split_is_a_stratified_partition(df, tmp_path):
+    train, test = holdout_split(df, cache_dir=str(tmp_path)).fold()
+    np.testing.assert_array_equal(np.sort(np.concatenate([train, test])), np.arange(len(df)))
+    strata = credit_strata(df)
+    assert np.abs(np.bincount(strata[train], minlength=4) - np.bincount(strata[test], minlength=4)).max() <= 1
+
+
+def test_split_is_cached_and_reloaded(df, tmp_path):
+    first = holdout_split(df, cache_dir=str(tmp_path))
+    assert len(os.listdir(tmp_path)) == 1
+    second = holdout_split(df, cache_dir=str(tmp_path))
+    np.testing.assert_array_equal(first.order, second.order)
+    other_seed = holdout_split(df, seed=7, cache_dir=str(tmp_path))
+    assert len(os.listdir(tmp_path)) == 2
+    assert not np.array_equal(first.order, other_seed.order)
+
+
+def test_kfold_test_folds_partition_the_rows(df, tmp_path):
+    split = kfold_split(df, n_folds=5, cache_dir=str(tmp_path))
+    tests = [split.fold(k)[1] for k in range(split.n_folds)]
+    np.testing.assert_array_equal(np.sort(np.concatenate(tests)), np.arange(len(df)))
+    for k in range(split.n_folds):
+        train, test = split.fold(k)
+        assert len(train) + len(test) == len(df) and not np.intersect1d(train, test).size
+
+
+def test_frames_keep_the_original_index(df, tmp_path):
+    split = holdout_split(df, cache_dir=str(tmp_path))
+    train_df, test_df = split.frames(df)
+    np.testing.assert_array_equal(train_df.index.to_numpy(), split.fold()[0])
+    assert train_df.equals(df.loc[train_df.index])
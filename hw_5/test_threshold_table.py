@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+from sklearn.metrics import confusion_matrix
+from threshold_table import ThresholdTable, SECTION_4_PROFITS
+
+
+@pytest.fixture
+def scored():
+    rng = np.random.default_rng(0)
+    scores = rng.integers(0, 40, 500).astype(float)  # integer scores, so thresholds hit ties
+    labels = rng.random(500) < scores / 50 + 0.2
+    groups = (rng.random(500) < 0.4).astype(int)
+    return scores, labels, groups
+
+
+def test_counts_match_sklearn(scored):
+    scores, labels, groups = scored
+    table = ThresholdTable.from_scores(scores, labels, groups)
+    thresholds = np.array([-1, 0, 10, 17.5, 25, 39, 100])
+    counts = table.counts(thresholds)
+    for g in range(table.n_groups):
+        for k, threshold in enumerate(thresholds):
+            in_group = groups == g
+            tn, fp, fn, tp = confusion_matrix(labels[in_group], scores[in_group] >= threshold, labels=[False, True]).ravel()
+            assert (counts['tn'][g, k], counts['fp'][g, k], counts['fn'][g, k], counts['tp'][g, k]) == (tn, fp, fn, tp)
+
+
+def test_per_group_thresholds_and_profit(scored):
+    scores, labels, groups = scored
+    table = ThresholdTable.from_scores(scores, labels, groups)
+    per_group = np.array([[10.0, 20.0], [15.0, 30.0]])
+    approvals = table.approvals(per_group)
+    for g in range(2):
+        for k in range(2):
+            assert approvals[g, k] == ((groups == g) & (scores >= per_group[g, k])).sum()
+    approved = scores >= np.where(groups == 0, 10.0, 15.0)
+    expected = (SECTION_4_PROFITS['tp'] * (approved & labels).sum() + SECTION_4_PROFITS['fp'] * (approved & ~labels).sum()
+                + SECTION_4_PROFITS['fn'] * (~approved & labels).sum())
+    assert table.profit(per_group)[0] == expected
+    with pytest.raises(ValueError):
+        table.counts(np.zeros((3, 2)))
+
+
+def test_disparate_impact(scored):
+    scores, labels, groups = scored
+    table = ThresholdTable.from_scores(scores, labels, groups)
+    approved = scores >= 20
+    expected = approved[groups == 1].mean() / approved[groups == 0].mean()
+    assert table.disparate_impact(20.0)[0] == pytest.approx(expected)
+
+
+def test_save_and_load_round_trip(scored, tmp_path):
+    table = ThresholdTable.from_scores(*scored)
+    table.save(tmp_path / 'table.npz')
+    loaded = ThresholdTable.load(tmp_path / 'table.npz')
+    assert loaded.group_labels == table.group_labels
+    thresholds = np.linspace(0, 40, 17)
+    for name, values in table.counts(thresholds).items():
+        np.testing.assert_array_equal(loaded.counts(thresholds)[name], values)
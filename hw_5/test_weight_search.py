@@ -0,0 +1,41 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from german_data import load_german_data
+from credit_model import calculate_creditworthiness, age_groups, good_credit, FEATURE_NAMES, WEIGHTS
+from threshold_table import ThresholdTable
+from weight_search import search_weights, cost_matrix, di_bounds, min_threshold
+
+GERMAN_DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'german.data')
+
+
+@pytest.fixture(scope='module')
+def df():
+    return load_german_data(GERMAN_DATA)
+
+
+def test_batched_search_matches_the_threshold_table(df):
+    ranking = search_weights(df, n_candidates=300, n_workers=1)
+    assert len(ranking) == 300 and ranking['hand_picked'].sum() == 1 and ranking['feasible'].iloc[0]
+    np.testing.assert_allclose(ranking.loc[0, [f'w_{name}' for name in FEATURE_NAMES]].to_numpy(dtype=float), WEIGHTS)
+    thresholds = np.arange(101)
+    for index in list(ranking.index[:5]) + [0]:
+        weights = ranking.loc[index, [f'w_{name}' for name in FEATURE_NAMES]].to_numpy(dtype=float)
+        table = ThresholdTable.from_scores(calculate_creditworthiness(df, weights), good_credit(df), age_groups(df))
+        profit = table.profit(thresholds, cost_matrix)
+        di = table.disparate_impact(thresholds)
+        feasible = (di >= di_bounds[0]) & (di <= di_bounds[1]) & (thresholds > min_threshold)
+        row = ranking.loc[index]
+        assert row['feasible'] == feasible.any()
+        if row['feasible']:
+            assert row['train_profit'] == profit[feasible].max()
+            assert feasible[row['threshold']] and row['train_di'] == pytest.approx(di[row['threshold']])
+
+
+def test_ranking_does_not_depend_on_workers(df):
+    one = search_weights(df, n_candidates=4500, n_workers=1)
+    two = search_weights(df, n_candidates=4500, n_workers=2)
+    pd.testing.assert_frame_equal(one, two)
+    ordered = one[one['feasible']]['train_profit'].to_numpy()
+    assert (np.diff(ordered) <= 0).all()
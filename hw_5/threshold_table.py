@@ -0,0 +1,118 @@
+import os
+import sys
+import numpy as np
+from credit_model import GROUP_LABELS, PRIVILEGED, UNPRIVILEGED
+from fairness_curves import group_rates, fairness_from_rates
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # repository root, for instrumentation.py
+from instrumentation import instrumented
+
+# Cost matrices: value of each outcome of an approval decision
+# (tp = approved good credit, fp = approved bad credit, fn = denied good credit, tn = denied bad credit)
+SECTION_4_PROFITS = {'tp': 10, 'fp': -3, 'fn': -5, 'tn': 0}
+SECTION_6_PROFITS = {'tp': 1000, 'fp': -500, 'fn': 0, 'tn': 0}
+
+
+class ThresholdTable:
+    """Per-group sorted scores and cumulative counts for one scored dataset.
+
+    Built once per dataset and group column, the table answers confusion
+    counts, approvals, profit and fairness metrics for any threshold vector
+    without rescoring. Thresholds may be a scalar (shared by all groups), a
+    1-D array of candidate thresholds shared by all groups, or an
+    (n_groups x m) array holding one threshold per group for m candidates.
+    Applicants are approved when score >= threshold.
+    """
+
+    def __init__(self, sorted_scores, cum_positives, group_labels=GROUP_LABELS):
+        self.sorted_scores = sorted_scores   # list of ascending score arrays, one per group
+        self.cum_positives = cum_positives   # list of arrays: positives among the k lowest scores
+        self.group_labels = list(group_labels)
+
+    @classmethod
+    def from_scores(cls, scores, labels, groups, group_labels=GROUP_LABELS):
+        """Build the table from scores, boolean labels (True = good credit) and group codes."""
+        scores = np.asarray(scores, dtype=float)
+        labels = np.asarray(labels, dtype=bool)
+        groups = np.asarray(groups)
+        sorted_scores, cum_positives = [], []
+        for g in range(len(group_labels)):
+            in_group = groups == g
+            order = np.argsort(scores[in_group], kind='stable')
+            sorted_scores.append(scores[in_group][order])
+            cum_positives.append(np.concatenate([[0], np.cumsum(labels[in_group][order])]).astype(np.int64))
+        return cls(sorted_scores, cum_positives, group_labels)
+
+    @property
+    def n_groups(self):
+        return len(self.group_labels)
+
+    @property
+    def group_sizes(self):
+        return np.array([len(s) for s in self.sorted_scores])
+
+    def _per_group(self, thresholds):
+        thresholds = np.asarray(thresholds, dtype=float)
+        if thresholds.ndim < 2:
+            thresholds = np.broadcast_to(np.atleast_1d(thresholds), (self.n_groups, thresholds.size))
+        if thresholds.shape[0] != self.n_groups:
+            raise ValueError(f"Expected one row of thresholds per group ({self.n_groups}), got {thresholds.shape[0]}.")
+        return thresholds
+
+    @instrumented('credit.sweep', rows=lambda counts: counts['tp'].shape[1])  # rows: candidate thresholds
+    def counts(self, thresholds):
+        """Confusion counts 'tp', 'fp', 'fn', 'tn', each of shape (n_groups, m)."""
+        thresholds = self._per_group(thresholds)
+        counts = {name: np.zeros(thresholds.shape, dtype=np.int64) for name in ['tp', 'fp', 'fn', 'tn']}
+        for g in range(self.n_groups):
+            cum = self.cum_positives[g]
+            below = np.searchsorted(self.sorted_scores[g], thresholds[g], side='left')  # denied applicants
+            counts['fn'][g] = cum[below]
+            counts['tn'][g] = below - counts['fn'][g]
+            counts['tp'][g] = cum[-1] - counts['fn'][g]
+            counts['fp'][g] = len(self.sorted_scores[g]) - cum[-1] - counts['tn'][g]
+        return counts
+
+    def approvals(self, thresholds):
+        """Approved applicants per group, shape (n_groups, m)."""
+        counts = self.counts(thresholds)
+        return counts['tp'] + counts['fp']
+
+    def profit(self, thresholds, cost_matrix=SECTION_4_PROFITS):
+        """Total profit over all groups for each of the m candidate thresholds."""
+        counts = self.counts(thresholds)
+        return sum(cost_matrix.get(name, 0) * counts[name] for name in counts).sum(axis=0)
+
+    def fairness(self, thresholds):
+        """Fairness metrics (DI, SPD, EOD, equalized odds, predictive parity) for each candidate."""
+        rates = group_rates(self.counts(thresholds))
+        priv = {name: r[PRIVILEGED] for name, r in rates.items()}
+        unpriv = {name: r[UNPRIVILEGED] for name, r in rates.items()}
+        return fairness_from_rates(priv, unpriv)
+
+    def disparate_impact(self, thresholds):
+        return self.fairness(thresholds)['disparate_impact']
+
+    def equal_opportunity_difference(self, thresholds):
+        return self.fairness(thresholds)['equal_opportunity_difference']
+
+    def save(self, path):
+        """Write the table to a .npz file so it can be queried without rescoring."""
+        np.savez(
+            path,
+            scores=np.concatenate(self.sorted_scores),
+            cum_positives=np.concatenate(self.cum_positives),
+            group_sizes=self.group_sizes,
+            group_labels=np.array(self.group_labels)
+        )
+
+    @classmethod
+    def load(cls, path):
+        """Read a table written by save()."""
+        with np.load(path) as data:
+            sizes = data['group_sizes']
+            score_splits = np.cumsum(sizes)[:-1]
+            cum_splits = np.cumsum(sizes + 1)[:-1]
+            sorted_scores = np.split(data['scores'], score_splits)
+            cum_positives = np.split(data['cum_positives'], cum_splits)
+            group_labels = data['group_labels'].tolist()
+        return cls(sorted_scores, cum_positives, group_labels)
@@ -0,0 +1,131 @@
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+from credit_model import (feature_matrix, score_features, age_groups, good_credit, FEATURE_NAMES, WEIGHTS,
+                          MAX_DURATION, MAX_CREDIT, PRIVILEGED, UNPRIVILEGED)
+from german_data import load_german_data, GermanDataError
+from split_cache import holdout_split
+from threshold_table import ThresholdTable, SECTION_4_PROFITS
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # repository root, for parallel.py
+from parallel import parallel_map, worker_data
+
+# Search settings
+n_candidates = 100000      # Candidate weight vectors drawn uniformly from the simplex
+batch_size = 2000          # Candidates scored per matrix product
+search_seed = 42
+di_bounds = (0.8, 1.25)    # Four-fifths rule, applied in both directions
+min_threshold = 10         # Thresholds at or below this are not allowed (per FAQ)
+cost_matrix = SECTION_4_PROFITS
+max_duration = MAX_DURATION
+max_credit = MAX_CREDIT
+top_k = 20
+
+# Integer thresholds 0-100; approval at threshold t means score >= t, i.e. floor(score) >= t
+N_BINS = 101
+
+def evaluate_batch(weights):
+    """Best feasible threshold, profit and DI for every candidate in a (b x 6) weight batch.
+
+    Scores for the whole batch come from one (rows x 6) @ (6 x b) product. Each
+    candidate's scores are binned by integer threshold per (group, label) cell
+    with a single bincount, and reverse cumulative sums turn the bins into
+    approval counts for all 101 thresholds.
+    """
+    features, cells, totals = worker_data()
+    n_batch = len(weights)
+    bins = np.floor(score_features(features, weights.T)).astype(np.int64)     # (rows x b)
+    index = (cells[:, None] * N_BINS + bins) + np.arange(n_batch) * (4 * N_BINS)
+    hist = np.bincount(index.ravel(), minlength=n_batch * 4 * N_BINS).reshape(n_batch, 4, N_BINS)
+    approved = hist[:, :, ::-1].cumsum(axis=2)[:, :, ::-1]                   # (b x cell x threshold)
+
+    # Cells: group * 2 + label, where label 1 = good credit
+    tp = approved[:, 1] + approved[:, 3]
+    fp = approved[:, 0] + approved[:, 2]
+    fn = totals['good'] - tp
+    tn = totals['bad'] - fp
+    profit = (cost_matrix.get('tp', 0) * tp + cost_matrix.get('fp', 0) * fp +
+              cost_matrix.get('fn', 0) * fn + cost_matrix.get('tn', 0) * tn)
+
+    priv_rate = (approved[:, 2 * PRIVILEGED] + approved[:, 2 * PRIVILEGED + 1]) / totals['priv']
+    unpriv_rate = (approved[:, 2 * UNPRIVILEGED] + approved[:, 2 * UNPRIVILEGED + 1]) / totals['unpriv']
+    with np.errstate(divide='ignore', invalid='ignore'):
+        di = np.where(priv_rate > 0, unpriv_rate / priv_rate, np.nan)
+
+    feasible = (di >= di_bounds[0]) & (di <= di_bounds[1])
+    feasible[:, :min_threshold + 1] = False
+    masked = np.where(feasible, profit, np.iinfo(np.int64).min)
+    best_t = masked.argmax(axis=1)
+    rows = np.arange(n_batch)
+    return best_t, profit[rows, best_t], di[rows, best_t], feasible[rows, best_t]
+
+
+def search_weights(train_df, n_candidates=n_candidates, seed=search_seed, n_workers=None):
+    """Score n_candidates random simplex weightings and return them ranked by feasible profit.
+
+    The hand-picked WEIGHTS are always evaluated as the first candidate.
+    """
+    features = feature_matrix(train_df, max_duration, max_credit)
+    groups = age_groups(train_df)
+    labels = good_credit(train_df)
+    cells = (groups * 2 + labels).astype(np.int64)
+    totals = {
+        'good': int(labels.sum()), 'bad': int((~labels).sum()),
+        'priv': int((groups == PRIVILEGED).sum()), 'unpriv': int((groups == UNPRIVILEGED).sum())
+    }
+
+    rng = np.random.default_rng(seed)
+    candidates = rng.dirichlet(np.ones(len(FEATURE_NAMES)), size=n_candidates)
+    candidates[0] = WEIGHTS
+    batches = [candidates[i:i + batch_size] for i in range(0, n_candidates, batch_size)]
+
+    results = parallel_map(evaluate_batch, batches, n_workers, data=(features, cells, totals))
+
+    threshold, profit, di, feasible = (np.concatenate(parts) for parts in zip(*results))
+    ranking = pd.DataFrame(candidates, columns=[f'w_{name}' for name in FEATURE_NAMES])
+    ranking['threshold'] = threshold
+    ranking['train_profit'] = profit
+    ranking['train_di'] = di
+    ranking['feasible'] = feasible
+    ranking['hand_picked'] = False
+    ranking.loc[0, 'hand_picked'] = True
+    return ranking.sort_values(['feasible', 'train_profit'], ascending=False, kind='stable')
+
+
+def main():
+    try:
+        df = load_german_data('german.data')
+    except FileNotFoundError:
+        print("Error: 'german.data' file not found. Please ensure the file is in the working directory.")
+        exit(1)
+    except GermanDataError as e:
+        print(f"Error: {e}")
+        exit(1)
+    train_df, test_df = holdout_split(df).frames(df)
+
+    start = time.perf_counter()
+    ranking = search_weights(train_df)
+    elapsed = time.perf_counter() - start
+    print(f"Evaluated {n_candidates} candidate weightings in {elapsed:.2f} seconds.")
+
+    # Check the best candidates (and the hand-picked weights) on the testing set
+    report = pd.concat([ranking.head(top_k), ranking[ranking['hand_picked']]]).drop_duplicates()
+    test_features = feature_matrix(test_df, max_duration, max_credit)
+    test_profit, test_di = [], []
+    for _, row in report.iterrows():
+        weights = row[[f'w_{name}' for name in FEATURE_NAMES]].to_numpy(dtype=float)
+        table = ThresholdTable.from_scores(score_features(test_features, weights), good_credit(test_df), age_groups(test_df))
+        test_profit.append(int(table.profit(row['threshold'], cost_matrix)[0]))
+        test_di.append(float(table.disparate_impact(row['threshold'])[0]))
+    report['test_profit'] = test_profit
+    report['test_di'] = test_di
+
+    report.to_csv('weight_search_results.csv', index=False)
+    print(f"\nTop {top_k} weightings (profit subject to {di_bounds[0]} <= DI <= {di_bounds[1]}):")
+    print(report.round(4).to_string(index=False))
+    print("\nResults saved to 'weight_search_results.csv'.")
+
+
+if __name__ == "__main__":
+    main()
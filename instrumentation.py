@@ -0,0 +1,306 @@
+"""Per-stage timing and memory traces, written as JSON lines.
+
+Tracing is off unless the ANALYSIS_TRACE environment variable names a trace
+file (analyze.py --trace and pipeline.py --trace set it). While it is off,
+stage() hands back one shared do-nothing context manager and instrumented()
+returns the function it decorates unchanged, so instrumented code runs as
+if it were not instrumented.
+
+    with stage('load', rows=len(df)):             # or: with stage('load') as s: ...; s.rows = len(df)
+        ...
+
+    @instrumented('score', rows=len)              # rows: function of the return value
+    def score(df): ...
+
+Every finished stage appends one line to the trace: its name, the enclosing
+stage, wall and CPU seconds, row count, the process's peak RSS so far and,
+with ANALYSIS_TRACE_MEMORY=1, the peak memory traced by tracemalloc inside
+the stage. tracemalloc slows allocation-heavy code a lot, which is why it is
+opt-in. With ANALYSIS_PROFILE set to a directory, every outermost stage is
+also run under cProfile and dumped there as <stage>.<pid>.prof.
+
+trace_libraries() records the usual suspects as stages of their own:
+pandas CSV reads and writes, apply, iterrows, matplotlib savefig and the
+aif360 dataset conversion and reweighing.
+
+The analyses mark their own stage boundaries: credit.parse
+(german_data.load_german_data), credit.score (calculate_creditworthiness),
+credit.sweep (ThresholdTable.counts, behind every threshold sweep),
+drug.parse (load_coded_dataset), drug.bootstrap (bootstrap_spd_di),
+drug.reweigh and drug.repair in the final project scripts, and
+figures.render in plot_renderer.render_figures.
+
+    python instrumentation.py trace.jsonl         summarize a trace by stage
+"""
+import os
+import sys
+import json
+import time
+import resource
+import functools
+
+TRACE_ENV = 'ANALYSIS_TRACE'
+MEMORY_ENV = 'ANALYSIS_TRACE_MEMORY'
+PROFILE_ENV = 'ANALYSIS_PROFILE'
+
+# Open stages of this process, innermost last
+_open_stages = []
+
+
+def enabled():
+    return bool(os.environ.get(TRACE_ENV))
+
+
+class _NullStage:
+    """The stage handed out while tracing is off; accepts and ignores everything."""
+    rows = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __setattr__(self, name, value):
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    def __init__(self, name, rows, fields):
+        self.name = name
+        self.rows = rows
+        self.fields = fields
+        self.profiler = None
+        self.traced_peak = 0
+
+    def __enter__(self):
+        self.parent = _open_stages[-1] if _open_stages else None
+        if os.environ.get(MEMORY_ENV) == '1':
+            import tracemalloc
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            current, peak = tracemalloc.get_traced_memory()
+            if self.parent is not None:
+                self.parent.traced_peak = max(self.parent.traced_peak, peak)
+            tracemalloc.reset_peak()
+            self.traced_start = current
+        if os.environ.get(PROFILE_ENV) and not any(s.profiler for s in _open_stages):
+            import cProfile
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        _open_stages.append(self)
+        self.start_wall = time.perf_counter()
+        self.start_cpu = time.process_time()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        wall = time.perf_counter() - self.start_wall
+        cpu = time.process_time() - self.start_cpu
+        _open_stages.pop()
+        record = _record(self.name, self.parent, wall, cpu, self.rows)
+        if hasattr(self, 'traced_start'):
+            import tracemalloc
+            peak = max(self.traced_peak, tracemalloc.get_traced_memory()[1])
+            record['traced_peak_mb'] = round((peak - self.traced_start) / 2 ** 20, 2)
+            if self.parent is not None:
+                self.parent.traced_peak = max(self.parent.traced_peak, peak)
+        if exc_type is not None:
+            record['error'] = exc_type.__name__
+        if self.profiler is not None:
+            self.profiler.disable()
+            directory = os.environ[PROFILE_ENV]
+            os.makedirs(directory, exist_ok=True)
+            file_name = ''.join(c if c.isalnum() or c in '-_.' else '_' for c in self.name)
+            record['profile'] = os.path.join(directory, f'{file_name}.{os.getpid()}.prof')
+            self.profiler.dump_stats(record['profile'])
+        record.update(self.fields)
+        _write(record)
+        return False
+
+
+def _record(name, parent, wall, cpu, rows):
+    return {
+        'stage': name,
+        'parent': parent.name if parent is not None else None,
+        'wall_s': round(wall, 6),
+        'cpu_s': round(cpu, 6),
+        'rows': rows,
+        'peak_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),  # KiB on Linux
+        'pid': os.getpid(),
+        'end': round(time.time(), 3)
+    }
+
+
+def _write(record):
+    # One short append per record, so the stages of pool workers can share the trace file
+    with open(os.environ[TRACE_ENV], 'a') as file:
+        file.write(json.dumps(record, default=str) + '\n')
+
+
+def stage(name, rows=None, **fields):
+    """Context manager recording one named stage; extra keyword fields are written with its record."""
+    if not os.environ.get(TRACE_ENV):
+        return _NULL_STAGE
+    return _Stage(name, rows, fields)
+
+
+def instrumented(name=None, rows=None):
+    """Decorator recording every call as a stage; rows is an optional function of the return value.
+
+    Decided once, when the function is decorated: with tracing off the
+    function itself is returned.
+    """
+    def decorate(func):
+        if not enabled():
+            return func
+        stage_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(stage_name) as s:
+                result = func(*args, **kwargs)
+                if rows is not None:
+                    s.rows = rows(result)
+                return result
+        return wrapper
+    return decorate
+
+
+def _len_or_none(value):
+    try:
+        return len(value)
+    except TypeError:
+        return None
+
+
+def _wrap(owner, attribute, name, rows_of):
+    """Replace owner.attribute with a version recorded as stage `name`; rows_of(args, result) gives the rows."""
+    func = getattr(owner, attribute)
+    if getattr(func, '_instrumented', False):
+        return
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with stage(name) as s:
+            result = func(*args, **kwargs)
+            s.rows = rows_of(args, result)
+            return result
+    wrapper._instrumented = True
+    setattr(owner, attribute, wrapper)
+
+
+def _wrap_iterrows(frame_class):
+    """iterrows is lazy: record the time spent producing rows, summed over the whole loop."""
+    func = frame_class.iterrows
+    if getattr(func, '_instrumented', False):
+        return
+
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        rows = func(self, *args, **kwargs)
+        parent = _open_stages[-1] if _open_stages else None
+        count, wall, cpu = 0, 0.0, 0.0
+        try:
+            while True:
+                start_wall, start_cpu = time.perf_counter(), time.process_time()
+                try:
+                    row = next(rows)
+                except StopIteration:
+                    return
+                finally:
+                    wall += time.perf_counter() - start_wall
+                    cpu += time.process_time() - start_cpu
+                count += 1
+                yield row
+        finally:
+            if enabled():
+                _write(_record('pandas.iterrows', parent, wall, cpu, count))
+    wrapper._instrumented = True
+    frame_class.iterrows = wrapper
+
+
+def _patch(module_name):
+    if module_name == 'pandas':
+        import pandas as pd
+        _wrap(pd, 'read_csv', 'pandas.read_csv', lambda args, result: _len_or_none(result))
+        _wrap(pd.DataFrame, 'to_csv', 'pandas.to_csv', lambda args, result: len(args[0]))
+        _wrap(pd.DataFrame, 'apply', 'pandas.DataFrame.apply', lambda args, result: len(args[0]))
+        _wrap(pd.Series, 'apply', 'pandas.Series.apply', lambda args, result: len(args[0]))
+        _wrap_iterrows(pd.DataFrame)
+    elif module_name == 'matplotlib.pyplot':
+        import matplotlib.figure
+        _wrap(matplotlib.figure.Figure, 'savefig', 'matplotlib.savefig', lambda args, result: None)
+    elif module_name == 'aif360.datasets':
+        # Taken from sys.modules: the import hook patches before the parent package has the attribute
+        datasets = sys.modules[module_name]
+        _wrap(datasets.BinaryLabelDataset, '__init__', 'aif360.BinaryLabelDataset',
+              lambda args, result: len(args[0].features))  # args[0]: the dataset, after __init__
+    elif module_name == 'aif360.algorithms.preprocessing':
+        preprocessing = sys.modules[module_name]
+        _wrap(preprocessing.Reweighing, 'fit_transform', 'aif360.Reweighing.fit_transform',
+              lambda args, result: len(result.features))
+
+
+_LIBRARY_MODULES = ['pandas', 'matplotlib.pyplot', 'aif360.datasets', 'aif360.algorithms.preprocessing']
+
+
+class _PatchOnImport:
+    """Import hook patching a library module right after it is first imported, so tracing never imports one itself."""
+
+    def find_spec(self, fullname, path, target=None):
+        if fullname not in _LIBRARY_MODULES:
+            return None
+        import importlib.util
+        sys.meta_path.remove(self)
+        try:
+            spec = importlib.util.find_spec(fullname)
+        finally:
+            sys.meta_path.insert(0, self)
+        if spec is None or spec.loader is None:
+            return spec
+        exec_module = spec.loader.exec_module
+
+        def exec_and_patch(module):
+            exec_module(module)
+            sys.modules[fullname] = module
+            _patch(fullname)
+        spec.loader.exec_module = exec_and_patch
+        return spec
+
+
+def trace_libraries():
+    """Record pandas, matplotlib and aif360 hot spots as stages (no-op while tracing is off)."""
+    if not enabled():
+        return
+    for module_name in _LIBRARY_MODULES:
+        if module_name in sys.modules:
+            _patch(module_name)
+    if not any(isinstance(finder, _PatchOnImport) for finder in sys.meta_path):
+        sys.meta_path.insert(0, _PatchOnImport())
+
+
+def summarize(path):
+    """Print calls, total wall and CPU seconds, rows and peak RSS per stage name, slowest first."""
+    totals = {}
+    with open(path) as file:
+        for line in file:
+            record = json.loads(line)
+            total = totals.setdefault(record['stage'], {'calls': 0, 'wall_s': 0.0, 'cpu_s': 0.0, 'rows': 0, 'peak_rss_mb': 0.0})
+            total['calls'] += 1
+            total['wall_s'] += record['wall_s']
+            total['cpu_s'] += record['cpu_s']
+            total['rows'] += record['rows'] or 0
+            total['peak_rss_mb'] = max(total['peak_rss_mb'], record['peak_rss_mb'])
+    print(f"{'Stage':<40}{'Calls':>7}{'Wall s':>10}{'CPU s':>10}{'Rows':>12}{'Peak RSS MB':>13}")
+    for name, total in sorted(totals.items(), key=lambda item: -item[1]['wall_s']):
+        print(f"{name:<40}{total['calls']:>7}{total['wall_s']:>10.3f}{total['cpu_s']:>10.3f}{total['rows']:>12}{total['peak_rss_mb']:>13.1f}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python instrumentation.py TRACE_JSONL")
+        exit()
+    summarize(sys.argv[1])
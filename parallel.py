@@ -0,0 +1,109 @@
+"""Process-pool helpers shared by the analysis scripts.
+
+    results = parallel_map(run_block, tasks, n_workers, data=matrix)
+
+parallel_map runs func on every task across a process pool and returns the
+results in task order. Large read-only inputs go in data: every worker
+receives them once (not once per task) and func reads them with
+worker_data(). With one worker, or one task, everything runs in the calling
+process and no pool is started. parallel_imap does the same for a lazy
+stream of tasks (e.g. the chunks of a CSV file), yielding results as they
+finish in order and holding only a few tasks at a time.
+
+Monte Carlo jobs split their replicates with seeded_blocks(): every block
+gets its own child of one SeedSequence, so results do not depend on the
+number of workers.
+
+Modules in the project folders append the repository root to sys.path
+before importing it, so their scripts also run from their own folder.
+"""
+import os
+import itertools
+import collections
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+# Upper bound on the size of one block of replicate weights (replicates x rows) in bytes
+MAX_BLOCK_BYTES = 64 * 1024 * 1024
+
+# Data shared with the tasks of the current parallel_map (set by _set_data in every worker)
+_worker_data = None
+
+
+def _set_data(data):
+    global _worker_data
+    _worker_data = data
+
+
+def worker_data():
+    """The data passed to the parallel_map that is running the current task."""
+    return _worker_data
+
+
+def _init_worker(data, initializer, initargs):
+    _set_data(data)
+    if initializer is not None:
+        initializer(*initargs)
+
+
+def parallel_map(func, tasks, n_workers=None, data=None, initializer=None, initargs=(), chunksize=1):
+    """[func(task) for task in tasks], spread over a process pool.
+
+    n_workers defaults to one per task, up to the CPU count. data is handed
+    to every worker once and read with worker_data(); initializer(*initargs)
+    also runs once per worker (e.g. to attach shared memory). func,
+    initializer and every task must be picklable, i.e. module-level.
+    """
+    tasks = list(tasks)
+    if n_workers is None:
+        n_workers = min(len(tasks), os.cpu_count() or 1)
+    if n_workers <= 1 or len(tasks) <= 1:
+        _init_worker(data, initializer, initargs)
+        try:
+            return [func(task) for task in tasks]
+        finally:
+            _set_data(None)
+    with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker,
+                             initargs=(data, initializer, initargs)) as pool:
+        return list(pool.map(func, tasks, chunksize=chunksize))
+
+
+def parallel_imap(func, tasks, n_workers=None, data=None, max_pending=None):
+    """Yield func(task) for every task of a (lazy) iterable, in order, spread over a process pool.
+
+    Unlike parallel_map, tasks are read from the iterable only as workers
+    free up: at most max_pending (default two per worker) are submitted at
+    once. n_workers defaults to the CPU count; with one worker everything
+    runs in the calling process.
+    """
+    if n_workers is None:
+        n_workers = os.cpu_count() or 1
+    if n_workers <= 1:
+        _init_worker(data, None, ())
+        try:
+            for task in tasks:
+                yield func(task)
+        finally:
+            _set_data(None)
+        return
+    max_pending = max_pending or 2 * n_workers
+    tasks = iter(tasks)
+    with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker,
+                             initargs=(data, None, ())) as pool:
+        pending = collections.deque(pool.submit(func, task) for task in itertools.islice(tasks, max_pending))
+        while pending:
+            result = pending.popleft().result()
+            for task in itertools.islice(tasks, 1):
+                pending.append(pool.submit(func, task))
+            yield result
+
+
+def block_size(n_rows, max_replicates, max_bytes=MAX_BLOCK_BYTES):
+    """Replicates per block: at most max_replicates, and few enough that a block of float64 weights fits max_bytes."""
+    return max(1, min(max_replicates, max_bytes // (8 * max(n_rows, 1))))
+
+
+def seeded_blocks(n_replicates, size, seed):
+    """[(replicates, SeedSequence)] blocks of at most size replicates covering n_replicates, one seed child each."""
+    sizes = [min(size, n_replicates - start) for start in range(0, n_replicates, size)]
+    return list(zip(sizes, np.random.SeedSequence(seed).spawn(len(sizes))))
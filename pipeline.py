@@ -0,0 +1,303 @@
+"""Run the multi-step projects as dependency graphs, re-running only stale stages.
+
+    python pipeline.py                      run every pipeline
+    python pipeline.py drug toxicity        run the named pipelines
+    python pipeline.py --dry-run            show what would run
+    python pipeline.py --force              re-run every stage
+    python pipeline.py --jobs=N             run up to N independent stages at once
+    python pipeline.py --trace[=FILE]       record per-stage timings (see instrumentation.py)
+
+A stage is one of the analyze.py steps plus the files it reads (inputs), the
+command-line arguments it is given (its parameters) and the files it writes
+(outputs). A stage that reads another stage's output runs after it. Each
+stage is keyed by a content hash of its script and the local modules it
+imports, its arguments and its input files. The outputs of every key that
+ran are kept in .pipeline_cache/, so a stage whose key is unchanged is
+skipped, or has its outputs copied back if they were changed or deleted.
+Stages that are ready at the same time run in parallel in a process pool,
+one fresh process per stage, with output going to .pipeline_cache/logs/.
+The metrics in the outputs of stages that ran are added to the results
+store (results_store.py) as a new run.
+"""
+import os
+import re
+import sys
+import json
+import shutil
+import hashlib
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from analyze import ROOT, ANALYSES, enable_tracing
+
+CACHE_DIR = os.path.join(ROOT, '.pipeline_cache')
+MANIFEST_FILE = os.path.join(CACHE_DIR, 'manifest.json')
+OBJECTS_DIR = os.path.join(CACHE_DIR, 'objects')
+LOGS_DIR = os.path.join(CACHE_DIR, 'logs')
+
+
+def stage(analysis, step, inputs, outputs, args=()):
+    """A stage running analyze.py's `analysis step [args]`; inputs and outputs are relative to the step's folder."""
+    folder = ANALYSES[analysis][0]
+    return {
+        'name': f'{analysis}:{step}',
+        'analysis': analysis,
+        'step': step,
+        'args': list(args),
+        'inputs': [os.path.join(folder, file) for file in inputs],
+        'outputs': [os.path.join(folder, file) for file in outputs]
+    }
+
+
+PIPELINES = {
+    # step3_withgraphs.py is left out: it rewrites the reweight stage's metric files with a different layout
+    'drug': [
+        stage('drug', 'prepare', ['drug_consumption.data'], ['drug_consumption_processed.csv']),
+        stage('drug', 'remover', ['drug_consumption_processed.csv'], ['original_fairness_metrics.csv', 'transformed_fairness_metrics.csv']),
+        stage('drug', 'reweight', ['drug_consumption_processed.csv'], ['before_fairness_metrics.csv', 'after_fairness_metrics.csv'])
+    ],
+    'toxicity': [
+        stage('toxicity', 'reduce', ['toxity_per_attribute.csv'], ['reduced_dataset.csv']),
+        stage('toxicity', 'compact', ['toxity_per_attribute.csv'], ['compacted_dataset.csv', 'correlation_results.csv', 'report_outputs.txt']),
+        stage('toxicity', 'sections', ['reduced_dataset.csv'], ['toxicity_statistics.csv', 'sampling_distribution_summary.csv']),
+        stage('toxicity', 'scatter', ['compacted_dataset.csv'], ['Disability_avg_toxicity_scatter.png', 'Religion_avg_toxicity_scatter.png', 'Sexual Orientation_avg_toxicity_scatter.png'])
+    ]
+}
+
+
+def upstream_stages(stages):
+    """Map each stage name to the names of the stages producing its inputs; raises ValueError on shared outputs or cycles."""
+    producers = {}
+    for s in stages:
+        for output in s['outputs']:
+            if output in producers:
+                raise ValueError(f"'{output}' is an output of both '{producers[output]}' and '{s['name']}'.")
+            producers[output] = s['name']
+    upstream = {s['name']: sorted({producers[i] for i in s['inputs'] if i in producers}) for s in stages}
+
+    # Depth-first walk to reject cycles
+    state = {}
+    def visit(name, path):
+        if state.get(name) == 'visiting':
+            raise ValueError(f"Stage cycle: {' -> '.join(path + [name])}")
+        if state.get(name) != 'done':
+            state[name] = 'visiting'
+            for parent in upstream[name]:
+                visit(parent, path + [name])
+            state[name] = 'done'
+    for name in upstream:
+        visit(name, [])
+    return upstream
+
+
+def load_manifest():
+    try:
+        with open(MANIFEST_FILE) as file:
+            return json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {'files': {}, 'stages': {}}
+
+
+def save_manifest(manifest):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    with open(MANIFEST_FILE, 'w') as file:
+        json.dump(manifest, file, indent=2, sort_keys=True)
+
+
+def file_hash(path, manifest):
+    """SHA-256 of a file under ROOT, reused from the manifest while its size and mtime are unchanged."""
+    stat = os.stat(os.path.join(ROOT, path))
+    signature = [stat.st_size, stat.st_mtime_ns]
+    known = manifest['files'].get(path)
+    if known and known[:2] == signature:
+        return known[2]
+    digest = hashlib.sha256()
+    with open(os.path.join(ROOT, path), 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b''):
+            digest.update(block)
+    manifest['files'][path] = signature + [digest.hexdigest()]
+    return digest.hexdigest()
+
+
+def code_files(script):
+    """The script plus every module of its folder or the repository root it imports, directly or indirectly."""
+    directory = os.path.dirname(script)
+    files, todo = [], [script]
+    while todo:
+        path = todo.pop()
+        if path in files:
+            continue
+        files.append(path)
+        with open(path) as file:
+            for module in re.findall(r'^\s*(?:from|import)\s+(\w+)', file.read(), re.MULTILINE):
+                for folder in (directory, ROOT):
+                    if os.path.exists(os.path.join(folder, module + '.py')):
+                        todo.append(os.path.join(folder, module + '.py'))
+                        break
+    return sorted(os.path.relpath(path, ROOT) for path in files)
+
+
+def stage_key(s, manifest):
+    """Content hash of a stage's code, arguments and inputs."""
+    folder, _, steps = ANALYSES[s['analysis']]
+    script = os.path.join(ROOT, folder, steps[s['step']][0])
+    code = {path: file_hash(path, manifest) for path in code_files(script)}
+    inputs = {path: file_hash(path, manifest) for path in s['inputs']}
+    return hashlib.sha256(json.dumps([s['name'], s['args'], code, inputs], sort_keys=True).encode()).hexdigest()
+
+
+def store_outputs(s, manifest):
+    """Copy a stage's outputs into the object store; returns {output: hash}."""
+    os.makedirs(OBJECTS_DIR, exist_ok=True)
+    stored = {}
+    for output in s['outputs']:
+        h = file_hash(output, manifest)
+        if not os.path.exists(os.path.join(OBJECTS_DIR, h)):
+            shutil.copyfile(os.path.join(ROOT, output), os.path.join(OBJECTS_DIR, h))
+        stored[output] = h
+    return stored
+
+
+def restore_outputs(stored, manifest):
+    """Bring every output back to its stored content; returns False if an object is missing from the store."""
+    current = {output: file_hash(output, manifest) if os.path.exists(os.path.join(ROOT, output)) else None for output in stored}
+    changed = [output for output, h in stored.items() if current[output] != h]
+    if any(not os.path.exists(os.path.join(OBJECTS_DIR, stored[output])) for output in changed):
+        return False
+    for output in changed:
+        shutil.copyfile(os.path.join(OBJECTS_DIR, stored[output]), os.path.join(ROOT, output))
+        file_hash(output, manifest)
+    return changed
+
+
+def _run_stage(analysis, step, args, log_file):
+    """Pool worker: run one analyze.py step with its output going to log_file; returns the exit code."""
+    import analyze
+    with open(log_file, 'w') as log:
+        os.dup2(log.fileno(), 1)
+        os.dup2(log.fileno(), 2)
+        try:
+            return analyze.run_step(analysis, step, args)
+        except BaseException:
+            import traceback
+            traceback.print_exc()
+            return 1
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+
+
+def check_stage(s, manifest, force):
+    """(status, key) for a stage whose upstream stages are finished; status 'run' means it must be executed."""
+    missing = [i for i in s['inputs'] if not os.path.exists(os.path.join(ROOT, i))]
+    if missing:
+        if all(os.path.exists(os.path.join(ROOT, o)) for o in s['outputs']):
+            return f"kept (missing input {', '.join(missing)}; using the existing outputs)", None
+        return f"blocked (missing input {', '.join(missing)})", None
+    key = stage_key(s, manifest)
+    if force or key not in manifest['stages']:
+        return 'run', key
+    restored = restore_outputs(manifest['stages'][key], manifest)
+    if restored is False:
+        return 'run', key
+    return (f"restored {', '.join(os.path.basename(o) for o in restored)}" if restored else 'up to date'), key
+
+
+def run_pipeline(stages, n_workers=None, force=False, dry_run=False):
+    """Run stages in dependency order, skipping those whose key is cached; returns {stage name: status}."""
+    upstream = upstream_stages(stages)
+    by_name = {s['name']: s for s in stages}
+    manifest = load_manifest()
+    status, running, keys = {}, {}, {}
+    if n_workers is None:
+        n_workers = os.cpu_count() or 1
+    os.makedirs(LOGS_DIR, exist_ok=True)
+
+    pool = None
+    try:
+        while len(status) < len(stages):
+            for name in by_name:
+                if name in status or name in running.values() or any(p not in status for p in upstream[name]):
+                    continue
+                s = by_name[name]
+                if any(status[p].startswith(('failed', 'blocked')) for p in upstream[name]):
+                    status[name] = 'blocked (upstream stage did not finish)'
+                elif any(status[p].startswith('would run') for p in upstream[name]):
+                    status[name] = 'would run (upstream changes)'
+                elif dry_run:
+                    missing = [i for i in s['inputs'] if not os.path.exists(os.path.join(ROOT, i))]
+                    key = None if missing else stage_key(s, manifest)
+                    status[name] = ('would run' if force or key not in manifest['stages'] else 'up to date') if key else (
+                        'kept (missing input)' if all(os.path.exists(os.path.join(ROOT, o)) for o in s['outputs']) else 'blocked (missing input)')
+                else:
+                    result, keys[name] = check_stage(s, manifest, force)
+                    if result != 'run':
+                        status[name] = result
+                        continue
+                    if pool is None:
+                        pool = ProcessPoolExecutor(max_workers=n_workers, max_tasks_per_child=1)
+                    log_file = os.path.join(LOGS_DIR, name.replace(':', '.') + '.log')
+                    running[pool.submit(_run_stage, s['analysis'], s['step'], s['args'], log_file)] = name
+                    print(f"  {name}: running (log: {os.path.relpath(log_file)})")
+            if not running:
+                continue
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                s = by_name[name]
+                missing = [o for o in s['outputs'] if not os.path.exists(os.path.join(ROOT, o))]
+                if future.result() != 0:
+                    status[name] = f"failed (exit code {future.result()})"
+                elif missing:
+                    status[name] = f"failed (did not write {', '.join(missing)})"
+                else:
+                    manifest['stages'][keys[name]] = store_outputs(s, manifest)
+                    save_manifest(manifest)
+                    status[name] = 'ran'
+                print(f"  {name}: {status[name]}")
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        if not dry_run:
+            save_manifest(manifest)
+    return status
+
+
+def main(argv):
+    force, dry_run, n_workers, names = False, False, None, []
+    for arg in argv:
+        if arg == '--force':
+            force = True
+        elif arg == '--dry-run':
+            dry_run = True
+        elif arg == '--trace' or arg.startswith('--trace='):
+            enable_tracing(arg)
+        elif arg.startswith('--jobs='):
+            n_workers = int(arg.split('=', 1)[1])
+        elif arg in PIPELINES:
+            names.append(arg)
+        else:
+            print(__doc__.strip())
+            print(f"\nPipelines: {', '.join(PIPELINES)}")
+            return 0 if arg in ('-h', '--help') else 2
+
+    failed = False
+    for name in names or list(PIPELINES):
+        print(f"Pipeline '{name}':")
+        status = run_pipeline(PIPELINES[name], n_workers, force, dry_run)
+        for s in PIPELINES[name]:
+            print(f"  {s['name']:<20} {status[s['name']]}")
+            failed = failed or status[s['name']].startswith(('failed', 'blocked'))
+
+        # Keep the metrics of every stage that ran, so earlier runs stay comparable
+        outputs = [o for s in PIPELINES[name] if status[s['name']] == 'ran' for o in s['outputs']]
+        if outputs:
+            from results_store import ResultsStore
+            with ResultsStore() as store:
+                run_id, n_rows = store.record_files(outputs, f'pipeline.py {name}', {'force': force})
+            if run_id:
+                print(f"  Stored {n_rows} metric rows as results run {run_id}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
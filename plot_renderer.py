@@ -0,0 +1,274 @@
+"""Render figures from specs in parallel, skipping the ones whose data and options have not changed.
+
+    specs = [figure_spec('bar', 'rates.png', {'categories': names, 'values': [rates]}, ylim=(0, 100))]
+    render_figures(specs)
+
+A spec names a renderer kind, the PNG file, precomputed data arrays and
+drawing options (which must be JSON values). Scripts do their aggregation
+themselves and hand over only what is drawn; matplotlib is imported by the
+renderers alone, so a run whose figures are all up to date never loads it.
+Specs may take their look from seaborn: style names a seaborn axes style
+(e.g. 'whitegrid') and a bar spec's saturation goes through
+seaborn.desaturate. seaborn is then imported by the worker that renders.
+
+Kinds: 'errorbar', 'scatter', 'bar' (grouped bars, one row of values per
+series, with optional reference lines and value labels) and 'hist' (one or
+more histograms side by side, with optional threshold lines). count_table()
+turns two columns into the counts a 'bar' spec draws as a count plot.
+
+Modules in the project folders append the repository root to sys.path
+before importing it, so their scripts also run from their own folder.
+"""
+import os
+import json
+import hashlib
+import numpy as np
+from parallel import parallel_map
+from instrumentation import stage
+
+# Hashes of the specs behind every rendered PNG; bump RENDERER_VERSION when a renderer's drawing code changes
+CACHE_FILE = '.plot_cache.json'
+RENDERER_VERSION = 1
+
+
+def figure_spec(kind, file, data, **options):
+    """A figure to render: the renderer kind, the PNG file, precomputed data arrays and drawing options."""
+    return {'kind': kind, 'file': file, 'data': data, 'options': options}
+
+
+def spec_hash(spec):
+    """Content hash of a spec: renderer kind and version, options and the bytes of every data array."""
+    digest = hashlib.sha256()
+    digest.update(json.dumps([RENDERER_VERSION, spec['kind'], spec['file'], spec['options']], sort_keys=True, default=str).encode())
+    for name in sorted(spec['data']):
+        values = np.asarray(spec['data'][name])
+        digest.update(f"{name}:{values.dtype}:{values.shape}".encode())
+        digest.update(values.astype(str).tobytes() if values.dtype == object else values.tobytes())
+    return digest.hexdigest()
+
+
+def _pyplot():
+    """matplotlib.pyplot on the Agg backend, imported on first use so runs that skip every figure never load it."""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    return plt
+
+
+def _render_errorbar(data, options):
+    plt = _pyplot()
+    plt.figure(figsize=options.get('figsize', (12, 6)))
+    plt.errorbar(data['categories'], data['means'], yerr=data['stds'], fmt='o', capsize=5)
+    plt.xlabel(options.get('xlabel', ''))
+    plt.ylabel(options.get('ylabel', ''))
+    plt.title(options.get('title', ''))
+    plt.xticks(rotation=options.get('rotation', 0))
+    if 'ylim' in options:
+        plt.ylim(*options['ylim'])
+    plt.tight_layout()
+
+
+def _render_scatter(data, options):
+    plt = _pyplot()
+    plt.figure(figsize=options.get('figsize', (10, 6)))
+    plt.scatter(data['x'], data['y'], alpha=options.get('alpha', 0.8), color=options.get('color', 'blue'), s=options.get('size', 100))
+    if 'ylim' in options:
+        plt.ylim(*options['ylim'])
+    plt.title(options.get('title', ''))
+    plt.xlabel(options.get('xlabel', ''))
+    plt.ylabel(options.get('ylabel', ''))
+    plt.grid(options.get('grid', False))
+
+
+def _colors(options, n):
+    """n colors: options['colors'] as given, else the first n of the options['palette'] colormap."""
+    if 'colors' in options:
+        return list(options['colors'])
+    import matplotlib
+    palette = matplotlib.colormaps[options.get('palette', 'tab10')].colors
+    return [palette[i % len(palette)] for i in range(n)]
+
+
+def _seaborn():
+    """seaborn, imported on first use by the specs that take a seaborn style or saturation."""
+    import seaborn
+    return seaborn
+
+
+def _label_axes(ax, options, patch_colors=()):
+    """Title, axis labels, tick rotation, y limits, grid and legend shared by the 'bar' and 'hist' renderers.
+
+    legend is True or a dict of ax.legend keyword arguments; legend_labels
+    replaces the labels of the drawn series, and with legend_patches the
+    legend gets one plain patch per legend label in patch_colors instead.
+    """
+    plt = _pyplot()
+    text = {'fontsize': options['label_fontsize']} if 'label_fontsize' in options else {}
+    if 'labelpad' in options:
+        text['labelpad'] = options['labelpad']
+    if 'title' in options:
+        title = {'fontsize': options['title_fontsize']} if 'title_fontsize' in options else {}
+        plt.title(options['title'], pad=options.get('title_pad'), **title)
+    if 'xlabel' in options:
+        plt.xlabel(options['xlabel'], **text)
+    if 'ylabel' in options:
+        plt.ylabel(options['ylabel'], **text)
+    if 'rotation' in options:
+        plt.xticks(rotation=options['rotation'], ha=options.get('ha', 'center'))
+    if 'ylim' in options:
+        plt.ylim(*options['ylim'])
+    if options.get('grid'):
+        plt.grid(True, **(options['grid'] if isinstance(options['grid'], dict) else {}))
+    legend = options.get('legend', False)
+    if legend is False:
+        return
+    kwargs = legend if isinstance(legend, dict) else {}
+    if options.get('legend_patches'):
+        from matplotlib.patches import Patch
+        ax.legend([Patch(facecolor=color) for color in patch_colors], options['legend_labels'], **kwargs)
+    elif 'legend_labels' in options:
+        ax.legend(ax.get_legend_handles_labels()[0], options['legend_labels'], **kwargs)
+    else:
+        ax.legend(**kwargs)
+
+
+def _render_bar(data, options):
+    """Grouped bars: data['values'] has one row per series and one column per category.
+
+    Each series gets width / n_series of every category's slot, centred on
+    the category. Colors go one per series, or one per category with
+    color_by='category'; saturation scales them down with seaborn.desaturate,
+    as seaborn's bar plots do (legend patches keep the full colors). With categorical=True the x axis spans
+    exactly the category slots and has no vertical grid lines, like a
+    seaborn bar or count plot. hlines are keyword arguments of axhline;
+    value_labels is a format string for a label above every bar.
+    """
+    plt = _pyplot()
+    plt.figure(figsize=options.get('figsize', (10, 6)))
+    ax = plt.gca()
+    values = np.atleast_2d(np.asarray(data['values'], dtype=float))
+    n_series, n_categories = values.shape
+    positions = np.arange(n_categories)
+    width = options.get('width', 0.8) / n_series
+    by_category = options.get('color_by') == 'category'
+    palette = _colors(options, n_categories if by_category else n_series)
+    saturation = options.get('saturation', 1)
+    colors = [_seaborn().desaturate(color, saturation) for color in palette] if saturation != 1 else palette
+    series = data.get('series', [None] * n_series)
+    for line in options.get('hlines', []):
+        ax.axhline(**line)
+    for i in range(n_series):
+        bars = ax.bar(positions + (i - (n_series - 1) / 2) * width, values[i], width,
+                      color=colors if by_category else colors[i], alpha=options.get('alpha'),
+                      label=str(series[i]) if series[i] is not None else None)
+        if 'value_labels' in options:
+            for bar in bars:
+                height = bar.get_height()
+                ax.text(bar.get_x() + bar.get_width() / 2, height, options['value_labels'].format(height),
+                        ha='center', va='bottom')
+    ax.set_xticks(positions, [str(category) for category in data['categories']])
+    if options.get('categorical'):
+        ax.set_xlim(-0.5, n_categories - 0.5)
+        ax.xaxis.grid(False)
+    _label_axes(ax, options, palette)
+    plt.tight_layout()
+
+
+def _render_hist(data, options):
+    """Histograms of the data arrays named by options['series'] (drawn side by side when more than one).
+
+    Options go to plt.hist (bins, colors, labels, alpha, edgecolor); vlines
+    are keyword arguments of axvline, drawn over the bars.
+    """
+    plt = _pyplot()
+    plt.figure(figsize=options.get('figsize', (10, 6)))
+    ax = plt.gca()
+    datasets = [np.asarray(data[name]) for name in options['series']]
+    kwargs = {'bins': options.get('bins', 10), 'alpha': options.get('alpha'), 'edgecolor': options.get('edgecolor')}
+    if 'colors' in options:
+        kwargs['color'] = options['colors']
+    if 'labels' in options:
+        kwargs['label'] = options['labels']
+    plt.hist(datasets if len(datasets) > 1 else datasets[0], **kwargs)
+    for line in options.get('vlines', []):
+        ax.axvline(**line)
+    _label_axes(ax, options)
+    plt.tight_layout()
+
+
+RENDERERS = {
+    'errorbar': _render_errorbar,
+    'scatter': _render_scatter,
+    'bar': _render_bar,
+    'hist': _render_hist
+}
+
+def render_figure(spec):
+    """Render one spec to its PNG file on the Agg backend, under the spec's seaborn style, rc settings and dpi, if any."""
+    plt = _pyplot()
+    options = spec['options']
+    rc = dict(_seaborn().axes_style(options['style'])) if 'style' in options else {}
+    rc.update(options.get('rc', {}))
+    with plt.rc_context(rc):
+        RENDERERS[spec['kind']](spec['data'], options)
+        if 'dpi' in options:
+            plt.savefig(spec['file'], dpi=options['dpi'])
+        else:
+            plt.savefig(spec['file'])
+        plt.close()
+    return spec['file']
+
+
+def count_table(x, hue):
+    """Counts of every (x, hue) pair as {'categories', 'series', 'values'} data for a 'bar' spec.
+
+    Levels are ordered as seaborn's countplot orders them: the categories of
+    a categorical column, sorted values of a numeric or boolean one, else
+    order of first appearance. values has one row per hue level.
+    """
+    import pandas as pd
+
+    def levels(column):
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            return list(column.cat.categories)
+        unique = pd.unique(column.dropna())
+        numeric = pd.api.types.is_numeric_dtype(column) or pd.api.types.is_bool_dtype(column)
+        return sorted(unique) if numeric else list(unique)
+
+    x, hue = pd.Series(x).reset_index(drop=True), pd.Series(hue).reset_index(drop=True)
+    categories, series = levels(x), levels(hue)
+    counts = pd.crosstab(hue, x).reindex(index=series, columns=categories, fill_value=0)
+    return {'categories': np.array([str(c) for c in categories]),
+            'series': np.array([str(s) for s in series]),
+            'values': counts.to_numpy(dtype=np.int64)}
+
+
+def _load_cache(cache_file):
+    try:
+        with open(cache_file) as file:
+            return json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def render_figures(specs, n_workers=None, cache_file=CACHE_FILE, force=False):
+    """Render every spec whose PNG is missing or whose spec hash changed; returns (rendered, skipped) files.
+
+    Figures are rendered in parallel across a process pool. The hash of every
+    rendered spec is recorded in cache_file, so the next run skips figures
+    whose data and options have not changed.
+    """
+    cache = _load_cache(cache_file)
+    hashes = [spec_hash(spec) for spec in specs]
+    stale = [force or cache.get(spec['file']) != h or not os.path.exists(spec['file']) for spec, h in zip(specs, hashes)]
+    todo = [(spec, h) for spec, h, is_stale in zip(specs, hashes, stale) if is_stale]
+    skipped = [spec['file'] for spec, is_stale in zip(specs, stale) if not is_stale]
+
+    with stage('figures.render', rows=len(todo), skipped=len(skipped)):
+        rendered = parallel_map(render_figure, [spec for spec, _ in todo], n_workers)
+
+    if todo:
+        cache.update({spec['file']: h for spec, h in todo})
+        with open(cache_file, 'w') as file:
+            json.dump(cache, file, indent=2, sort_keys=True)
+    return rendered, skipped
@@ -0,0 +1,303 @@
+"""Keep every run's fairness metrics in one SQLite database instead of overwritten CSV files.
+
+    python results_store.py record [NAME=VALUE ...]   store the result CSVs on disk as a new run
+    python results_store.py runs                      list the stored runs
+    python results_store.py compare RUN_A RUN_B       metrics that differ between two runs
+    python results_store.py trend DATASET METRIC      one metric across all runs
+
+A run is one snapshot of results with its command and parameters. Each
+metric row is a (dataset, stage, attribute, outcome, metric) series with a
+value and optional confidence interval for one run. Series are stored once
+in their own table, so metric rows are a few numbers each. Indexes on
+(series, run) and (run, series) make trend and comparison queries index
+lookups, even with millions of stored rows. Rows are inserted in bulk
+through a staging table inside one transaction.
+
+RESULT_FILES lists how each known result CSV of the projects maps to
+metric rows.
+"""
+import os
+import sys
+import json
+import sqlite3
+import subprocess
+from datetime import datetime, timezone
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+DATABASE_FILE = os.path.join(ROOT, 'results.sqlite')
+
+METRIC_COLUMNS = ['dataset', 'stage', 'attribute', 'outcome', 'metric', 'value', 'ci_lower', 'ci_upper']
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY,
+    started TEXT NOT NULL,
+    command TEXT NOT NULL,
+    parameters TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS series (
+    series_id INTEGER PRIMARY KEY,
+    dataset TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    attribute TEXT NOT NULL,
+    outcome TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    UNIQUE (dataset, stage, attribute, outcome, metric)
+);
+CREATE TABLE IF NOT EXISTS metrics (
+    series_id INTEGER NOT NULL REFERENCES series,
+    run_id INTEGER NOT NULL REFERENCES runs,
+    value REAL,
+    ci_lower REAL,
+    ci_upper REAL,
+    PRIMARY KEY (series_id, run_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS metrics_by_run ON metrics (run_id, series_id);
+CREATE INDEX IF NOT EXISTS series_by_metric ON series (metric, dataset);
+CREATE VIEW IF NOT EXISTS metric_rows AS
+    SELECT m.run_id, r.started, r.parameters, s.dataset, s.stage, s.attribute, s.outcome, s.metric,
+           m.value, m.ci_lower, m.ci_upper
+    FROM metrics m JOIN series s USING (series_id) JOIN runs r USING (run_id);
+"""
+
+
+def _numbers(values):
+    return pd.to_numeric(pd.Series(values), errors='coerce')
+
+
+def _long_rows(dataset, stage, attributes, outcomes, metrics):
+    """Metric rows from per-row attribute/outcome labels and {metric: (values, ci_lower, ci_upper)}."""
+    parts = []
+    for metric, (values, lower, upper) in metrics.items():
+        parts.append(pd.DataFrame({
+            'dataset': dataset, 'stage': stage,
+            'attribute': pd.Series(attributes, dtype=str).to_numpy(), 'outcome': pd.Series(outcomes, dtype=str).to_numpy(),
+            'metric': metric, 'value': _numbers(values).to_numpy(),
+            'ci_lower': _numbers(lower).to_numpy() if lower is not None else np.nan,
+            'ci_upper': _numbers(upper).to_numpy() if upper is not None else np.nan
+        }))
+    return pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=METRIC_COLUMNS)
+
+
+# Labels the drug scripts use for the same protected attribute
+DRUG_ATTRIBUTES = {'Male vs. Female': 'Gender', 'Gender (Male vs. Female)': 'Gender',
+                   'Younger vs. Older': 'Age', 'Age (Older vs. Younger)': 'Age'}
+
+
+def _spd_di_rows(dataset, stage):
+    """Reader for the drug SPD/DI tables, with or without bootstrap CIs and with either label layout."""
+    def read(df):
+        if 'Comparison' in df.columns:
+            attribute, outcome = df['Comparison'].str.rsplit(' ', n=1).str[0], df['Comparison'].str.rsplit(' ', n=1).str[1]
+        else:
+            attribute, outcome = df['Protected Attribute'], df['Outcome']
+        attribute = attribute.replace(DRUG_ATTRIBUTES)
+        ci = lambda name: df[name] if name in df.columns else None
+        return _long_rows(dataset, stage, attribute, outcome, {
+            'Statistical Parity Difference': (df['Statistical Parity Difference'], ci('SPD CI Lower'), ci('SPD CI Upper')),
+            'Disparate Impact': (df['Disparate Impact'], ci('DI CI Lower'), ci('DI CI Upper'))
+        })
+    return read
+
+
+def _column_rows(dataset, stage, label_column, value_columns=None, outcome=''):
+    """Reader for tables with one labelled row per attribute value and one column per metric."""
+    def read(df):
+        columns = value_columns or [c for c in df.columns if c != label_column]
+        return _long_rows(dataset, stage, df[label_column], [outcome] * len(df),
+                          {column: (df[column], None, None) for column in columns})
+    return read
+
+
+def _metric_table_rows(dataset, stage, attribute, outcome):
+    """Reader for 'Metric, Value, ...' tables."""
+    def read(df):
+        return pd.DataFrame({'dataset': dataset, 'stage': stage, 'attribute': attribute, 'outcome': outcome,
+                             'metric': df['Metric'], 'value': _numbers(df['Value']).to_numpy(),
+                             'ci_lower': np.nan, 'ci_upper': np.nan})
+    return read
+
+
+def _cross_validation_rows(df):
+    value_columns = [c for c in df.columns if c != 'mode']
+    return pd.concat([_long_rows('credit', f'cross_validation_{mode}', ['Age'] * len(rows), ['Approval'] * len(rows),
+                                 {column: (rows[column], None, None) for column in value_columns})
+                      for mode, rows in df.groupby('mode', sort=False)], ignore_index=True)
+
+
+def _correlation_rows(df):
+    rows = []
+    for method, part in df.groupby('Method', sort=False):
+        rows.append(_long_rows('toxicity', 'correlation', part['Protected Class'], ['TOXICITY'] * len(part), {
+            f'{method} Correlation': (part['Correlation Coefficient'], None, None),
+            f'{method} P-Value': (part['P-Value'], None, None)
+        }))
+    return pd.concat(rows, ignore_index=True)
+
+
+def _bias_auc_rows(df):
+    labels = df['Protected Class'].where(df['Protected Class'] == df['Group'], df['Protected Class'] + '/' + df['Group'])
+    return _long_rows('toxicity', 'bias_auc', labels, ['TOXICITY'] * len(df),
+                      {c: (df[c], None, None) for c in ['Positives', 'Negatives', 'Subgroup AUC', 'BPSN AUC', 'BNSP AUC']})
+
+
+# Result file (relative to the repository root) -> function turning its table into metric rows
+RESULT_FILES = {
+    'final_project/before_fairness_metrics.csv': _spd_di_rows('drug', 'before_reweighing'),
+    'final_project/after_fairness_metrics.csv': _spd_di_rows('drug', 'after_reweighing'),
+    'final_project/original_fairness_metrics.csv': _spd_di_rows('drug', 'before_di_remover'),
+    'final_project/transformed_fairness_metrics.csv': _spd_di_rows('drug', 'after_di_remover'),
+    'hw_5/fairness_metrics_table.csv': _metric_table_rows('credit', 'section5', 'Age', 'Approval'),
+    'hw_5/fairness_metrics_table_alt.csv': _metric_table_rows('credit', 'section5_alt', 'Age', 'Approval'),
+    'hw_5/favorable_unfavorable_outcomes.csv': _column_rows('credit', 'section4', 'Age Group', outcome='Approval'),
+    'hw_5/group_thresholds.csv': _column_rows('credit', 'section6', 'Group', ['Threshold'], outcome='Approval'),
+    'hw_5/bias_mitigation_results.csv': _column_rows('credit', 'section6', 'Group', outcome='Approval'),
+    'hw_5/cross_validation_summary.csv': _cross_validation_rows,
+    'HW_3/correlation_results.csv': _correlation_rows,
+    'HW_3/bias_auc_metrics.csv': _bias_auc_rows
+}
+
+
+def read_result_file(path):
+    """Metric rows of one known result file (path relative to the repository root)."""
+    return RESULT_FILES[path](pd.read_csv(os.path.join(ROOT, path)))
+
+
+def _git_commit():
+    try:
+        result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True)
+        return result.stdout.strip() or None
+    except OSError:
+        return None
+
+
+class ResultsStore:
+    """Runs and metric rows in an SQLite database (created on first use)."""
+
+    def __init__(self, path=DATABASE_FILE):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute('PRAGMA journal_mode = WAL')
+        self.connection.execute('PRAGMA synchronous = NORMAL')
+        self.connection.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def close(self):
+        self.connection.close()
+
+    def start_run(self, command, parameters=None):
+        """Add a run and return its id; parameters are stored as JSON together with the git commit."""
+        parameters = {'git_commit': _git_commit(), **(parameters or {})}
+        with self.connection:
+            cursor = self.connection.execute(
+                'INSERT INTO runs (started, command, parameters) VALUES (?, ?, ?)',
+                (datetime.now(timezone.utc).isoformat(timespec='seconds'), command, json.dumps(parameters, sort_keys=True, default=str)))
+        return cursor.lastrowid
+
+    def add_metrics(self, run_id, rows):
+        """Bulk insert metric rows (a DataFrame or records with METRIC_COLUMNS) for a run; returns the row count.
+
+        Rows go into a temporary staging table with one executemany; new
+        series and all metric values are then added with two INSERT ... SELECT
+        statements, all in a single transaction. A series repeated within
+        the rows keeps its last value.
+        """
+        rows = pd.DataFrame(rows, columns=METRIC_COLUMNS)
+        for column in ['attribute', 'outcome']:
+            rows[column] = rows[column].fillna('').astype(str)
+        values = rows[['value', 'ci_lower', 'ci_upper']].astype(float)
+        values = values.where(np.isfinite(values), None)
+        records = zip(*(rows[c].astype(str).tolist() for c in METRIC_COLUMNS[:5]), *(values[c].tolist() for c in values.columns))
+        with self.connection:
+            self.connection.execute('CREATE TEMP TABLE IF NOT EXISTS staging (dataset, stage, attribute, outcome, metric, value, ci_lower, ci_upper)')
+            self.connection.execute('DELETE FROM staging')
+            self.connection.executemany('INSERT INTO staging VALUES (?, ?, ?, ?, ?, ?, ?, ?)', records)
+            self.connection.execute("""
+                INSERT OR IGNORE INTO series (dataset, stage, attribute, outcome, metric)
+                SELECT DISTINCT dataset, stage, attribute, outcome, metric FROM staging""")
+            self.connection.execute("""
+                INSERT OR REPLACE INTO metrics (series_id, run_id, value, ci_lower, ci_upper)
+                SELECT s.series_id, ?, g.value, g.ci_lower, g.ci_upper
+                FROM staging g JOIN series s USING (dataset, stage, attribute, outcome, metric)""", (run_id,))
+            self.connection.execute('DELETE FROM staging')
+        return len(rows)
+
+    def record_files(self, paths, command, parameters=None):
+        """Store the known result files among paths as one new run; returns (run id, rows), or (None, 0) if none are known."""
+        known = [path for path in paths if path in RESULT_FILES and os.path.exists(os.path.join(ROOT, path))]
+        if not known:
+            return None, 0
+        rows = pd.concat([read_result_file(path) for path in known], ignore_index=True)
+        run_id = self.start_run(command, parameters)
+        return run_id, self.add_metrics(run_id, rows)
+
+    def query(self, sql, params=()):
+        return pd.read_sql_query(sql, self.connection, params=params)
+
+    def runs(self):
+        return self.query("""
+            SELECT r.run_id, r.started, r.command, r.parameters, COUNT(m.series_id) AS metrics
+            FROM runs r LEFT JOIN metrics m USING (run_id) GROUP BY r.run_id ORDER BY r.run_id""")
+
+    def metrics(self, run_id=None, **filters):
+        """Metric rows, optionally for one run and filtered on dataset, stage, attribute, outcome or metric."""
+        where, params = [], []
+        if run_id is not None:
+            where.append('run_id = ?')
+            params.append(run_id)
+        for column, value in filters.items():
+            if column not in METRIC_COLUMNS[:5]:
+                raise ValueError(f"Unknown filter '{column}'. Use one of {', '.join(METRIC_COLUMNS[:5])}.")
+            where.append(f'{column} = ?')
+            params.append(value)
+        return self.query('SELECT * FROM metric_rows' + (' WHERE ' + ' AND '.join(where) if where else '') +
+                          ' ORDER BY run_id, dataset, stage, attribute, outcome, metric', params)
+
+    def compare(self, run_a, run_b, tolerance=0.0):
+        """Series stored in both runs whose values differ by more than tolerance, with the change."""
+        return self.query("""
+            SELECT s.dataset, s.stage, s.attribute, s.outcome, s.metric, a.value AS value_a, b.value AS value_b,
+                   b.value - a.value AS change
+            FROM metrics a JOIN metrics b ON b.series_id = a.series_id AND b.run_id = ?
+                 JOIN series s ON s.series_id = a.series_id
+            WHERE a.run_id = ? AND (ABS(b.value - a.value) > ? OR (a.value IS NULL) != (b.value IS NULL))
+            ORDER BY s.dataset, s.stage, s.attribute, s.outcome, s.metric""", (run_b, run_a, tolerance))
+
+    def trend(self, dataset, metric, **filters):
+        """Value and CI of one metric of a dataset in every run, one column per (stage, attribute, outcome)."""
+        rows = self.metrics(dataset=dataset, metric=metric, **filters)
+        return rows.pivot_table(index=['run_id', 'started'], columns=['stage', 'attribute', 'outcome'], values='value')
+
+
+def main(argv):
+    if not argv or argv[0] not in ('record', 'runs', 'compare', 'trend'):
+        print(__doc__.strip())
+        return 0 if not argv or argv[0] in ('-h', '--help') else 2
+    with ResultsStore() as store:
+        if argv[0] == 'record':
+            parameters = dict(arg.split('=', 1) for arg in argv[1:] if '=' in arg)
+            run_id, n_rows = store.record_files(list(RESULT_FILES), 'results_store.py record', parameters)
+            print(f"Stored {n_rows} metric rows as run {run_id}." if run_id else "No result files found.")
+        elif argv[0] == 'runs':
+            print(store.runs().to_string(index=False))
+        elif argv[0] == 'compare' and len(argv) >= 3:
+            changes = store.compare(int(argv[1]), int(argv[2]))
+            print(changes.to_string(index=False) if len(changes) else f"No metric differs between runs {argv[1]} and {argv[2]}.")
+        elif argv[0] == 'trend' and len(argv) >= 3:
+            print(store.trend(argv[1], argv[2]).to_string())
+        else:
+            print(__doc__.strip())
+            return 2
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
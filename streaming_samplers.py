@@ -0,0 +1,148 @@
+"""One-pass reservoir and stratified samplers for chunked input.
+
+    sampler = StratifiedSampler(frac=0.1, min_per_stratum=30, seed=42)
+    for chunk in pd.read_csv(path, chunksize=CHUNK_ROWS):
+        sampler.update(chunk, strata_of(chunk))    # strata optional
+    sample = sampler.sample()
+
+Used by HW_3/stratified_sample.py (subgroup strata) and HW 1 and 2/step_6.py
+(a plain 50% sample). Modules in the project folders append the repository
+root to sys.path before importing it.
+"""
+import numpy as np
+import pandas as pd
+
+# Rows per chunk when streaming a CSV file
+CHUNK_ROWS = 500000
+
+
+def _smallest(keys, positions, k):
+    """The k smallest keys (and their positions), in no particular order."""
+    if len(keys) <= k:
+        return keys, positions
+    keep = np.argpartition(keys, k - 1)[:k]
+    return keys[keep], positions[keep]
+
+
+class ReservoirSampler:
+    """One-pass uniform sample of a stream of chunks, without replacement.
+
+    Every row gets a random key in [0, 1) from a seeded generator, and the
+    sample is the rows with the smallest keys (bottom-k sampling). With size=k
+    that is a uniform fixed-size sample (the reservoir keeps k + 1 keys so the
+    inclusion threshold is known); with frac=p it keeps every row whose key is
+    below p (Poisson sampling). Keys depend only on a row's position in the
+    stream, so the sample does not depend on how the input is chunked.
+    """
+
+    def __init__(self, size=None, frac=None, seed=42):
+        if (size is None) == (frac is None):
+            raise ValueError("Give exactly one of size or frac.")
+        self.size = size
+        self.frac = frac
+        self.rng = np.random.default_rng(seed)
+        self.keys = np.empty(0)
+        self.positions = np.empty(0, dtype=np.int64)
+        self.n_seen = 0
+
+    def draw_keys(self, n_rows):
+        """Keys and stream positions for the next n_rows rows."""
+        keys = self.rng.random(n_rows)
+        positions = np.arange(self.n_seen, self.n_seen + n_rows, dtype=np.int64)
+        self.n_seen += n_rows
+        return keys, positions
+
+    def offer(self, keys, positions):
+        if self.frac is not None:
+            chosen = keys < self.frac
+            self.keys = np.concatenate([self.keys, keys[chosen]])
+            self.positions = np.concatenate([self.positions, positions[chosen]])
+        else:
+            self.keys, self.positions = _smallest(np.concatenate([self.keys, keys]),
+                                                  np.concatenate([self.positions, positions]), self.size + 1)
+
+    def threshold(self):
+        """Inclusion probability of every row (the key a row must stay below)."""
+        if self.frac is not None:
+            return self.frac
+        return 1.0 if len(self.keys) <= self.size else float(np.max(self.keys))
+
+    def selected(self):
+        """Stream positions of the sampled rows."""
+        if self.frac is not None or len(self.keys) <= self.size:
+            return self.positions
+        return self.positions[self.keys < self.threshold()]
+
+    def update(self, chunk):
+        self.offer(*self.draw_keys(len(chunk)))
+
+
+class StratifiedSampler:
+    """Uniform sample plus per-stratum reservoirs that guarantee min_per_stratum rows per stratum.
+
+    Strata are boolean columns (e.g. subgroup flags) and may overlap. Each
+    stratum keeps its own bottom-k reservoir over the same row keys as the base
+    sample, so a stratum with at least min_per_stratum rows always ends up with
+    at least that many. The sample is the union of the base sample and the
+    stratum reservoirs. Each row's 'Sample Weight' is the inverse of its
+    inclusion probability (the largest threshold of the base sample and of the
+    strata it belongs to), so weighted estimates stay unbiased.
+    """
+
+    def __init__(self, size=None, frac=None, min_per_stratum=0, seed=42):
+        self.base = ReservoirSampler(size, frac, seed)
+        self.min_per_stratum = min_per_stratum
+        self.strata_keys = None
+        self.strata_positions = None
+        self.rows = None
+
+    def update(self, chunk, strata=None):
+        """Add a DataFrame chunk; strata is its (rows x strata) boolean matrix (no strata when None)."""
+        strata = np.zeros((len(chunk), 0), dtype=bool) if strata is None else np.asarray(strata, dtype=bool)
+        keys, positions = self.base.draw_keys(len(chunk))
+        self.base.offer(keys, positions)
+        if self.strata_keys is None:
+            self.strata_keys = [np.empty(0) for _ in range(strata.shape[1])]
+            self.strata_positions = [np.empty(0, dtype=np.int64) for _ in range(strata.shape[1])]
+        if self.min_per_stratum > 0:
+            for s in range(strata.shape[1]):
+                in_stratum = strata[:, s]
+                self.strata_keys[s], self.strata_positions[s] = _smallest(
+                    np.concatenate([self.strata_keys[s], keys[in_stratum]]),
+                    np.concatenate([self.strata_positions[s], positions[in_stratum]]),
+                    self.min_per_stratum + 1)
+
+        # Keep the data (and stratum flags) of every row that is still a candidate
+        candidates = np.unique(np.concatenate([self.base.positions, *self.strata_positions]))
+        chunk = chunk.set_axis(positions).assign(_key=keys)
+        flags = pd.DataFrame(strata, index=positions).add_prefix('_stratum_')
+        chunk = pd.concat([chunk, flags], axis=1)
+        kept = chunk.loc[np.intersect1d(positions, candidates)]
+        self.rows = kept if self.rows is None else pd.concat([self.rows.loc[self.rows.index.isin(candidates)], kept])
+
+    def _stratum_threshold(self, s):
+        keys = self.strata_keys[s]
+        return 1.0 if len(keys) <= self.min_per_stratum else float(np.max(keys))
+
+    def sample(self):
+        """The sampled rows (in stream order) with a 'Sample Weight' column."""
+        if self.rows is None:
+            return pd.DataFrame()
+        keys = self.rows['_key'].to_numpy()
+        flags = self.rows.filter(like='_stratum_').to_numpy(dtype=bool)
+        threshold = np.full(len(keys), self.base.threshold())
+        if self.min_per_stratum > 0:
+            stratum_thresholds = np.array([self._stratum_threshold(s) for s in range(flags.shape[1])])
+            threshold = np.maximum(threshold, (flags * stratum_thresholds).max(axis=1, initial=0.0))
+        chosen = keys < threshold
+        sample = self.rows[chosen].drop(columns=['_key'] + list(self.rows.filter(like='_stratum_').columns))
+        sample['Sample Weight'] = 1.0 / threshold[chosen]
+        return sample.sort_index().rename_axis('Stream Position')
+
+
+def sample_csv(path, strata_fn, size=None, frac=None, min_per_stratum=0, seed=42, chunk_rows=CHUNK_ROWS):
+    """Stream a CSV once and return a stratified sample; strata_fn(chunk) gives the chunk's strata matrix."""
+    sampler = StratifiedSampler(size, frac, min_per_stratum, seed)
+    for chunk in pd.read_csv(path, chunksize=chunk_rows):
+        sampler.update(chunk, strata_fn(chunk))
+    return sampler.sample()
@@ -0,0 +1,126 @@
+"""Seeded synthetic datasets shaped like each project's real data, at any size.
+
+The category codes, subgroup names and demographic value tables come from
+the projects' own modules, so the generated data stays in step with the
+code that reads it. Every generator takes a row count and a
+numpy Generator; the same seed always gives the same data.
+"""
+import os
+import sys
+import importlib
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def project_module(folder, name):
+    """Import a module that sits beside one of the project scripts (e.g. 'hw_5', 'credit_model')."""
+    path = os.path.join(ROOT, folder)
+    if path not in sys.path:
+        sys.path.insert(0, path)
+    return importlib.import_module(name)
+
+
+def german_credit_frame(n, rng):
+    """German credit applicants: categorical attribute codes, int32 numerics and class 1 (good) or 2 (bad)."""
+    german_data = project_module('hw_5', 'german_data')
+    numeric_ranges = {
+        'duration': (4, 72), 'credit_amount': (250, 18424), 'installment_rate': (1, 4), 'residence_since': (1, 4),
+        'age': (19, 75), 'existing_credits': (1, 4), 'liable_persons': (1, 2), 'class': (1, 2)
+    }
+    data = {}
+    for name in german_data.COLUMN_NAMES:
+        if name in german_data.CATEGORIES:
+            categories = german_data.CATEGORIES[name]
+            codes = rng.integers(0, len(categories), size=n).astype(np.int8)
+            data[name] = pd.Categorical.from_codes(codes, categories=categories)
+        else:
+            low, high = numeric_ranges[name]
+            data[name] = rng.integers(low, high + 1, size=n).astype(np.int32)
+    return pd.DataFrame(data, columns=german_data.COLUMN_NAMES)
+
+
+def write_german_data(df, path):
+    """Write a frame from german_credit_frame() in the space-separated german.data format."""
+    df.astype(str).to_csv(path, sep=' ', header=False, index=False)
+
+
+def toxicity_frame(n, rng, flag_rate=0.02):
+    """Wikipedia comments with a TOXICITY score and a True/False flag per identity subgroup.
+
+    Subgroups are those of HW_3's protected classes; each flag is set
+    independently with flag_rate.
+    """
+    protected_classes = project_module('HW_3', 'protected_classes')
+    subgroups = [sub for subs in protected_classes.PROTECTED_CLASSES.values() for sub in subs]
+    data = {'Wiki_ID': np.arange(n), 'TOXICITY': rng.beta(1.0, 4.0, size=n)}
+    for sub in subgroups:
+        data[sub] = rng.random(n) < flag_rate
+    return pd.DataFrame(data)
+
+
+# Survey questions as they appear in mental-health-in-tech-survey-2019.csv, with synthetic answer choices
+SURVEY_COLUMNS = {
+    "Have you ever sought treatment for a mental health disorder from a mental health professional?": [True, False],
+    "Would you feel comfortable discussing a mental health issue with your direct supervisor(s)?": ['Yes', 'No', 'Maybe'],
+    "Overall, how well do you think the tech industry supports employees with mental health issues?": [1, 2, 3, 4, 5],
+    "What is your race?": ['White', 'Asian', 'Black or African American', 'Hispanic', 'More than one of the above', "I prefer not to answer"],
+    "Do you *currently* have a mental health disorder?": ['Yes', 'No', 'Possibly', "Don't Know"]
+}
+SURVEY_AGE_COLUMN = "What is your age?"
+
+
+def survey_frame(n, rng, missing_rate=0.05):
+    """Survey responses: an age and one answer per question, with missing_rate of the answers left blank."""
+    data = {SURVEY_AGE_COLUMN: rng.integers(18, 70, size=n)}
+    for column, choices in SURVEY_COLUMNS.items():
+        values = pd.Series(np.asarray(choices, dtype=object)[rng.integers(0, len(choices), size=n)])
+        data[column] = values.mask(rng.random(n) < missing_rate)
+    return pd.DataFrame(data)
+
+
+def face_filenames(n, rng, malformed_rate=0.001):
+    """UTKFace names '<age>_<gender>_<race>_<timestamp>.jpg.chip.jpg'; malformed_rate of them lack the race field."""
+    ages = rng.integers(1, 117, size=n)
+    genders = rng.integers(0, 2, size=n)
+    races = rng.integers(0, 5, size=n)
+    stamps = rng.integers(20170109000000000, 20170120000000000, size=n)
+    malformed = rng.random(n) < malformed_rate
+    return [f"{a}_{g}_{s}.jpg.chip.jpg" if bad else f"{a}_{g}_{r}_{s}.jpg.chip.jpg"
+            for a, g, r, s, bad in zip(ages.tolist(), genders.tolist(), races.tolist(), stamps.tolist(), malformed.tolist())]
+
+
+# Drug columns of the UCI data (as named in final_project/file.py) and their usage classes
+DRUG_COLUMNS = ['Alcohol', 'Amphet', 'Amyl', 'Benzos', 'Caffeine', 'Cannabis', 'Choc', 'Coke', 'Ecstasy',
+                'Ketamine', 'Legalh', 'LSD', 'Meth', 'Mush', 'Nicotine', 'Semer', 'VSA', 'Unknown1', 'Unknown2']
+USAGE_CLASSES = ['CL0', 'CL1', 'CL2', 'CL3', 'CL4', 'CL5', 'CL6']
+PERSONALITY_COLUMNS = ['Nscore', 'Escore', 'Oscore', 'Ascore', 'Cscore', 'Impulsive', 'SS']
+
+
+def drug_frame(n, rng):
+    """Drug consumption rows: ID, quantized demographics, personality scores and a CL code per drug."""
+    demographic_codes = project_module('final_project', 'demographic_codes')
+    data = {'ID': np.arange(1, n + 1)}
+    for column in ['Age', 'Gender', 'Education', 'Country', 'Ethnicity']:
+        values = np.array([value for value, _ in demographic_codes.CODE_TABLES[column]])
+        data[column] = values[rng.integers(0, len(values), size=n)]
+    for column in PERSONALITY_COLUMNS:
+        data[column] = rng.normal(0.0, 1.0, size=n).round(5)
+    for column in DRUG_COLUMNS:
+        data[column] = np.array(USAGE_CLASSES)[rng.integers(0, len(USAGE_CLASSES), size=n)]
+    return pd.DataFrame(data)
+
+
+def write_drug_data(df, path):
+    """Write a frame from drug_frame() like drug_consumption.data (comma-separated, no header)."""
+    df.to_csv(path, header=False, index=False)
+
+
+def embedding_vectors(n, rng, dim=300, words=()):
+    """n unit-length float32 word vectors; the vocabulary is `words` followed by generated 'word<i>' entries."""
+    words = list(words)[:n]
+    vocabulary = words + [f'word{i}' for i in range(n - len(words))]
+    vectors = rng.standard_normal((n, dim), dtype=np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vocabulary, vectors
@@ -0,0 +1,36 @@
+import os
+import sys
+import subprocess
+from analyze import ANALYSES, ROOT, parse_import_times
+
+STDERR = """import time: self [us] | cumulative | imported package
+import time:       120 |        120 | _io
+import time:       300 |       2500 | csv
+import time:        40 |         40 |     _csv
+import time:       500 |     330000 | pandas
+some other warning
+"""
+
+
+def test_parse_import_times_keeps_top_level_imports():
+    assert parse_import_times(STDERR) == [('_io', 120, 120), ('csv', 300, 2500), ('pandas', 500, 330000)]
+
+
+def test_every_step_script_exists():
+    for folder, _, steps in ANALYSES.values():
+        for script, _ in steps.values():
+            assert os.path.exists(os.path.join(ROOT, folder, script)), script
+
+
+def test_listing_imports_no_heavy_library():
+    script = "import sys, analyze\nanalyze.main(['credit'])\nprint(sorted({'pandas', 'numpy', 'matplotlib', 'sklearn', 'aif360'} & set(sys.modules)))"
+    result = subprocess.run([sys.executable, '-c', script], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert result.stdout.splitlines()[-1] == '[]'
+    assert 'split' in result.stdout
+
+
+def test_unknown_analysis_and_step():
+    result = subprocess.run([sys.executable, 'analyze.py', 'nothing'], cwd=ROOT, capture_output=True, text=True)
+    assert result.returncode == 2 and "unknown analysis 'nothing'" in result.stdout
+    result = subprocess.run([sys.executable, 'analyze.py', 'credit', 'nothing'], cwd=ROOT, capture_output=True, text=True)
+    assert result.returncode == 2 and "unknown step 'nothing'" in result.stdout
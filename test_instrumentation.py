@@ -0,0 +1,70 @@
+import os
+import sys
+import json
+import subprocess
+import pytest
+import instrumentation
+from instrumentation import TRACE_ENV, MEMORY_ENV, stage, instrumented
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def records(path):
+    with open(path) as file:
+        return [json.loads(line) for line in file]
+
+
+def test_tracing_off_costs_nothing(monkeypatch):
+    monkeypatch.delenv(TRACE_ENV, raising=False)
+    with stage('load', rows=3) as s:
+        s.rows = 5
+    assert s is instrumentation._NULL_STAGE and s.rows is None
+
+    def score(x):
+        return x
+    assert instrumented('score')(score) is score
+
+
+def test_nested_stages_and_instrumented_calls(tmp_path, monkeypatch):
+    trace = tmp_path / 'trace.jsonl'
+    monkeypatch.setenv(TRACE_ENV, str(trace))
+    monkeypatch.setenv(MEMORY_ENV, '1')
+
+    @instrumented('inner', rows=len)
+    def inner(n):
+        return [0] * n
+
+    with stage('outer', step='x') as s:
+        inner(100000)
+        s.rows = 7
+    with pytest.raises(KeyError):
+        with stage('failing'):
+            raise KeyError('x')
+
+    inner_record, outer_record, failing = records(trace)
+    assert (inner_record['stage'], inner_record['parent'], inner_record['rows']) == ('inner', 'outer', 100000)
+    assert (outer_record['stage'], outer_record['parent'], outer_record['rows'], outer_record['step']) == ('outer', None, 7, 'x')
+    assert outer_record['wall_s'] >= inner_record['wall_s']
+    assert outer_record['traced_peak_mb'] >= inner_record['traced_peak_mb'] > 0.5
+    assert failing['error'] == 'KeyError'
+
+
+def test_library_calls_are_traced_in_a_fresh_process(tmp_path):
+    trace = tmp_path / 'trace.jsonl'
+    script = ("import instrumentation\ninstrumentation.trace_libraries()\nimport io\nimport pandas as pd\n"
+              "df = pd.read_csv(io.StringIO('a\\n1\\n2\\n3\\n'))\nrows = [row for _, row in df.iterrows()]\n")
+    subprocess.run([sys.executable, '-c', script], cwd=ROOT, check=True, env=dict(os.environ, **{TRACE_ENV: str(trace)}))
+    by_stage = {record['stage']: record for record in records(trace)}
+    assert by_stage['pandas.read_csv']['rows'] == 3
+    assert by_stage['pandas.iterrows']['rows'] == 3
+
+
+def test_summarize(tmp_path, monkeypatch, capsys):
+    trace = tmp_path / 'trace.jsonl'
+    monkeypatch.setenv(TRACE_ENV, str(trace))
+    for rows in (2, 3):
+        with stage('step', rows=rows):
+            pass
+    instrumentation.summarize(str(trace))
+    line = [line for line in capsys.readouterr().out.splitlines() if line.startswith('step')][0]
+    assert line.split()[1:2] == ['2'] and line.split()[4] == '5'
@@ -0,0 +1,76 @@
+import os
+import pytest
+import pipeline
+from pipeline import PIPELINES, stage, upstream_stages, check_stage, stage_key, store_outputs, file_hash
+
+
+@pytest.fixture
+def root(tmp_path, monkeypatch):
+    """A repository root holding a one-stage 'drug prepare' project (final_project/file.py importing helper.py)."""
+    monkeypatch.setattr(pipeline, 'ROOT', str(tmp_path))
+    monkeypatch.setattr(pipeline, 'OBJECTS_DIR', str(tmp_path / 'objects'))
+    folder = tmp_path / 'final_project'
+    folder.mkdir()
+    (folder / 'file.py').write_text('import os\nfrom helper import clean\n')
+    (folder / 'helper.py').write_text('def clean(x):\n    return x\n')
+    (folder / 'drug_consumption.data').write_text('1,2,3\n')
+    (folder / 'drug_consumption_processed.csv').write_text('a,b\n1,2\n')
+    return tmp_path
+
+
+def test_upstream_stages_of_the_pipelines():
+    upstream = upstream_stages(PIPELINES['drug'])
+    assert upstream == {'drug:prepare': [], 'drug:remover': ['drug:prepare'], 'drug:reweight': ['drug:prepare']}
+    assert upstream_stages(PIPELINES['toxicity'])['toxicity:scatter'] == ['toxicity:compact']
+
+
+def test_shared_outputs_and_cycles_are_rejected():
+    with pytest.raises(ValueError):
+        upstream_stages([stage('drug', 'prepare', [], ['x.csv']), stage('drug', 'remover', [], ['x.csv'])])
+    with pytest.raises(ValueError):
+        upstream_stages([stage('drug', 'prepare', ['b.csv'], ['a.csv']), stage('drug', 'remover', ['a.csv'], ['b.csv'])])
+
+
+def test_file_hash_is_reused_until_the_file_changes(root):
+    manifest = {'files': {}, 'stages': {}}
+    path = 'final_project/drug_consumption.data'
+    first = file_hash(path, manifest)
+    assert manifest['files'][path][2] == first
+    (root / path).write_text('4,5,6\n')
+    os.utime(root / path, ns=(1, 1))
+    assert file_hash(path, manifest) != first
+
+
+def test_key_follows_code_inputs_and_arguments(root):
+    s = PIPELINES['drug'][0]
+    key = stage_key(s, {'files': {}, 'stages': {}})
+    assert stage_key(s, {'files': {}, 'stages': {}}) == key
+    assert stage_key(dict(s, args=['--fast']), {'files': {}, 'stages': {}}) != key
+    (root / 'final_project' / 'helper.py').write_text('def clean(x):\n    return x.strip()\n')
+    changed_code = stage_key(s, {'files': {}, 'stages': {}})
+    assert changed_code != key
+    (root / 'final_project' / 'drug_consumption.data').write_text('9\n')
+    assert stage_key(s, {'files': {}, 'stages': {}}) != changed_code
+
+
+def test_cached_stage_is_skipped_and_its_outputs_restored(root):
+    s = PIPELINES['drug'][0]
+    manifest = {'files': {}, 'stages': {}}
+    status, key = check_stage(s, manifest, force=False)
+    assert status == 'run'
+    manifest['stages'][key] = store_outputs(s, manifest)
+    assert check_stage(s, manifest, force=False) == ('up to date', key)
+    assert check_stage(s, manifest, force=True) == ('run', key)
+
+    output = root / 'final_project' / 'drug_consumption_processed.csv'
+    output.unlink()
+    assert check_stage(s, manifest, force=False) == ('restored drug_consumption_processed.csv', key)
+    assert output.read_text() == 'a,b\n1,2\n'
+
+
+def test_missing_inputs_block_or_keep(root):
+    s = PIPELINES['drug'][0]
+    (root / 'final_project' / 'drug_consumption.data').unlink()
+    assert check_stage(s, {'files': {}, 'stages': {}}, False)[0].startswith('kept')
+    (root / 'final_project' / 'drug_consumption_processed.csv').unlink()
+    assert check_stage(s, {'files': {}, 'stages': {}}, False)[0].startswith('blocked')
@@ -0,0 +1,36 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from plot_renderer import figure_spec, spec_hash, count_table, render_figures
+
+
+def test_count_table_orders_levels_like_countplot():
+    table = count_table(pd.Series(['b', 'a', 'b', 'c']), pd.Series([True, False, True, True]))
+    assert table['categories'].tolist() == ['b', 'a', 'c']
+    assert table['series'].tolist() == ['False', 'True']
+    np.testing.assert_array_equal(table['values'], [[0, 1, 0], [2, 0, 1]])
+
+    categorical = pd.Series(pd.Categorical(['x', 'y'], categories=['y', 'x', 'z']))
+    assert count_table(categorical, [1, 2])['categories'].tolist() == ['y', 'x', 'z']
+
+
+def test_spec_hash_follows_data_and_options():
+    spec = figure_spec('bar', 'a.png', {'categories': np.array(['a', 'b']), 'values': [np.array([1.0, 2.0])]}, ylim=(0, 3))
+    assert spec_hash(spec) == spec_hash(figure_spec('bar', 'a.png', {**spec['data']}, ylim=(0, 3)))
+    assert spec_hash(spec) != spec_hash(figure_spec('bar', 'a.png', {**spec['data']}, ylim=(0, 4)))
+    changed = {'categories': spec['data']['categories'], 'values': [np.array([1.0, 2.5])]}
+    assert spec_hash(spec) != spec_hash(figure_spec('bar', 'a.png', changed, ylim=(0, 3)))
+
+
+@pytest.mark.parametrize('options', [{}, {'saturation': 0.75, 'palette': 'Set2', 'style': 'whitegrid'}])
+def test_unchanged_figures_are_skipped(tmp_path, monkeypatch, options):
+    if options.get('style'):
+        pytest.importorskip('seaborn')
+    monkeypatch.chdir(tmp_path)
+    specs = [figure_spec('bar', f'{name}.png', {'categories': np.array(['a', 'b']), 'values': [np.array([1.0, 2.0])]}, **options)
+             for name in ('first', 'second')]
+    assert render_figures(specs, n_workers=1) == (['first.png', 'second.png'], [])
+    assert render_figures(specs, n_workers=1) == ([], ['first.png', 'second.png'])
+    os.remove('second.png')
+    assert render_figures(specs, n_workers=1) == (['second.png'], ['first.png'])
@@ -0,0 +1,25 @@
+import numpy as np
+from results_store import ResultsStore, read_result_file
+
+
+def test_drug_stages_share_attribute_names():
+    stages = [read_result_file(f'final_project/{name}_fairness_metrics.csv')
+              for name in ('before', 'after', 'original', 'transformed')]
+    for rows in stages:
+        assert set(rows['attribute']) <= {'Gender', 'Age'}
+    assert set(stages[0]['attribute']) == set(stages[2]['attribute'])
+
+
+def test_trend_lines_up_stages(tmp_path):
+    with ResultsStore(str(tmp_path / 'results.sqlite')) as store:
+        paths = ['final_project/before_fairness_metrics.csv', 'final_project/original_fairness_metrics.csv']
+        first, _ = store.record_files(paths, 'test')
+        second, _ = store.record_files(paths, 'test')
+        trend = store.trend('drug', 'Disparate Impact', outcome='Cannabis_Use')
+        # One column per stage for each attribute, whichever label the script wrote
+        stages = trend.columns.to_frame(index=False).groupby('attribute')['stage'].agg(set)
+        assert stages.to_dict() == {attribute: {'before_reweighing', 'before_di_remover'} for attribute in stages.index}
+        assert 'Gender' in stages.index
+        assert len(trend) == 2
+        np.testing.assert_allclose(trend.iloc[0], trend.iloc[1])
+        assert store.compare(first, second).empty
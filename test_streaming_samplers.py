@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import pytest
+from streaming_samplers import ReservoirSampler, StratifiedSampler, sample_csv
+
+
+def frame(n_rows, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({'value': rng.random(n_rows), 'rare': rng.random(n_rows) < 0.005, 'common': rng.random(n_rows) < 0.3})
+
+
+def stream(df, chunk_rows, sampler, strata_columns=None):
+    for start in range(0, len(df), chunk_rows):
+        chunk = df.iloc[start:start + chunk_rows]
+        sampler.update(chunk, None if strata_columns is None else chunk[strata_columns].to_numpy())
+    return sampler.sample()
+
+
+@pytest.mark.parametrize('kwargs', [{'size': 100}, {'frac': 0.1}, {'frac': 0.05, 'min_per_stratum': 20}])
+def test_sample_does_not_depend_on_chunk_size(kwargs):
+    df = frame(5000)
+    samples = [stream(df, rows, StratifiedSampler(**kwargs, seed=3), ['rare', 'common']) for rows in (5000, 999, 64)]
+    for sample in samples[1:]:
+        pd.testing.assert_frame_equal(sample, samples[0])
+
+
+def test_fixed_size_reservoir_is_exact_and_uniform():
+    counts = np.zeros(50)
+    for seed in range(400):
+        sampler = ReservoirSampler(size=10, seed=seed)
+        for start in range(0, 50, 7):
+            sampler.update(range(start, min(start + 7, 50)))
+        chosen = sampler.selected()
+        assert len(chosen) == 10 and len(np.unique(chosen)) == 10
+        counts[chosen] += 1
+    assert np.abs(counts / 400 - 0.2).max() < 0.1
+
+
+def test_minimum_per_stratum_and_weights():
+    df = frame(20000)
+    sample = stream(df, 3000, StratifiedSampler(frac=0.01, min_per_stratum=30, seed=1), ['rare', 'common'])
+    assert sample['rare'].sum() >= min(30, df['rare'].sum())
+    assert set(sample.index) <= set(range(len(df)))
+    # Rows outside the rare stratum are only in the base sample (the common stratum is far above its minimum)
+    assert (sample.loc[~sample['rare'], 'Sample Weight'] == 100.0).all()
+    assert (sample.loc[sample['rare'], 'Sample Weight'].between(1.0, 100.0)).all()
+
+
+def test_no_strata():
+    df = frame(1000)
+    sample = stream(df, 300, StratifiedSampler(frac=0.5, seed=35))
+    assert 400 < len(sample) < 600 and (sample['Sample Weight'] == 2.0).all()
+    empty_strata = stream(df, 300, StratifiedSampler(frac=0.5, min_per_stratum=5, seed=35), [])
+    pd.testing.assert_frame_equal(empty_strata, sample)
+
+
+def test_sample_csv(tmp_path):
+    df = frame(3000)
+    path = tmp_path / 'data.csv'
+    df.to_csv(path, index=False)
+    sample = sample_csv(str(path), lambda chunk: chunk[['rare']].to_numpy(), size=50, min_per_stratum=5, seed=2, chunk_rows=700)
+    expected = stream(df, 3000, StratifiedSampler(size=50, min_per_stratum=5, seed=2), ['rare'])
+    pd.testing.assert_frame_equal(sample, expected, check_dtype=False)
@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import synthetic_data as synth
+from benchmarks import CASES, DATA_SEED, NOISE_SECONDS, compare, load_baselines, run_case
+
+
+def test_same_seed_same_data():
+    for make in (synth.german_credit_frame, synth.toxicity_frame, synth.survey_frame, synth.drug_frame):
+        pd.testing.assert_frame_equal(make(200, np.random.default_rng(1)), make(200, np.random.default_rng(1)))
+    assert synth.face_filenames(50, np.random.default_rng(1)) == synth.face_filenames(50, np.random.default_rng(1))
+
+
+def test_german_data_round_trips_through_the_parser(tmp_path):
+    german_data = synth.project_module('hw_5', 'german_data')
+    df = synth.german_credit_frame(500, np.random.default_rng(2))
+    synth.write_german_data(df, tmp_path / 'german.data')
+    parsed = german_data.load_german_data(str(tmp_path / 'german.data'))
+    pd.testing.assert_frame_equal(parsed, df, check_dtype=False, check_categorical=False)
+
+
+def test_drug_and_toxicity_columns_follow_the_projects():
+    demographic_codes = synth.project_module('final_project', 'demographic_codes')
+    protected_classes = synth.project_module('HW_3', 'protected_classes')
+    drugs = synth.drug_frame(300, np.random.default_rng(3))
+    for column in ('Age', 'Gender', 'Ethnicity'):
+        codes = demographic_codes.decode_column(drugs[column], column)
+        assert codes.min() >= 0
+    toxicity = synth.toxicity_frame(100, np.random.default_rng(3))
+    subgroups = [sub for subs in protected_classes.PROTECTED_CLASSES.values() for sub in subs]
+    assert toxicity.columns.tolist() == ['Wiki_ID', 'TOXICITY'] + subgroups
+
+
+def test_compare_statuses():
+    baseline = {'seconds': 1.0, 'peak_rss_mb': 100.0}
+    assert compare({'seconds': 1.1, 'peak_rss_mb': 100.0}, baseline) == 'ok'
+    assert compare({'seconds': 1.5, 'peak_rss_mb': 100.0}, baseline) == 'REGRESSION'
+    assert compare({'seconds': 1.0, 'peak_rss_mb': 200.0}, baseline) == 'REGRESSION'
+    assert compare({'seconds': 0.5, 'peak_rss_mb': 100.0}, baseline) == 'faster'
+    # Tiny stages may be several times slower, as long as the difference stays below the noise floor
+    assert compare({'seconds': 0.001 + NOISE_SECONDS / 2, 'peak_rss_mb': 100.0}, {'seconds': 0.001, 'peak_rss_mb': 100.0}) == 'ok'
+    assert compare(baseline, None) == 'new'
+
+
+def test_every_runnable_case_has_a_baseline():
+    baselines = load_baselines()
+    assert set(baselines) <= set(CASES)
+    for name in set(CASES) - set(baselines):
+        # Only cases whose libraries are not installed here may lack one
+        assert 'skipped' in run_case(name, 1000, DATA_SEED), f"'{name}' has no stored baseline"